@@ -1,12 +1,16 @@
 import base64
-import json
 import asyncio
-from google import genai
+import contextlib
 from google.genai import types
 from app.core.config import Config
-from app.brain.memory import MemorySystem
-from app.core.key_manager import key_manager
+from app.brain.memory import AsyncMemorySystem
+from app.core.genai_client import client_manager
 from app.core.shared_state import state 
+from app.brain.router import local_router
+from app.brain.response_cache import response_cache
+from app.brain.memory_ingest import MemoryIngestWorker
+from app.brain.context_assembler import ContextAssembler, context_logger
+from app.brain.history_summarizer import HistorySummarizer
 
 # 🔥 IMPORT PROMPTS
 from app.brain.prompts import (
@@ -15,28 +19,16 @@ from app.brain.prompts import (
     get_chat_agent_prompt
 )
 
-memory = MemorySystem()
+memory = AsyncMemorySystem()
 
 # =======================================================
-# ⚙️ HELPER: JSON CLEANER & EMBEDDING
+# ⚙️ HELPER: EMBEDDING
 # =======================================================
-def clean_json_text(text: str) -> str:
-    if not text: return "{}"
-    text = text.strip()
-    if text.startswith("```json"): text = text[7:]
-    elif text.startswith("```"): text = text[3:]
-    if text.endswith("```"): text = text[:-3]
-    return text.strip()
-
 async def get_embedding(text: str):
     """စာသားကို နံပါတ် (Vector) ပြောင်းပေးသော စနစ် (Non-Blocking)"""
     try:
-        current_key = key_manager.get_next_key()
-        client = genai.Client(api_key=current_key)
-        
-        # 🔥 FIX 1: Run in Thread to prevent stuttering
-        result = await asyncio.to_thread(
-            client.models.embed_content,
+        # 🔥 FIX 1: Native async call (shared client, no thread hop)
+        result = await client_manager.embed(
             model="models/text-embedding-004",
             contents=text
         )
@@ -50,12 +42,8 @@ async def get_embedding(text: str):
 # =======================================================
 async def route_request(text: str):
     try:
-        current_key = key_manager.get_next_key()
-        client = genai.Client(api_key=current_key)
-        
-        # 🔥 FIX 2: Run in Thread
-        response = await asyncio.to_thread(
-            client.models.generate_content,
+        # 🔥 FIX 2: Native async call
+        response = await client_manager.generate(
             model="gemini-2.5-flash",
             contents=f"User Input: '{text}'",
             config=types.GenerateContentConfig(
@@ -66,6 +54,7 @@ async def route_request(text: str):
         
         decision = response.text.strip() if response.text else "CHAT_AGENT"
         print(f"[Router] 🤖 Route Selected: {decision}")
+        local_router.remember(text, decision)
         return decision
     except:
         return "CHAT_AGENT"
@@ -73,164 +62,307 @@ async def route_request(text: str):
 # =======================================================
 # 🧠 SUBCONSCIOUS LAYER (AI VALIDATOR UPGRADE)
 # =======================================================
-async def extract_and_save_memory(user_text: str):
-    # print(f"[Brain DEBUG] 🧠 Scanning Memory for: '{user_text}'")
-    
-    try:
-        current_key = key_manager.get_next_key()
-        client = genai.Client(api_key=current_key) 
-
-        # Step 1: Extract Fact
-        analysis_prompt = f"""
-        Analyze this text: "{user_text}"
-        Check if the user mentioned any Personal Fact, Preference, Plan, or Relationship info.
-        
-        ⛔ NEGATIVE CONSTRAINTS (DO NOT SAVE):
-        - Do NOT save questions.
-        - Do NOT save commands.
-        - Do NOT save casual chat.
-        
-        CORE INSTRUCTION:
-        1. Extract the fact.
-        2. Categorize it (preference/fact/plan).
-        3. GENERATE 3 SMART TAGS (keywords) as a JSON Array.
-        
-        OUTPUT ONLY JSON format:
-        {{ "found": true, "category": "fact", "content": "...", "tags": [...] }}
-        """
-
-        # 🔥 FIX 3: Run in Thread
-        response = await asyncio.to_thread(
-            client.models.generate_content,
-            model=Config.MODEL_NAME,
-            contents=analysis_prompt,
-            config=types.GenerateContentConfig(response_mime_type="application/json")
-        )
+# Extraction / embedding / dedup run batched on a bounded background worker
+memory_ingest = MemoryIngestWorker(memory)
 
-        if not response.text: return False
-        result = json.loads(clean_json_text(response.text))
-
-        if result.get("found") is True:
-            content = result.get("content")
-            category = result.get("category")
-            tags = result.get("tags")
-            
-            # --- 🔥 ADVANCED DUPLICATE CHECK (AI JUDGE) ---
-            print(f"[Brain] 🧐 Checking for logic redundancy...")
-            
-            vector = await get_embedding(content)
-            
-            if vector:
-                # 1. Search Broadly
-                similar_memories = memory.search_similar_memories(vector, threshold=0.65)
-                
-                if similar_memories:
-                    existing_facts = [m['content'] for m in similar_memories]
-                    print(f"[Brain] Found similar memories: {existing_facts}")
-
-                    # 2. Ask Gemini: "Does this new fact add value?"
-                    validation_prompt = f"""
-                    I need to decide whether to save a NEW memory to the database.
-                    
-                    NEW MEMORY: "{content}"
-                    EXISTING RELATED MEMORIES: {json.dumps(existing_facts)}
-                    
-                    RULE:
-                    - If the NEW memory is already implied or covered by EXISTING memories, return "redundant": true.
-                    - Example: If existing is "Wife name is Sarah", and new is "I have a wife", it is REDUNDANT.
-                    - If the NEW memory adds specific details not present before, return "redundant": false.
-                    
-                    OUTPUT JSON ONLY: {{ "redundant": true/false, "reason": "short explanation" }}
-                    """
-                    
-                    # 🔥 FIX 4: Run in Thread
-                    val_resp = await asyncio.to_thread(
-                        client.models.generate_content,
-                        model="gemini-2.5-flash",
-                        contents=validation_prompt,
-                        config=types.GenerateContentConfig(response_mime_type="application/json")
-                    )
-                    
-                    val_result = json.loads(clean_json_text(val_resp.text))
-                    
-                    if val_result.get("redundant") is True:
-                        print(f"[Brain] 🗑️ Skipped Redundant Info: {val_result.get('reason')}")
-                        return False # Stop Saving
-            
-            # 3. If passed AI Check, SAVE IT
-            if tags is None: tags = []
-            elif isinstance(tags, str): tags = [t.strip() for t in tags.split(",")]
-            
-            memory.save_core_memory(content, category, tags, embedding=vector) 
-            return True
+# Old turns are folded into a rolling summary in the background
+history_summarizer = HistorySummarizer(memory)
 
-    except Exception as e:
-        print(f"[Memory Extraction Error] {e}")
-    
-    return False
+def extract_and_save_memory(user_text: str):
+    """Queues the utterance for the memory ingest worker (non-blocking)"""
+    memory_ingest.submit(user_text)
 
 # =======================================================
 # 🗣️ MAIN CONSCIOUS LAYER
 # =======================================================
-async def ask_jarvis(text_input: str, image_data: str = None):
-    try:
-        current_key = key_manager.get_next_key()
-        client = genai.Client(api_key=current_key) 
+async def _system_instruction(selected_prompt, embed_task):
+    # Query embedding -> only the memories relevant to this question go into the prompt.
+    # Bounded wait: a slow / hung embedding falls back to the core-bank prompt instead of stalling the reply
+    query_embedding = None
+    if embed_task is not None and Config.MEMORY_RELEVANT_K:
+        try:
+            # shield: the embedding keeps going for the response cache
+            query_embedding = await asyncio.wait_for(asyncio.shield(embed_task), Config.MEMORY_EMBED_WAIT)
+        except asyncio.TimeoutError:
+            print(f"[Context] ⏱️ Query embedding late (>{Config.MEMORY_EMBED_WAIT}s), core memory bank used")
+    return await memory.build_system_instruction(selected_prompt, query_embedding)
 
-        memory.update_chat_history("user", text_input)
+async def _generate_reply(selected_prompt, contents_list, embed_task=None):
+    sys_instruct = await _system_instruction(selected_prompt, embed_task)
 
-        # Parallel Execution
-        agent_task = asyncio.create_task(route_request(text_input))
-        
-        # 🔥 FIX: Memory ကို မစောင့်တော့ပါ (Fire & Forget)
-        # Background မှာ သူ့ဘာသာသူ အလုပ်လုပ်နေပါလိမ့်မယ်၊ Latency မထိခိုက်တော့ပါဘူး
-        asyncio.create_task(extract_and_save_memory(text_input))
-        
-        # Router (Agent ရွေးတာ) တစ်ခုကိုပဲ စောင့်ပါမယ် (ဒါက အရမ်းမြန်ပါတယ်)
-        agent_name = await agent_task
-        
-        # Memory ကို မစောင့်တဲ့အတွက် "မှတ်လိုက်ပါပြီ" ဆိုတဲ့ Notice ကို ပိတ်ထားလိုက်ပါမယ်
-        has_memorized = False
-
-        if agent_name == "NEWS_AGENT":
-            selected_prompt = get_news_agent_prompt
-        else:
-            selected_prompt = get_chat_agent_prompt
-
-        sys_instruct = memory.build_system_instruction(selected_prompt)
-
-        contents_list = []
-        if image_data:
-            try:
-                img_str = image_data.split("base64,")[1] if "base64," in image_data else image_data
-                img_bytes = base64.b64decode(img_str)
-                contents_list.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
-            except: pass
-
-        location_context = ""
-        if state.current_gps:
-            location_context = f"\n[SYSTEM DATA: GPS {state.current_gps}]"
-
-        chat_hist = "\n".join(memory.get_chat_history())
-        final_prompt = f"{location_context}\nPREVIOUS CHAT:\n{chat_hist}\nCURRENT INPUT:\n{text_input}"
-        contents_list.append(final_prompt)
-
-        # 🔥 FIX 5: Critical Fix for Latency/Stuttering
-        response = await asyncio.to_thread(
-            client.models.generate_content,
-            model=Config.MODEL_NAME,
-            contents=contents_list,
-            config=types.GenerateContentConfig(
-                system_instruction=sys_instruct,
-                temperature=0.7
-            )
+    # 🔥 FIX 5: Critical Fix for Latency/Stuttering (native async, pooled connection)
+    response = await client_manager.generate(
+        model=Config.MODEL_NAME,
+        contents=contents_list,
+        config=types.GenerateContentConfig(
+            system_instruction=sys_instruct,
+            temperature=0.7
         )
+    )
+    return response.text
 
-        reply_text = response.text
-        memory.update_chat_history("model", reply_text)
+async def _stream_reply(selected_prompt, contents_list, embed_task=None):
+    sys_instruct = await _system_instruction(selected_prompt, embed_task)
+
+    async for chunk in client_manager.generate_stream(
+        model=Config.MODEL_NAME,
+        contents=contents_list,
+        config=types.GenerateContentConfig(
+            system_instruction=sys_instruct,
+            temperature=0.7
+        )
+    ):
+        if chunk.text:
+            yield chunk.text
 
-        return reply_text
+def _prompt_for(agent_name):
+    return get_news_agent_prompt if agent_name == "NEWS_AGENT" else get_chat_agent_prompt
 
+def _cache_version(agent_name):
+    ranked = bool(Config.MEMORY_RELEVANT_K)
+    return f"{Config.PROMPT_VERSION}:{memory.context_version(_prompt_for(agent_name), ranked)}"
+
+def _start_query_embedding(text_input: str, image_data: str):
+    """
+    Embeds the normalized query in the background -> (embed_task, cache_task)
+    cache_task is the same task when the turn may use the response cache, else None
+    """
+    cacheable = Config.ENABLE_RESPONSE_CACHE and not image_data and response_cache.is_cacheable(text_input)
+    if not cacheable and not Config.MEMORY_RELEVANT_K:
+        return None, None
+    embed_task = asyncio.create_task(get_embedding(response_cache.normalize(text_input)))
+    return embed_task, (embed_task if cacheable else None)
+
+async def _cache_lookup(embed_task, agent_name, router_task, context):
+    """
+    Cached reply for this turn, or None, once the query embedding has resolved.
+    Runs as a task next to generation (_race_cache), so waiting here costs no latency.
+    """
+    # shield: cancelling a lost lookup must not cancel the embedding / router the reply still uses
+    embedding = await asyncio.shield(embed_task)
+    if embedding is None:
+        return None
+    reply = response_cache.lookup(embedding, _cache_version(agent_name), agent_name, context)
+    if reply is not None and router_task is not None:
+        # Looked up under the local guess: only serve it if the LLM router agrees
+        if await asyncio.shield(router_task) != agent_name:
+            return None
+    return reply
+
+async def _race_cache(embed_task, agent_name, router_task, context, work):
+    """
+    Response cache lookup raced against `work` (the generation task).
+    Hit first -> work is cancelled and the cached reply returned; work first -> None.
+    """
+    if embed_task is None or agent_name == "NEWS_AGENT":
+        return None
+    lookup = asyncio.create_task(_cache_lookup(embed_task, agent_name, router_task, context))
+    done, _ = await asyncio.wait({lookup, work}, return_when=asyncio.FIRST_COMPLETED)
+    if lookup not in done:
+        lookup.cancel()
+        response_cache.late += 1
+        return None
+    try:
+        reply = lookup.result()
     except Exception as e:
-        print(f"[Brain Error] {e}")
-        return "Sir, I am experiencing a cognitive glitch."
\ No newline at end of file
+        print(f"[Response Cache Error] {e}")
+        return None
+    if reply is not None:
+        work.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await work
+    return reply
+
+def _cache_store(embed_task, agent_name, reply_text, context):
+    if embed_task is None or agent_name == "NEWS_AGENT" or not embed_task.done():
+        return
+    embedding = embed_task.result()
+    if embedding is not None:
+        response_cache.store(embedding, _cache_version(agent_name), agent_name, reply_text, context)
+
+async def _record_reply(reply_text, conversation_id):
+    await memory.update_chat_history("model", reply_text, conversation_id)
+    history_summarizer.maybe_schedule(conversation_id)
+
+async def _prepare_turn(text_input: str, image_data: str, conversation_id: str):
+    """
+    History + routing + prompt contents shared by ask_jarvis / ask_jarvis_stream
+    -> (agent_name, router_task, contents_list, cache_context)
+    """
+    await memory.update_chat_history("user", text_input, conversation_id)
+
+    # ⚡ Local classifier first (no model round trip)
+    agent_name, confidence = local_router.classify(text_input)
+    router_task = None
+    if confidence < Config.ROUTER_CONFIDENCE:
+        # Parallel Execution: LLM router only for unclear inputs
+        router_task = asyncio.create_task(route_request(text_input))
+    else:
+        print(f"[Router] ⚡ Local Route: {agent_name} ({confidence:.2f})")
+
+    # 🔥 FIX: Memory ကို မစောင့်တော့ပါ (Queued, batched in the background)
+    # Background မှာ သူ့ဘာသာသူ အလုပ်လုပ်နေပါလိမ့်မယ်၊ Latency မထိခိုက်တော့ပါဘူး
+    extract_and_save_memory(text_input)
+
+    contents_list = []
+    if image_data:
+        try:
+            img_str = image_data.split("base64,")[1] if "base64," in image_data else image_data
+            img_bytes = base64.b64decode(img_str)
+            contents_list.append(types.Part.from_bytes(data=img_bytes, mime_type="image/jpeg"))
+        except: pass
+
+    location_context = ""
+    if state.current_gps:
+        location_context = f"\n[SYSTEM DATA: GPS {state.current_gps}]"
+
+    # Newest lines that fit the history budget (older ones are dropped first)
+    history = await memory.get_chat_history(conversation_id)
+    # Lines before this turn (the last one is the input just recorded) scope the response cache
+    cache_context = response_cache.context_key(history[:-1])
+    lines, used = ContextAssembler.fit_lines(history, Config.HISTORY_TOKEN_BUDGET, keep="tail",
+                                              max_line_tokens=Config.HISTORY_LINE_MAX_TOKENS)
+    if Config.CONTEXT_LOG:
+        context_logger.info(f"[Context] 📐 History: {len(lines)}/{len(history)} lines "
+                            f"({used}/{Config.HISTORY_TOKEN_BUDGET} tok)")
+    chat_hist = "\n".join(lines)
+    summary = await memory.get_chat_summary(conversation_id)
+    summary_context = f"\nEARLIER CONVERSATION (SUMMARY):\n{summary}" if summary else ""
+    final_prompt = f"{location_context}{summary_context}\nPREVIOUS CHAT:\n{chat_hist}\nCURRENT INPUT:\n{text_input}"
+    contents_list.append(final_prompt)
+
+    return agent_name, router_task, contents_list, cache_context
+
+async def _reply_for_turn(agent_name, router_task, contents_list, embed_task):
+    """Full reply, speculating on the local guess while the LLM router decides -> (agent_name, text)"""
+    if router_task is None:
+        return agent_name, await _generate_reply(_prompt_for(agent_name), contents_list, embed_task)
+    if not Config.ROUTER_SPECULATE:
+        agent_name = await router_task
+        return agent_name, await _generate_reply(_prompt_for(agent_name), contents_list, embed_task)
+
+    # 🏎️ Speculate on the local guess while the LLM router decides
+    guess = agent_name
+    speculative = asyncio.create_task(_generate_reply(_prompt_for(guess), contents_list, embed_task))
+    try:
+        agent_name = await router_task
+        if _prompt_for(agent_name) is _prompt_for(guess):
+            return agent_name, await speculative
+        print(f"[Router] ↩️ Speculation miss ({guess} -> {agent_name})")
+    finally:
+        speculative.cancel()  # Miss, or this turn was answered from the cache
+    return agent_name, await _generate_reply(_prompt_for(agent_name), contents_list, embed_task)
+
+async def _discard_stream(stream, first):
+    # The generator is still running __anext__ until the cancel lands;
+    # a failure of the discarded stream doesn't matter either
+    if first is not None:
+        first.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await first
+    await stream.aclose()
+
+async def _open_stream(agent_name, router_task, contents_list, embed_task):
+    """
+    Starts the reply stream (speculating on the local guess while the LLM router decides)
+    and pulls its first chunk -> (agent_name, stream, first chunk or None)
+    """
+    stream = first = None
+    try:
+        if router_task is not None and Config.ROUTER_SPECULATE:
+            # 🏎️ Pull the first chunk of the guessed agent while the LLM router decides
+            guess = agent_name
+            stream = _stream_reply(_prompt_for(guess), contents_list, embed_task)
+            first = asyncio.create_task(stream.__anext__())
+            agent_name = await router_task
+            if _prompt_for(agent_name) is not _prompt_for(guess):
+                print(f"[Router] ↩️ Speculation miss ({guess} -> {agent_name})")
+                await _discard_stream(stream, first)
+                stream = first = None
+        elif router_task is not None:
+            agent_name = await router_task
+
+        if stream is None:
+            stream = _stream_reply(_prompt_for(agent_name), contents_list, embed_task)
+            first = asyncio.create_task(stream.__anext__())
+        try:
+            text = await first
+        except StopAsyncIteration:
+            text = None
+        return agent_name, stream, text
+    except BaseException:
+        # Failed, or cancelled because the cache answered: nothing may keep generating
+        if stream is not None:
+            await _discard_stream(stream, first)
+        raise
+
+async def ask_jarvis(text_input: str, image_data: str = None, conversation_id: str = None):
+    with memory_ingest.interactive():
+        try:
+            embed_task, cache_task = _start_query_embedding(text_input, image_data)
+            agent_name, router_task, contents_list, cache_context = await _prepare_turn(
+                text_input, image_data, conversation_id)
+
+            work = asyncio.create_task(_reply_for_turn(agent_name, router_task, contents_list, embed_task))
+            reply_text = await _race_cache(cache_task, agent_name, router_task, cache_context, work)
+            if reply_text is not None:
+                await _record_reply(reply_text, conversation_id)
+                return reply_text
+
+            agent_name, reply_text = await work
+            _cache_store(cache_task, agent_name, reply_text, cache_context)
+            await _record_reply(reply_text, conversation_id)
+
+            return reply_text
+
+        except Exception as e:
+            print(f"[Brain Error] {e}")
+            return "Sir, I am experiencing a cognitive glitch."
+
+async def ask_jarvis_stream(text_input: str, image_data: str = None, conversation_id: str = None):
+    """
+    🌊 STREAMING VARIANT of ask_jarvis
+    Yields text chunks as Gemini produces them; the full reply still lands in chat history.
+    """
+    with memory_ingest.interactive():
+        parts = []
+        stream = opening = cache_task = agent_name = cache_context = None
+        failed = False
+        try:
+            embed_task, cache_task = _start_query_embedding(text_input, image_data)
+            agent_name, router_task, contents_list, cache_context = await _prepare_turn(
+                text_input, image_data, conversation_id)
+
+            opening = asyncio.create_task(_open_stream(agent_name, router_task, contents_list, embed_task))
+            cached = await _race_cache(cache_task, agent_name, router_task, cache_context, opening)
+            if cached is not None:
+                parts.append(cached)
+                yield cached
+                await _record_reply(cached, conversation_id)
+                return
+
+            agent_name, stream, text = await opening
+            if text is not None:
+                parts.append(text)
+                yield text
+
+            async for text in stream:
+                parts.append(text)
+                yield text
+
+        except Exception as e:
+            print(f"[Brain Error] {e}")
+            failed = True
+            if not parts:
+                yield "Sir, I am experiencing a cognitive glitch."
+        finally:
+            if opening is not None and not opening.done():
+                opening.cancel()  # Consumer stopped while the stream was opening
+            if stream is not None:
+                await stream.aclose()
+
+        if parts:
+            reply_text = "".join(parts)
+            if not failed:
+                _cache_store(cache_task, agent_name, reply_text, cache_context)
+            await _record_reply(reply_text, conversation_id)
@@ -0,0 +1,140 @@
+import logging
+import functools
+from app.core.config import Config
+
+# Prompt composition reports (Config.CONTEXT_LOG), shared by memory.py and agent.py
+context_logger = logging.getLogger("JARVIS_CONTEXT")
+
+
+@functools.lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """
+    Cheap token estimate (no tokenizer round trip), cached per text:
+    ~4 chars per token for Latin script, ~1 token per char for Burmese & co.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
+
+
+def clip_tokens(text: str, max_tokens: int, suffix: str = " …") -> str:
+    """Longest prefix of text (+ suffix) within max_tokens, by count_tokens (Burmese costs ~4x Latin per char)"""
+    estimate = count_tokens.__wrapped__  # Uncached: the probed prefixes would only flood the cache
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate(text[:mid] + suffix) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + suffix
+
+
+class Section:
+    """
+    One block of the prompt.
+    - priority: higher survives first when the budget is tight
+    - required: always included (base prompt, real-time data)
+    - trim: "head" keeps the first lines, "tail" keeps the last lines, None = all or nothing
+    """
+
+    def __init__(self, name, text, priority=0, required=False, trim=None, header=""):
+        self.name = name
+        self.text = text or ""
+        self.priority = priority
+        self.required = required
+        self.trim = trim
+        self.header = header
+
+
+class ContextAssembler:
+    """
+    📐 TOKEN-BUDGETED PROMPT ASSEMBLY
+    - Fills the budget by priority; required sections go first
+    - Line-trimmable sections are cut to the space that is left instead of dropped
+    - Sections keep their declared order in the output
+    - last_report: tokens per section, dropped / trimmed sections of the last call
+    """
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.last_report = {}
+
+    @staticmethod
+    def fit_lines(lines, budget, keep="tail", max_line_tokens=None):
+        """Most recent (tail) / most important (head) lines that fit into budget tokens"""
+        picked, used = [], 0
+        ordered = reversed(lines) if keep == "tail" else lines
+        for line in ordered:
+            if max_line_tokens and count_tokens(line) > max_line_tokens:
+                line = clip_tokens(line, max_line_tokens)
+            cost = count_tokens(line)
+            if used + cost > budget:
+                break
+            picked.append(line)
+            used += cost
+        if keep == "tail":
+            picked.reverse()
+        return picked, used
+
+    def assemble(self, sections, budget: int = None):
+        budget = self.budget if budget is None else budget
+        chosen = {}
+        report = {"budget": budget, "sections": {}, "dropped": [], "trimmed": []}
+
+        ranked = sorted(sections, key=lambda s: (not s.required, -s.priority))
+        left = budget
+        for sec in ranked:
+            if not sec.text:
+                continue
+            body = sec.text
+            cost = count_tokens(sec.header) + count_tokens(body)
+            if cost > left and not sec.required:
+                if sec.trim and left > count_tokens(sec.header):
+                    lines, _ = self.fit_lines(body.split("\n"), left - count_tokens(sec.header), keep=sec.trim)
+                    if not lines:
+                        report["dropped"].append(sec.name)
+                        continue
+                    body = "\n".join(lines)
+                    cost = count_tokens(sec.header) + count_tokens(body)
+                    report["trimmed"].append(sec.name)
+                else:
+                    report["dropped"].append(sec.name)
+                    continue
+            chosen[sec.name] = (sec.header + body) if sec.header else body
+            report["sections"][sec.name] = cost
+            left -= cost
+
+        report["used"] = budget - left
+        self.last_report = report
+        text = "\n".join(chosen[s.name] for s in sections if s.name in chosen)
+        return text, report
+
+
+def extend_report(report, name, tokens, budget=None, trimmed=False):
+    """Copy of report with one more section (per-call parts on top of a cached static report)"""
+    extended = {
+        "budget": report["budget"] if budget is None else budget,
+        "sections": dict(report["sections"], **{name: tokens}) if tokens else dict(report["sections"]),
+        "dropped": list(report["dropped"]),
+        "trimmed": list(report["trimmed"]),
+    }
+    if trimmed:
+        extended["trimmed" if tokens else "dropped"].append(name)
+    extended["used"] = sum(extended["sections"].values())
+    return extended
+
+
+def format_report(report) -> str:
+    parts = ", ".join(f"{name}={tokens}" for name, tokens in report["sections"].items())
+    extra = ""
+    if report["trimmed"]:
+        extra += f" trimmed={report['trimmed']}"
+    if report["dropped"]:
+        extra += f" dropped={report['dropped']}"
+    return f"{report['used']}/{report['budget']} tok ({parts}){extra}"
+
+
+# Global Instance
+system_assembler = ContextAssembler(Config.SYSTEM_PROMPT_BUDGET)
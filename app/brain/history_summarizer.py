@@ -0,0 +1,80 @@
+import asyncio
+from google.genai import types
+from app.core.config import Config
+from app.core.genai_client import client_manager
+
+
+class HistorySummarizer:
+    """
+    📝 ROLLING CONVERSATION SUMMARY
+    - Lines that fall out of the raw history window are folded into a running
+      summary once SUMMARY_EVERY of them have piled up (not on every turn)
+    - Runs as a background task, at most one per conversation, never on the reply path
+    - The summary is stored next to the chat buffer and prepended to prompts
+    """
+
+    def __init__(self, memory):
+        self.memory = memory
+        self._tasks = {}  # conversation id -> running task (removed when it finishes)
+
+        # Stats
+        self.runs = 0
+        self.failures = 0
+
+    def maybe_schedule(self, conversation_id=None):
+        if self.memory.sync.history.evicted_count(conversation_id) < Config.SUMMARY_EVERY:
+            return
+        task = self._tasks.get(conversation_id)
+        if task is None or task.done():
+            self._tasks[conversation_id] = asyncio.create_task(self._fold(conversation_id))
+
+    async def _fold(self, conversation_id):
+        try:
+            await self._fold_lines(conversation_id)
+        finally:
+            self._tasks.pop(conversation_id, None)
+
+    async def _fold_lines(self, conversation_id):
+        lines = self.memory.sync.history.take_evicted(conversation_id)
+        if not lines:
+            return
+        previous = await self.memory.get_chat_summary(conversation_id)
+        transcript = "\n".join(lines)
+        prompt = f"""
+        Update the running summary of a conversation between the user and JARVIS.
+
+        CURRENT SUMMARY:
+        {previous or "(empty)"}
+
+        OLDER MESSAGES TO FOLD IN:
+        {transcript}
+
+        RULES:
+        - Keep names, facts, decisions, open questions and the user's goals.
+        - Drop greetings, filler and anything already answered and closed.
+        - At most {Config.SUMMARY_MAX_WORDS} words, plain text, third person.
+
+        OUTPUT ONLY THE NEW SUMMARY.
+        """
+        try:
+            response = await client_manager.generate(
+                model=Config.SUMMARY_MODEL,
+                contents=prompt,
+                config=types.GenerateContentConfig(temperature=0.2)
+            )
+            summary = (response.text or "").strip()
+            if not summary:
+                raise ValueError("empty summary")
+        except Exception as e:
+            self.failures += 1
+            self.memory.sync.history.restore_evicted(conversation_id, lines)
+            print(f"[History Summary Error] {e}")
+            return
+
+        self.runs += 1
+        await self.memory.set_chat_summary(conversation_id, summary)
+        print(f"[Memory] 📝 Folded {len(lines)} old lines into the summary ({len(summary.split())} words)")
+
+    def stats(self):
+        return {"runs": self.runs, "failures": self.failures,
+                "running": sum(1 for t in self._tasks.values() if not t.done())}
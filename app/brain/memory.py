@@ -1,74 +1,289 @@
-import os
 import time
-import json
+import atexit
+import asyncio
+import hashlib
+import threading
+import functools
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pytz
-from upstash_redis import Redis
-from supabase import create_client, Client
+from app.core.config import Config
 from app.brain.prompts import get_chat_agent_prompt
+from app.brain.memory_store import MemoryStore, get_default_store
+from app.brain.vector_index import get_memory_index
+from app.brain.context_assembler import (Section, system_assembler, count_tokens, extend_report, format_report,
+                                         context_logger)
 
-# .env Loading
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
-REDIS_URL = os.environ.get("REDIS_URL")
-REDIS_TOKEN = os.environ.get("REDIS_TOKEN")
+CHAT_BUFFER_KEY = "jarvis_chat_buffer"
+DEFAULT_CONVERSATION = "default"
 
-class MemorySystem:
-    def __init__(self):
-        # 1. Redis Connection
-        try:
-            self.redis = Redis(url=REDIS_URL, token=REDIS_TOKEN)
-            self.redis.set("ping", "pong")
-            print("[Memory] ✅ Redis Cloud Active.")
-        except Exception as e:
-            print(f"[Memory] ⚠️ Redis Connection Failed: {e}")
-            self.redis = None
+class ContextCache:
+    """
+    ⚡ IN-PROCESS CONTEXT CACHE (shared by every MemorySystem instance)
+    - Profile / directives / core memories change a few times a day -> TTL cache
+    - Explicit invalidation when we write (save_core_memory)
+    - Precomposed static prompt per agent prompt, versioned by content hash
+    """
+
+    def __init__(self, ttl: float = Config.MEMORY_CACHE_TTL):
+        self.ttl = ttl
+        self._data = {}     # name -> (value, expires_at)
+        self._static = {}   # prompt func name -> (static prompt text, version hash, assembly report)
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(name)
+            if entry and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            if self._data.get(name, (None,))[0] != value:
+                self._static.clear()  # Source data changed -> recompose prompts
+            self._data[name] = (value, now + self.ttl)
+        return value
+
+    def get_static(self, key):
+        """-> (static prompt text, assembly report), (None, None) if not composed"""
+        with self._lock:
+            entry = self._static.get(key)
+            return (entry[0], entry[2]) if entry else (None, None)
+
+    def set_static(self, key, text, report=None):
+        with self._lock:
+            self._static[key] = (text, hashlib.sha1(text.encode("utf-8")).hexdigest()[:10], report)
+
+    def version(self, key):
+        with self._lock:
+            entry = self._static.get(key)
+            return entry[1] if entry else None
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._data.clear()
+            else:
+                self._data.pop(name, None)
+            self._static.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+context_cache = ContextCache()
+
+
+class ChatHistoryBuffer:
+    """
+    💬 PER-CONVERSATION HISTORY (write-behind)
+    - Each conversation id gets its own in-process deque (no cross-talk)
+    - Lazily rehydrated from the store on first access
+    - New lines are batched and flushed in one pipelined call, off the critical path
+    - Lines pushed out of the window are kept aside for the rolling summary and
+      flushed to the store's evicted list (a restart before the next fold loses nothing)
+    - Per-session conversations expire in the store after HISTORY_TTL idle seconds;
+      in process only the HISTORY_MAX_CONVERSATIONS most recent ones are kept (LRU)
+    """
+
+    def __init__(self, store: MemoryStore, max_len: int = Config.HISTORY_MAX_LEN,
+                 max_conversations: int = Config.HISTORY_MAX_CONVERSATIONS):
+        self.store = store
+        self.max_len = max_len
+        self.max_conversations = max_conversations
+        self._convs = OrderedDict()  # store key -> deque (least recently used first)
+        self._pending = {}  # store key -> [msg, ...] not yet flushed
+        self._evicted = {}  # store key -> [msg, ...] fell out of the window, not summarized yet
+        self._pending_evicted = {}  # store key -> [msg, ...] evicted lines not yet flushed
+        self._folding = {}  # store key -> evicted lines taken by a running summary fold
+        self._summaries = {}  # store key -> running summary text
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def key_for(conversation_id=None):
+        # Default conversation keeps the legacy Redis key (existing history survives)
+        if conversation_id in (None, DEFAULT_CONVERSATION):
+            return CHAT_BUFFER_KEY
+        return f"{CHAT_BUFFER_KEY}:{conversation_id}"
+
+    @staticmethod
+    def ttl_for(key):
+        return None if key == CHAT_BUFFER_KEY else Config.HISTORY_TTL
+
+    def is_loaded(self, conversation_id=None):
+        return self.key_for(conversation_id) in self._convs
+
+    def _touch(self, key):
+        """Marks key as recently used and drops the oldest idle conversations (caller holds the lock)"""
+        self._convs.move_to_end(key)
+        if len(self._convs) <= self.max_conversations:
+            return
+        for old in list(self._convs):
+            if len(self._convs) <= self.max_conversations:
+                break
+            # Unflushed lines, running folds and the legacy buffer stay; the rest rehydrates from the store
+            if old in (key, CHAT_BUFFER_KEY) or old in self._pending or old in self._pending_evicted \
+                    or old in self._folding:
+                continue
+            del self._convs[old]
+            self._summaries.pop(old, None)
+            self._evicted.pop(old, None)
 
-        # 2. Supabase Connection
+    def hydrate(self, conversation_id=None):
+        key = self.key_for(conversation_id)
+        if key in self._convs:
+            return
+        remote, stored_evicted, summary = [], [], ""
+        if self.store.has_history:
+            try:
+                remote = self.store.history_range(key)
+                stored_evicted = self.store.evicted_range(key)
+                summary = self.store.summary_get(key)
+            except Exception as e:
+                print(f"[History Load Error] {e}")
+        with self._lock:
+            # Another thread may have hydrated meanwhile; keep the first one
+            if key in self._convs:
+                return
+            # Stored lists can be longer than the window (older, larger limits):
+            # the overflow goes to the rolling summary instead of being dropped
+            overflow = remote[:-self.max_len] if len(remote) > self.max_len else []
+            if overflow:
+                self._pending_evicted[key] = overflow + self._pending_evicted.get(key, [])
+            if stored_evicted or overflow:
+                self._evicted[key] = stored_evicted + overflow + self._evicted.get(key, [])
+            self._convs[key] = deque(remote, maxlen=self.max_len)
+            self._summaries.setdefault(key, summary)
+            self._touch(key)
+
+    def append(self, conversation_id, msg):
+        """In-memory only (call hydrate() first); flushed later by flush()"""
+        key = self.key_for(conversation_id)
+        with self._lock:
+            window = self._convs.setdefault(key, deque(maxlen=self.max_len))
+            if len(window) == window.maxlen:
+                self._evicted.setdefault(key, []).append(window[0])
+                self._pending_evicted.setdefault(key, []).append(window[0])
+            window.append(msg)
+            self._pending.setdefault(key, []).append(msg)
+            self._touch(key)
+            return sum(len(v) for v in self._pending.values())
+
+    def get(self, conversation_id=None):
+        with self._lock:
+            return list(self._convs.get(self.key_for(conversation_id), ()))
+
+    # --- ROLLING SUMMARY ---
+    def evicted_count(self, conversation_id=None):
+        with self._lock:
+            return len(self._evicted.get(self.key_for(conversation_id), ()))
+
+    def take_evicted(self, conversation_id=None):
+        """Lines for a summary fold; set_summary() drops them from the store, restore_evicted() puts them back"""
+        key = self.key_for(conversation_id)
+        with self._lock:
+            lines = self._evicted.pop(key, [])
+            if lines:
+                self._folding[key] = len(lines)
+            return lines
+
+    def restore_evicted(self, conversation_id, lines):
+        """Summarization failed -> lines go back in front of newer evictions"""
+        key = self.key_for(conversation_id)
+        with self._lock:
+            self._folding.pop(key, None)
+            self._evicted[key] = lines + self._evicted.get(key, [])
+
+    def get_summary(self, conversation_id=None):
+        with self._lock:
+            return self._summaries.get(self.key_for(conversation_id), "")
+
+    def set_summary(self, conversation_id, summary):
+        key = self.key_for(conversation_id)
+        with self._lock:
+            self._summaries[key] = summary
+            folded = self._folding.pop(key, 0)
+            unflushed = key in self._pending_evicted
+        if self.store.has_history:
+            try:
+                if unflushed:
+                    self.flush()  # Folded lines must be in the store before they are trimmed off it
+                self.store.summary_set(key, summary, self.ttl_for(key), folded)
+            except Exception as e:
+                print(f"[History Summary Save Error] {e}")
+
+    def flush(self):
+        with self._lock:
+            batch, self._pending = self._pending, {}
+            evicted, self._pending_evicted = self._pending_evicted, {}
+        if not (batch or evicted) or not self.store.has_history:
+            return
         try:
-            self.supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-            self.supabase.table("users").select("role").limit(1).execute()
-            print("[Memory] ✅ Supabase Neural Net Active (Ping Success).")
+            ttl = {key: self.ttl_for(key) for key in {**batch, **evicted}}
+            self.store.history_push_batch(batch, self.max_len, ttl, evicted)
         except Exception as e:
-            print(f"[Memory] ⚠️ Supabase Connection Failed: {e}")
-            self.supabase = None
+            print(f"[History Flush Error] {e}")
+            with self._lock:
+                # Put the lines back in front of anything newer
+                for key, msgs in batch.items():
+                    self._pending[key] = (msgs + self._pending.get(key, []))[-self.max_len:]
+                for key, msgs in evicted.items():
+                    self._pending_evicted[key] = msgs + self._pending_evicted.get(key, [])
 
-    # --- HISTORY (Redis) ---
-    def update_chat_history(self, role, text):
-        if not self.redis: return
-        try:
-            msg = f"{role}: {text}"
-            self.redis.rpush("jarvis_chat_buffer", msg)
-            self.redis.ltrim("jarvis_chat_buffer", -30, -1) 
-        except: pass
 
-    def get_chat_history(self):
-        if not self.redis: return []
-        try:
-            raw = self.redis.lrange("jarvis_chat_buffer", 0, -1)
-            return [msg.decode('utf-8') if isinstance(msg, bytes) else msg for msg in raw]
-        except: return []
+class MemorySystem:
+    """
+    Sync memory API on top of a pluggable MemoryStore
+    (CloudStore = Upstash + Supabase, LocalStore = SQLite). Use AsyncMemorySystem from async code.
+    """
+
+    def __init__(self, store: MemoryStore = None):
+        self.store = store or get_default_store()
+        self.history = ChatHistoryBuffer(self.store)
+        self.index = get_memory_index(self.store)
+
+    # --- HISTORY (Local buffer, write-behind to Redis) ---
+    def update_chat_history(self, role, text, conversation_id=None):
+        self.history.hydrate(conversation_id)
+        pending = self.history.append(conversation_id, f"{role}: {text}")
+        if pending >= Config.HISTORY_FLUSH_BATCH:
+            self.history.flush()
+
+    def get_chat_history(self, conversation_id=None):
+        self.history.hydrate(conversation_id)
+        return self.history.get(conversation_id)
 
     # --- DATABASE FETCHING ---
     def get_user_profile(self):
-        if not self.supabase: return {}
+        if not self.store.has_database: return {}
         try:
-            res = self.supabase.table("users").select("*").eq("role", "master").execute()
-            return res.data[0] if res.data else {}
+            return self.store.fetch_user_profile()
         except: return {}
 
     def get_active_directives(self):
-        if not self.supabase: return []
+        if not self.store.has_database: return []
         try:
-            res = self.supabase.table("directives").select("protocol_name, description").eq("is_active", True).execute()
-            return res.data if res.data else []
+            return self.store.fetch_directives()
         except: return []
 
     def get_core_memories(self):
-        if not self.supabase: return []
+        if not self.store.has_database: return []
         try:
-            res = self.supabase.table("memories").select("category, content").gte("importance_level", 7).execute()
-            return res.data if res.data else []
+            return self.store.fetch_core_memories(7)
         except: return []
 
     # --- VECTOR SEARCH (NEW FEATURE) ---
@@ -77,30 +292,39 @@ class MemorySystem:
         Database ထဲမှာ အဓိပ္ပါယ်ဆင်တူတဲ့ Memory ရှိမရှိ Vector နဲ့ ရှာမယ်။
         threshold 0.85 ဆိုတာ ၈၅% လောက် အဓိပ္ပါယ်တူမှ ဖော်ပြမယ်လို့ ဆိုလိုတာပါ။
         """
-        if not self.supabase: return []
+        if not self.store.has_database: return []
         try:
-            params = {
-                "query_embedding": embedding_vector,
-                "match_threshold": threshold,
-                "match_count": 1 # အတူဆုံး တစ်ခုရှိရင် တော်ပြီ (Duplicate စစ်ဖို့မို့လို့)
-            }
-            # Supabase RPC (Remote Procedure Call) to verify
-            res = self.supabase.rpc("match_memories", params).execute()
-            return res.data if res.data else []
+            # အတူဆုံး တစ်ခုရှိရင် တော်ပြီ (Duplicate စစ်ဖို့မို့လို့)
+            if self.index.ensure_loaded():
+                return self.index.search(embedding_vector, 1, threshold)
+            return self.store.match_memories(embedding_vector, threshold, 1)
         except Exception as e:
             print(f"[Vector Search Error] {e}")
             return []
 
+    def relevant_memories(self, query_embedding, k=Config.MEMORY_RELEVANT_K, threshold=Config.MEMORY_RELEVANT_MIN):
+        """Memories ranked by relevance to the current query (local index, no RPC)"""
+        if not self.store.has_database or not self.index.ensure_loaded(): return []
+        return self.index.search(query_embedding, k, threshold)
+
+    def _prompt_memories(self, relevant):
+        """
+        Ranked mode memory block -> (header, memories)
+        - Core memories the index can't rank (saved without an embedding) always go in
+        - Nothing clears MEMORY_RELEVANT_MIN -> the importance-ranked core bank instead
+        """
+        core = context_cache.get("core_memories", self.get_core_memories)
+        if not relevant:
+            return "[CORE MEMORY BANK]", core
+        unranked = [m for m in core if m["content"] not in self.index]
+        return "[RELEVANT MEMORIES]", unranked + relevant
+
     # --- CONTEXT BUILDER ---
-    def build_system_instruction(self, selected_prompt_func=None):
-        if selected_prompt_func:
-            base_prompt = selected_prompt_func()
-        else:
-            base_prompt = get_chat_agent_prompt()
-        
-        user = self.get_user_profile()
-        directives = self.get_active_directives()
-        memories = self.get_core_memories()
+    def _compose_static_context(self, base_prompt, include_memories=True):
+        """Everything except the real-time block (cached until data changes) -> (text, assembly report)"""
+        user = context_cache.get("user_profile", self.get_user_profile)
+        directives = context_cache.get("directives", self.get_active_directives)
+        memories = context_cache.get("core_memories", self.get_core_memories) if include_memories else []
 
         bio_json = user.get('biometrics', {})
         pref_json = user.get('preferences', {})
@@ -115,8 +339,77 @@ class MemorySystem:
         """
 
         protocol_str = "\n".join([f"- {d['protocol_name']}: {d['description']}" for d in directives])
-        memory_str = "\n".join([f"- [{m['category'].upper()}] {m['content']}" for m in memories])
 
+        # Budgeted: base prompt always, then profile > protocols > memories
+        sections = [
+            Section("base", f"\n        {base_prompt}", required=True),
+            Section("profile", user_context, priority=80),
+            Section("protocols", protocol_str, priority=70, trim="head", header="        [ACTIVE PROTOCOLS]\n"),
+        ]
+        if include_memories:
+            sections.append(Section("core_memories", self._format_memories(memories), priority=60, trim="head",
+                                    header="        [CORE MEMORY BANK]\n"))
+        return system_assembler.assemble(sections, Config.SYSTEM_PROMPT_BUDGET - Config.REALTIME_RESERVE)
+
+    @staticmethod
+    def _format_memories(memories):
+        return "\n".join([f"- [{(m.get('category') or 'fact').upper()}] {m['content']}" for m in memories])
+
+    def _static_key(self, prompt_func, ranked=False):
+        return f"{prompt_func.__name__}:ranked" if ranked else prompt_func.__name__
+
+    def build_system_instruction(self, selected_prompt_func=None, query_embedding=None, include_realtime=True):
+        """
+        query_embedding given -> only the memories most relevant to this query
+        (MEMORY_RELEVANT_K, local vector index) instead of the whole core bank
+        include_realtime=False -> static part only (pre-warmed Live sockets send
+        realtime_block() as their first turn instead, so the clock is never stale)
+        """
+        prompt_func = selected_prompt_func or get_chat_agent_prompt
+        relevant = None
+        if query_embedding is not None and Config.MEMORY_RELEVANT_K and self.store.has_database \
+                and self.index.ensure_loaded():
+            relevant = self.relevant_memories(query_embedding)
+        cache_key = self._static_key(prompt_func, ranked=relevant is not None)
+
+        # Keep TTLs ticking even when the static text is already composed
+        for name, loader in (("user_profile", self.get_user_profile),
+                             ("directives", self.get_active_directives),
+                             ("core_memories", self.get_core_memories)):
+            context_cache.get(name, loader)
+
+        static_context, report = context_cache.get_static(cache_key)
+        if static_context is None:
+            static_context, report = self._compose_static_context(prompt_func(), include_memories=relevant is None)
+            context_cache.set_static(cache_key, static_context, report)
+        if relevant is not None:
+            # Ranked memories fill what the static part left of the budget (most relevant first)
+            header, memories = self._prompt_memories(relevant)
+            room = Config.SYSTEM_PROMPT_BUDGET - Config.REALTIME_RESERVE - count_tokens(static_context)
+            lines, used = system_assembler.fit_lines(self._format_memories(memories).split("\n"), room, keep="head") \
+                if memories else ([], 0)
+            if lines:
+                static_context += f"\n        {header}\n" + "\n".join(lines)
+            report = extend_report(report, "memories", used, trimmed=len(lines) < len(memories))
+
+        if not include_realtime:
+            self._log_composition(cache_key, report)
+            return static_context
+
+        # Only the real-time block is spliced in per call
+        realtime = self.realtime_block()
+        self._log_composition(cache_key, extend_report(report, "realtime", count_tokens(realtime),
+                                                       budget=Config.SYSTEM_PROMPT_BUDGET))
+        return f"""{static_context}
+        {realtime}"""
+
+    @staticmethod
+    def _log_composition(cache_key, report):
+        if Config.CONTEXT_LOG:
+            context_logger.info(f"[Context] 📐 System prompt ({cache_key}): {format_report(report)}")
+
+    @staticmethod
+    def realtime_block():
         try:
             tz_MM = pytz.timezone('Asia/Yangon') 
             now = datetime.now(tz_MM)
@@ -126,23 +419,22 @@ class MemorySystem:
             current_time = datetime.now().strftime("%I:%M %p")
             current_date = datetime.now().strftime("%Y-%m-%d")
 
-        full_context = f"""
-        {base_prompt}
-        {user_context}
-        [ACTIVE PROTOCOLS]
-        {protocol_str}
-        [CORE MEMORY BANK]
-        {memory_str}
-        [REAL-TIME SYSTEM DATA]
+        return f"""[REAL-TIME SYSTEM DATA]
         - Location: Myanmar (Yangon Time)
         - Date: {current_date}
         - Current Time: {current_time} 
         """
-        return full_context
+
+    def context_version(self, selected_prompt_func=None, ranked=False):
+        """Hash of the composed static prompt (None if not composed / invalidated)"""
+        return context_cache.version(self._static_key(selected_prompt_func or get_chat_agent_prompt, ranked))
+
+    def cache_stats(self):
+        return context_cache.stats()
 
     # --- SAVE WITH VECTOR ---
     def save_core_memory(self, content, category="user_defined", tags=None, embedding=None):
-        if not self.supabase: return False 
+        if not self.store.has_database: return False 
         try:
             safe_tags = []
             if isinstance(tags, list): safe_tags = [str(t) for t in tags if t]
@@ -159,9 +451,115 @@ class MemorySystem:
             if embedding:
                 data["embedding"] = embedding
 
-            self.supabase.table("memories").insert(data).execute()
+            memory_id = self.store.insert_memory(data)
+            self.index.add(content, category, embedding, memory_id)
+            context_cache.invalidate("core_memories")
             print(f"[Memory] 💾 Saved: {content} | Vector: {'✅' if embedding else '❌'}")
             return True
         except Exception as e:
             print(f"[Memory Save Error] {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+class MemoryMetrics:
+    """Per-call latency stats for the async memory API"""
+
+    def __init__(self):
+        self._ops = {}  # name -> [count, total_ms, max_ms]
+        self._lock = threading.Lock()
+
+    def record(self, name, elapsed_ms):
+        with self._lock:
+            op = self._ops.setdefault(name, [0, 0.0, 0.0])
+            op[0] += 1
+            op[1] += elapsed_ms
+            op[2] = max(op[2], elapsed_ms)
+
+    def stats(self):
+        with self._lock:
+            return {
+                name: {"calls": c, "avg_ms": round(t / c, 1), "max_ms": round(m, 1)}
+                for name, (c, t, m) in self._ops.items()
+            }
+
+
+class AsyncMemorySystem:
+    """
+    ⚡ NON-BLOCKING MEMORY API
+    Same methods as MemorySystem, but awaitable: every store call runs on a
+    bounded, shared IO pool so a slow Supabase/Redis response never stalls
+    the event loop that is pacing WebRTC audio.
+    """
+
+    _executor = ThreadPoolExecutor(max_workers=Config.MEMORY_IO_WORKERS, thread_name_prefix="memory-io")
+    metrics = MemoryMetrics()
+
+    def __init__(self, store: MemoryStore = None):
+        self.sync = MemorySystem(store)
+        self._flush_task = None
+
+    async def _run(self, name, func, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            self.metrics.record(name, (time.perf_counter() - started) * 1000)
+
+    # --- HISTORY: local deque on the hot path, Redis only on first load + write-behind ---
+    async def _ensure_history(self, conversation_id):
+        if not self.sync.history.is_loaded(conversation_id):
+            await self._run("hydrate_history", self.sync.history.hydrate, conversation_id)
+
+    async def update_chat_history(self, role, text, conversation_id=None):
+        await self._ensure_history(conversation_id)
+        self.sync.history.append(conversation_id, f"{role}: {text}")
+        self._schedule_flush()
+
+    async def get_chat_history(self, conversation_id=None):
+        await self._ensure_history(conversation_id)
+        return self.sync.history.get(conversation_id)
+
+    async def get_chat_summary(self, conversation_id=None):
+        await self._ensure_history(conversation_id)
+        return self.sync.history.get_summary(conversation_id)
+
+    async def set_chat_summary(self, conversation_id, summary):
+        await self._run("set_chat_summary", self.sync.history.set_summary, conversation_id, summary)
+
+    def _schedule_flush(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        # Debounce: everything appended during the interval goes out in one pipeline
+        await asyncio.sleep(Config.HISTORY_FLUSH_INTERVAL)
+        await self.flush_history()
+
+    async def flush_history(self):
+        await self._run("flush_history", self.sync.history.flush)
+
+    async def search_similar_memories(self, embedding_vector, threshold=0.85):
+        return await self._run("search_similar_memories", self.sync.search_similar_memories, embedding_vector, threshold)
+
+    async def build_system_instruction(self, selected_prompt_func=None, query_embedding=None, include_realtime=True):
+        return await self._run("build_system_instruction", self.sync.build_system_instruction,
+                               selected_prompt_func, query_embedding, include_realtime)
+
+    def realtime_block(self):
+        return self.sync.realtime_block()
+
+    async def relevant_memories(self, query_embedding, k=Config.MEMORY_RELEVANT_K):
+        return await self._run("relevant_memories", self.sync.relevant_memories, query_embedding, k)
+
+    async def save_core_memory(self, content, category="user_defined", tags=None, embedding=None):
+        return await self._run("save_core_memory", self.sync.save_core_memory, content, category, tags, embedding)
+
+    def context_version(self, selected_prompt_func=None, ranked=False):
+        return self.sync.context_version(selected_prompt_func, ranked)
+
+    def cache_stats(self):
+        return self.sync.cache_stats()
+
+    def latency_stats(self):
+        return self.metrics.stats()
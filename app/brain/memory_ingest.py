@@ -0,0 +1,250 @@
+import json
+import asyncio
+import logging
+from collections import deque
+from contextlib import contextmanager
+import numpy as np
+from google.genai import types
+from app.core.config import Config
+from app.core.genai_client import client_manager
+
+logger = logging.getLogger("JARVIS_MEMORY_INGEST")
+
+EMBED_MODEL = "models/text-embedding-004"
+
+
+def clean_json_text(text: str) -> str:
+    if not text: return "{}"
+    text = text.strip()
+    if text.startswith("```json"): text = text[7:]
+    elif text.startswith("```"): text = text[3:]
+    if text.endswith("```"): text = text[:-3]
+    return text.strip()
+
+
+class MemoryIngestWorker:
+    """
+    🧠 BACKGROUND MEMORY INGEST (replaces per-message fire & forget)
+    - submit() only appends to a bounded queue (oldest utterance dropped when full)
+    - Utterances are debounced and batched: one extraction call per batch,
+      one batched embedding request, in-batch dedup + one redundancy judge call
+    - At most MEMORY_INGEST_CONCURRENCY batches in flight, and model calls wait
+      while interactive turns are running (up to MEMORY_INGEST_MAX_DEFER seconds)
+    """
+
+    def __init__(self, memory, max_queue: int = Config.MEMORY_INGEST_QUEUE_MAX,
+                 batch_size: int = Config.MEMORY_INGEST_BATCH):
+        self.memory = memory
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self._queue = deque()
+        self._wakeup = None
+        self._idle = None
+        self._slots = None
+        self._task = None
+        self._active_turns = 0
+
+        # Stats
+        self.queued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.batches = 0
+        self.saved = 0
+        self.redundant = 0
+        self.failed = 0
+
+    # --- PUBLIC API ---
+    def submit(self, text: str):
+        """Queue an utterance for extraction (never blocks the caller)"""
+        if not text or not text.strip():
+            return
+        self._ensure_started()
+        if len(self._queue) >= self.max_queue:
+            self._queue.popleft()
+            self.dropped += 1
+        self._queue.append(text)
+        self.queued += 1
+        self._wakeup.set()
+
+    @contextmanager
+    def interactive(self):
+        """Marks a foreground turn; ingest model calls wait until none are running"""
+        self._ensure_started()
+        self._active_turns += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active_turns -= 1
+            if self._active_turns == 0:
+                self._idle.set()
+
+    def stats(self):
+        return {
+            "pending": len(self._queue),
+            "queued": self.queued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "saved": self.saved,
+            "redundant": self.redundant,
+            "failed": self.failed,
+        }
+
+    # --- WORKER ---
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            if self._active_turns == 0:
+                self._idle.set()
+            self._slots = asyncio.Semaphore(Config.MEMORY_INGEST_CONCURRENCY)
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            # Debounce: let a burst of messages land in the same batch
+            if len(self._queue) < self.batch_size:
+                await asyncio.sleep(Config.MEMORY_INGEST_DEBOUNCE)
+
+            while self._queue:
+                await self._slots.acquire()
+                batch = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                if not batch:
+                    self._slots.release()
+                    break
+                task = asyncio.create_task(self._process(batch))
+                task.add_done_callback(lambda _: self._slots.release())
+
+    async def _yield_to_interactive(self):
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=Config.MEMORY_INGEST_MAX_DEFER)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _generate_json(self, model, prompt):
+        await self._yield_to_interactive()
+        response = await client_manager.generate(
+            model=model,
+            contents=prompt,
+            config=types.GenerateContentConfig(response_mime_type="application/json")
+        )
+        return json.loads(clean_json_text(response.text))
+
+    async def _process(self, batch):
+        self.batches += 1
+        try:
+            facts = await self._extract(batch)
+            if facts:
+                vectors = await self._embed([f["content"] for f in facts])
+                facts, vectors = self._dedup_batch(facts, vectors)
+                facts, vectors = await self._drop_redundant(facts, vectors)
+                for fact, vector in zip(facts, vectors):
+                    tags = fact.get("tags")
+                    if tags is None: tags = []
+                    elif isinstance(tags, str): tags = [t.strip() for t in tags.split(",")]
+                    if await self.memory.save_core_memory(fact["content"], fact.get("category"), tags,
+                                                          embedding=vector):
+                        self.saved += 1
+        except Exception as e:
+            self.failed += 1
+            print(f"[Memory Extraction Error] {e}")
+        finally:
+            self.processed += len(batch)
+
+    # --- PIPELINE STEPS ---
+    async def _extract(self, batch):
+        """Step 1: one extraction call for every utterance in the batch"""
+        numbered = "\n".join(f"{i + 1}. \"{text}\"" for i, text in enumerate(batch))
+        analysis_prompt = f"""
+        Analyze these user messages:
+        {numbered}
+        Check if the user mentioned any Personal Fact, Preference, Plan, or Relationship info.
+
+        ⛔ NEGATIVE CONSTRAINTS (DO NOT SAVE):
+        - Do NOT save questions.
+        - Do NOT save commands.
+        - Do NOT save casual chat.
+
+        CORE INSTRUCTION:
+        1. Extract each fact (one entry per distinct fact, may be none).
+        2. Categorize it (preference/fact/plan).
+        3. GENERATE 3 SMART TAGS (keywords) as a JSON Array.
+
+        OUTPUT ONLY JSON format:
+        {{ "facts": [ {{ "category": "fact", "content": "...", "tags": [...] }} ] }}
+        """
+        result = await self._generate_json(Config.MODEL_NAME, analysis_prompt)
+        facts = result.get("facts") if isinstance(result, dict) else None
+        return [f for f in (facts or []) if isinstance(f, dict) and f.get("content")]
+
+    async def _embed(self, texts):
+        """Step 2: one batched embedding request (None per text on failure)"""
+        await self._yield_to_interactive()
+        try:
+            result = await client_manager.embed(model=EMBED_MODEL, contents=texts)
+            return [e.values for e in result.embeddings]
+        except Exception as e:
+            print(f"[Embedding Error] {e}")
+            return [None] * len(texts)
+
+    @staticmethod
+    def _dedup_batch(facts, vectors):
+        """Step 3a: near-duplicate facts inside the batch -> keep the first"""
+        kept_facts, kept_vectors, kept_units = [], [], []
+        for fact, vector in zip(facts, vectors):
+            if vector is not None:
+                unit = np.asarray(vector, dtype=np.float32)
+                unit /= np.linalg.norm(unit) + 1e-9
+                if any(float(unit @ other) >= Config.MEMORY_INGEST_DEDUP for other in kept_units):
+                    continue
+                kept_units.append(unit)
+            kept_facts.append(fact)
+            kept_vectors.append(vector)
+        return kept_facts, kept_vectors
+
+    async def _drop_redundant(self, facts, vectors):
+        """Step 3b: one AI judge call for every fact that has related stored memories"""
+        searches = await asyncio.gather(*[
+            self.memory.search_similar_memories(v, threshold=0.65) if v else asyncio.sleep(0, result=[])
+            for v in vectors
+        ])
+        related = {
+            i: [m['content'] for m in similar]
+            for i, similar in enumerate(searches) if similar
+        }
+        if not related:
+            return facts, vectors
+
+        print(f"[Brain] 🧐 Checking for logic redundancy ({len(related)} candidates)...")
+        candidates = [
+            {"id": i, "new_memory": facts[i]["content"], "existing_related_memories": existing}
+            for i, existing in related.items()
+        ]
+        validation_prompt = f"""
+        I need to decide whether to save NEW memories to the database.
+
+        CANDIDATES: {json.dumps(candidates, ensure_ascii=False)}
+
+        RULE:
+        - If a NEW memory is already implied or covered by its EXISTING memories, it is redundant.
+        - Example: If existing is "Wife name is Sarah", and new is "I have a wife", it is REDUNDANT.
+        - If the NEW memory adds specific details not present before, it is not redundant.
+
+        OUTPUT JSON ONLY: {{ "redundant_ids": [ids], "reason": "short explanation" }}
+        """
+        try:
+            result = await self._generate_json("gemini-2.5-flash", validation_prompt)
+            redundant = {int(i) for i in result.get("redundant_ids", [])}
+        except Exception as e:
+            print(f"[Memory Extraction Error] Judge failed: {e}")
+            redundant = set()
+
+        if redundant:
+            self.redundant += len(redundant)
+            print(f"[Brain] 🗑️ Skipped Redundant Info: {result.get('reason')}")
+        keep = [i for i in range(len(facts)) if i not in redundant]
+        return [facts[i] for i in keep], [vectors[i] for i in keep]
@@ -0,0 +1,326 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+from app.core.config import Config
+
+# .env Loading
+SUPABASE_URL = os.environ.get("SUPABASE_URL")
+SUPABASE_KEY = os.environ.get("SUPABASE_KEY")
+REDIS_URL = os.environ.get("REDIS_URL")
+REDIS_TOKEN = os.environ.get("REDIS_TOKEN")
+
+
+class MemoryStore(ABC):
+    """
+    🗄️ STORAGE BACKEND INTERFACE (used by MemorySystem)
+    - history_*: short-term chat buffers, one list per conversation (Redis list semantics)
+    - summary_*: rolling summary of turns that fell out of a chat buffer
+      (ttl: seconds until an idle buffer + its summary expire; None = keep)
+    - evicted_*: lines that left a chat buffer but are not in the summary yet
+      (kept next to it so a restart doesn't lose them)
+    - fetch_* / match_memories / insert_memory: long-term memory (Supabase semantics)
+    All methods are synchronous; MemorySystem's async API runs them on its IO pool.
+    A backend missing any of them fails at construction, not in the middle of a turn.
+    """
+    name = "base"
+    has_history = False
+    has_database = False
+
+    @abstractmethod
+    def history_push_batch(self, batch: dict, max_len: int, ttl: dict = None, evicted: dict = None):
+        """
+        batch / evicted: {key: [msg, ...]} appended to the buffers / their evicted lists
+        ttl: {key: seconds} for the keys that expire (refreshed on every push)
+        """
+
+    @abstractmethod
+    def history_range(self, key: str) -> list: ...
+
+    @abstractmethod
+    def evicted_range(self, key: str) -> list: ...
+
+    @abstractmethod
+    def summary_get(self, key: str) -> str: ...
+
+    @abstractmethod
+    def summary_set(self, key: str, summary: str, ttl: int = None, folded: int = 0):
+        """folded: oldest evicted lines now covered by the summary (dropped together with the write)"""
+
+    @abstractmethod
+    def fetch_user_profile(self) -> dict: ...
+
+    @abstractmethod
+    def fetch_directives(self) -> list: ...
+
+    @abstractmethod
+    def fetch_core_memories(self, min_importance: int) -> list: ...
+
+    @abstractmethod
+    def match_memories(self, embedding, threshold: float, count: int) -> list: ...
+
+    @abstractmethod
+    def fetch_memory_vectors(self, after_id=None) -> list:
+        """Memories with an embedding (only ids > after_id when given)"""
+
+    @abstractmethod
+    def insert_memory(self, data: dict):
+        """-> new row id (or None)"""
+
+
+class CloudStore(MemoryStore):
+    """Upstash Redis (history) + Supabase (profile, directives, memories, vectors)"""
+    name = "cloud"
+
+    def __init__(self):
+        from upstash_redis import Redis
+        from supabase import create_client
+
+        # 1. Redis Connection
+        try:
+            self.redis = Redis(url=REDIS_URL, token=REDIS_TOKEN)
+            self.redis.set("ping", "pong")
+            print("[Memory] ✅ Redis Cloud Active.")
+        except Exception as e:
+            print(f"[Memory] ⚠️ Redis Connection Failed: {e}")
+            self.redis = None
+
+        # 2. Supabase Connection
+        try:
+            self.supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+            self.supabase.table("users").select("role").limit(1).execute()
+            print("[Memory] ✅ Supabase Neural Net Active (Ping Success).")
+        except Exception as e:
+            print(f"[Memory] ⚠️ Supabase Connection Failed: {e}")
+            self.supabase = None
+
+        self.has_history = self.redis is not None
+        self.has_database = self.supabase is not None
+
+    # --- HISTORY (Redis) ---
+    def history_push_batch(self, batch, max_len, ttl=None, evicted=None):
+        """{key: [msg, ...]} -> one pipelined round trip for every conversation"""
+        ttl, evicted = ttl or {}, evicted or {}
+        pipe = self.redis.pipeline()
+        for key in {**batch, **evicted}:
+            if batch.get(key):
+                pipe.rpush(key, *batch[key])
+                pipe.ltrim(key, -max_len, -1)
+            if evicted.get(key):
+                pipe.rpush(f"{key}:evicted", *evicted[key])
+            if ttl.get(key):
+                for name in (key, f"{key}:summary", f"{key}:evicted"):
+                    pipe.expire(name, ttl[key])
+        pipe.exec()
+
+    @staticmethod
+    def _decode_list(raw):
+        return [msg.decode('utf-8') if isinstance(msg, bytes) else msg for msg in raw]
+
+    def history_range(self, key):
+        return self._decode_list(self.redis.lrange(key, 0, -1))
+
+    def evicted_range(self, key):
+        return self._decode_list(self.redis.lrange(f"{key}:evicted", 0, -1))
+
+    def summary_get(self, key):
+        value = self.redis.get(f"{key}:summary")
+        return value.decode('utf-8') if isinstance(value, bytes) else (value or "")
+
+    def summary_set(self, key, summary, ttl=None, folded=0):
+        pipe = self.redis.pipeline()
+        pipe.set(f"{key}:summary", summary, ex=ttl)
+        if folded:
+            pipe.ltrim(f"{key}:evicted", folded, -1)
+        pipe.exec()
+
+    # --- DATABASE (Supabase) ---
+    def fetch_user_profile(self):
+        res = self.supabase.table("users").select("*").eq("role", "master").execute()
+        return res.data[0] if res.data else {}
+
+    def fetch_directives(self):
+        res = self.supabase.table("directives").select("protocol_name, description").eq("is_active", True).execute()
+        return res.data if res.data else []
+
+    def fetch_core_memories(self, min_importance):
+        res = self.supabase.table("memories").select("category, content").gte("importance_level", min_importance) \
+            .order("importance_level", desc=True).execute()
+        return res.data if res.data else []
+
+    def match_memories(self, embedding, threshold, count):
+        params = {
+            "query_embedding": embedding,
+            "match_threshold": threshold,
+            "match_count": count
+        }
+        # Supabase RPC (Remote Procedure Call) to verify
+        res = self.supabase.rpc("match_memories", params).execute()
+        return res.data if res.data else []
+
+    def fetch_memory_vectors(self, after_id=None, page_size: int = 1000):
+        """Memories with an embedding (paged; PostgREST caps rows per request)"""
+        rows, start = [], 0
+        while True:
+            query = self.supabase.table("memories").select("id, category, content, embedding").not_.is_("embedding", "null")
+            if after_id is not None:
+                query = query.gt("id", after_id)
+            res = query.order("id").range(start, start + page_size - 1).execute()
+            batch = res.data or []
+            rows.extend(batch)
+            if len(batch) < page_size:
+                return rows
+            start += page_size
+
+    def insert_memory(self, data):
+        res = self.supabase.table("memories").insert(data).execute()
+        return res.data[0].get("id") if res.data else None
+
+
+class LocalStore(MemoryStore):
+    """
+    💾 LOCAL SQLITE BACKEND (offline / tests)
+    - path=":memory:" keeps everything in RAM (default)
+    - Same tables as Supabase; vector match is a NumPy cosine scan
+    """
+    name = "local"
+    has_history = True
+    has_database = True
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS chat_history (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, msg TEXT);
+    CREATE TABLE IF NOT EXISTS chat_summary (key TEXT PRIMARY KEY, summary TEXT);
+    CREATE TABLE IF NOT EXISTS chat_evicted (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, msg TEXT);
+    CREATE TABLE IF NOT EXISTS chat_expiry (key TEXT PRIMARY KEY, expires_at REAL);
+    CREATE TABLE IF NOT EXISTS users (role TEXT PRIMARY KEY, name TEXT, bio TEXT, biometrics TEXT, preferences TEXT);
+    CREATE TABLE IF NOT EXISTS directives (protocol_name TEXT, description TEXT, is_active INTEGER DEFAULT 1);
+    CREATE TABLE IF NOT EXISTS memories (
+        id INTEGER PRIMARY KEY AUTOINCREMENT, category TEXT, content TEXT,
+        importance_level INTEGER DEFAULT 10, tags TEXT, embedding TEXT
+    );
+    """
+
+    def __init__(self, path: str = Config.MEMORY_SQLITE_PATH):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.executescript(self.SCHEMA)
+        print(f"[Memory] ✅ Local SQLite Store Active ({path}).")
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(r) for r in self._conn.execute(sql, params).fetchall()]
+
+    # --- HISTORY ---
+    def _expire(self, ttl):
+        """Redis EXPIRE stand-in (caller holds the lock): sets {key: seconds}, drops expired keys"""
+        now = time.time()
+        self._conn.executemany("INSERT OR REPLACE INTO chat_expiry (key, expires_at) VALUES (?, ?)",
+                               [(key, now + seconds) for key, seconds in ttl.items() if seconds])
+        expired = "SELECT key FROM chat_expiry WHERE expires_at <= ?"
+        self._conn.execute(f"DELETE FROM chat_history WHERE key IN ({expired})", (now,))
+        self._conn.execute(f"DELETE FROM chat_summary WHERE key IN ({expired})", (now,))
+        self._conn.execute(f"DELETE FROM chat_evicted WHERE key IN ({expired})", (now,))
+        self._conn.execute("DELETE FROM chat_expiry WHERE expires_at <= ?", (now,))
+
+    def history_push_batch(self, batch, max_len, ttl=None, evicted=None):
+        with self._lock:
+            self._expire(ttl or {})
+            for key, msgs in (evicted or {}).items():
+                self._conn.executemany("INSERT INTO chat_evicted (key, msg) VALUES (?, ?)",
+                                       [(key, m) for m in msgs])
+            for key, msgs in batch.items():
+                self._conn.executemany("INSERT INTO chat_history (key, msg) VALUES (?, ?)",
+                                       [(key, m) for m in msgs])
+                self._conn.execute(
+                    "DELETE FROM chat_history WHERE key = ? AND id NOT IN "
+                    "(SELECT id FROM chat_history WHERE key = ? ORDER BY id DESC LIMIT ?)",
+                    (key, key, max_len))
+            self._conn.commit()
+
+    def history_range(self, key):
+        with self._lock:
+            self._expire({})
+        return [r["msg"] for r in self._query("SELECT msg FROM chat_history WHERE key = ? ORDER BY id", (key,))]
+
+    def evicted_range(self, key):
+        return [r["msg"] for r in self._query("SELECT msg FROM chat_evicted WHERE key = ? ORDER BY id", (key,))]
+
+    def summary_get(self, key):
+        rows = self._query("SELECT summary FROM chat_summary WHERE key = ?", (key,))
+        return rows[0]["summary"] if rows else ""
+
+    def summary_set(self, key, summary, ttl=None, folded=0):
+        with self._lock:
+            self._expire({key: ttl})
+            if folded:
+                self._conn.execute(
+                    "DELETE FROM chat_evicted WHERE id IN "
+                    "(SELECT id FROM chat_evicted WHERE key = ? ORDER BY id LIMIT ?)", (key, folded))
+            self._conn.execute("INSERT OR REPLACE INTO chat_summary (key, summary) VALUES (?, ?)", (key, summary))
+            self._conn.commit()
+
+    # --- DATABASE ---
+    def fetch_user_profile(self):
+        rows = self._query("SELECT * FROM users WHERE role = 'master'")
+        if not rows:
+            return {}
+        user = rows[0]
+        for field in ("biometrics", "preferences"):
+            user[field] = json.loads(user[field]) if user.get(field) else {}
+        return user
+
+    def fetch_directives(self):
+        return self._query("SELECT protocol_name, description FROM directives WHERE is_active = 1")
+
+    def fetch_core_memories(self, min_importance):
+        return self._query("SELECT category, content FROM memories WHERE importance_level >= ? "
+                           "ORDER BY importance_level DESC, id", (min_importance,))
+
+    def match_memories(self, embedding, threshold, count):
+        rows = self._query("SELECT id, category, content, embedding FROM memories WHERE embedding IS NOT NULL")
+        if not rows:
+            return []
+
+        matrix = np.array([json.loads(r["embedding"]) for r in rows], dtype=np.float32)
+        query = np.asarray(embedding, dtype=np.float32)
+        sims = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-9)
+
+        order = np.argsort(-sims)[:count]
+        return [
+            {"id": rows[i]["id"], "category": rows[i]["category"], "content": rows[i]["content"],
+             "similarity": float(sims[i])}
+            for i in order if sims[i] >= threshold
+        ]
+
+    def fetch_memory_vectors(self, after_id=None):
+        if after_id is None:
+            return self._query("SELECT id, category, content, embedding FROM memories WHERE embedding IS NOT NULL")
+        return self._query("SELECT id, category, content, embedding FROM memories WHERE embedding IS NOT NULL AND id > ?",
+                           (after_id,))
+
+    def insert_memory(self, data):
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO memories (category, content, importance_level, tags, embedding) VALUES (?, ?, ?, ?, ?)",
+                (data.get("category"), data.get("content"), data.get("importance_level", 10),
+                 json.dumps(data.get("tags", [])),
+                 json.dumps(data["embedding"]) if data.get("embedding") else None))
+            self._conn.commit()
+            return cur.lastrowid
+
+
+_default_store = None
+_store_lock = threading.Lock()
+
+def get_default_store() -> MemoryStore:
+    """One shared backend per process (selected by Config.MEMORY_BACKEND)"""
+    global _default_store
+    with _store_lock:
+        if _default_store is None:
+            _default_store = LocalStore() if Config.MEMORY_BACKEND == "local" else CloudStore()
+        return _default_store
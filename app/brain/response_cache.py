@@ -0,0 +1,129 @@
+import re
+import time
+import hashlib
+import threading
+import numpy as np
+from app.core.config import Config
+
+# Questions whose answer depends on the clock, the news cycle or where the user is
+VOLATILE_PATTERNS = [
+    r"\b(now|today|tonight|tomorrow|yesterday|current(ly)?|latest|recent|this (week|month|year))\b",
+    r"\b(time|date|day|weather|temperature|news|price|rate|score)\b",
+    r"\b(where|near(by|est)?|here|route|direction|map|gps|location|distance|traffic)\b",
+    r"\b(remember|my|me|i)\b",
+    "ဒီနေ့", "အခု", "မနက်ဖြန်", "ဘယ်မှာ", "သတင်း", "ဈေးနှုန်း",
+]
+
+
+class SemanticResponseCache:
+    """
+    🧠 SEMANTIC RESPONSE CACHE (in-process vector index)
+    - Normalized query embedding -> cached reply, cosine match above RESPONSE_CACHE_THRESHOLD
+    - Entries are keyed by agent route + prompt version + conversation context
+      (hash of the previous lines, so "explain that in more detail" only hits
+      after the same exchange) and expire after RESPONSE_CACHE_TTL
+    - Time / GPS / personal questions are never cached (is_cacheable)
+    """
+
+    def __init__(self, threshold: float = Config.RESPONSE_CACHE_THRESHOLD,
+                 ttl: float = Config.RESPONSE_CACHE_TTL, max_entries: int = Config.RESPONSE_CACHE_MAX):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._vectors = None    # (n, dim) float32, unit rows
+        self._entries = []      # [{"route", "version", "context", "reply", "expires"}], aligned with _vectors
+        self._volatile = [re.compile(p, re.IGNORECASE) for p in VOLATILE_PATTERNS]
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.late = 0  # Generation finished (first chunk) before the lookup could answer
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().strip(" ?!.").split())
+
+    @staticmethod
+    def context_key(lines, n: int = Config.RESPONSE_CACHE_CONTEXT_LINES) -> str:
+        """Hash of the last n chat lines before this turn ("" = fresh conversation)"""
+        recent = list(lines)[-n:] if n else []
+        return hashlib.sha1("\n".join(recent).encode("utf-8")).hexdigest()[:16] if recent else ""
+
+    def is_cacheable(self, text: str) -> bool:
+        norm = self.normalize(text)
+        ok = len(norm) >= Config.RESPONSE_CACHE_MIN_CHARS and not any(p.search(norm) for p in self._volatile)
+        if not ok:
+            self.skipped += 1
+        return ok
+
+    @staticmethod
+    def _unit(embedding):
+        vec = np.asarray(embedding, dtype=np.float32)
+        return vec / (np.linalg.norm(vec) + 1e-9)
+
+    def lookup(self, embedding, version: str, route: str, context: str = ""):
+        """Best live entry for this version, route and context -> reply or None"""
+        query = self._unit(embedding)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            if self._vectors is not None and len(self._entries):
+                sims = self._vectors @ query
+                for i in np.argsort(-sims):
+                    if sims[i] < self.threshold:
+                        break
+                    entry = self._entries[i]
+                    if entry["version"] == version and entry["route"] == route and entry["context"] == context:
+                        self.hits += 1
+                        print(f"[Cache] ⚡ Semantic Hit ({sims[i]:.3f}, hit ratio {self._ratio()})")
+                        return entry["reply"]
+            self.misses += 1
+        return None
+
+    def store(self, embedding, version: str, route: str, reply: str, context: str = ""):
+        if not reply:
+            return
+        vec = self._unit(embedding)[None, :]
+        with self._lock:
+            self._evict(time.monotonic())
+            if self._vectors is not None and self._vectors.shape[1] != vec.shape[1]:
+                self._vectors, self._entries = None, []  # Embedding model changed
+            self._vectors = vec if self._vectors is None else np.vstack([self._vectors, vec])
+            self._entries.append({"route": route, "version": version, "context": context, "reply": reply,
+                                  "expires": time.monotonic() + self.ttl})
+            if len(self._entries) > self.max_entries:
+                drop = len(self._entries) - self.max_entries
+                self._vectors, self._entries = self._vectors[drop:], self._entries[drop:]
+
+    def _evict(self, now):
+        # Entries are appended in expiry order -> expired ones are a prefix
+        drop = 0
+        while drop < len(self._entries) and self._entries[drop]["expires"] <= now:
+            drop += 1
+        if drop:
+            self._vectors, self._entries = self._vectors[drop:], self._entries[drop:]
+
+    def clear(self):
+        with self._lock:
+            self._vectors, self._entries = None, []
+
+    def _ratio(self):
+        total = self.hits + self.misses
+        return round(self.hits / total, 3) if total else 0.0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "skipped": self.skipped,
+                "late": self.late,
+                "hit_ratio": self._ratio(),
+            }
+
+
+# Global Instance
+response_cache = SemanticResponseCache()
@@ -0,0 +1,88 @@
+import re
+from collections import OrderedDict
+from app.brain.prompts import get_router_prompt
+
+DEFAULT_ROUTE = "CHAT_AGENT"
+
+# Extra cues the router prompt only describes in prose (or in Burmese)
+EXTRA_KEYWORDS = {
+    "NEWS_AGENT": ["latest", "breaking", "headline", "stock", "crypto", "bitcoin", "gold price",
+                   "exchange rate", "သတင်း", "ဈေးနှုန်း"],
+    "CHAT_AGENT": ["hi", "who is", "history of", "map", "gps", "direction", "route", "where am i",
+                   "joke", "thank"],
+}
+
+
+def parse_router_keywords(prompt: str) -> dict:
+    """Reads the `"X_AGENT" -> Keywords: a, b, c.` lines from the router prompt"""
+    routes = {}
+    for agent, words in re.findall(r'"(\w+_AGENT)"\s*->\s*Keywords:\s*(.+)', prompt):
+        keywords = [w.strip(" .?").lower() for w in words.split(",")]
+        routes[agent] = [k for k in keywords if k]
+    return routes
+
+
+class LocalRouter:
+    """
+    ⚡ LOCAL INTENT CLASSIFIER (no model call)
+    - Keyword scoring over the categories declared in get_router_prompt()
+    - Returns (route, confidence); low confidence -> caller falls back to the LLM router
+    - LRU cache of normalized inputs (LLM decisions are remembered too)
+    """
+
+    def __init__(self, cache_size: int = 512):
+        self.routes = parse_router_keywords(get_router_prompt())
+        for agent, words in EXTRA_KEYWORDS.items():
+            self.routes.setdefault(agent, []).extend(words)
+
+        self._patterns = {
+            agent: [self._compile(w) for w in words] for agent, words in self.routes.items()
+        }
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+
+        # Stats
+        self.local_hits = 0
+        self.cache_hits = 0
+
+    @staticmethod
+    def _compile(word: str):
+        # Word boundaries for Latin keywords; plain substring for Burmese
+        if word.isascii():
+            return re.compile(r"\b" + re.escape(word) + r"\b")
+        return re.compile(re.escape(word))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def classify(self, text: str):
+        norm = self.normalize(text)
+        if norm in self._cache:
+            self._cache.move_to_end(norm)
+            self.cache_hits += 1
+            return self._cache[norm], 1.0
+
+        scores = {agent: sum(1 for p in patterns if p.search(norm)) for agent, patterns in self._patterns.items()}
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        (top, top_score), second_score = ranked[0], (ranked[1][1] if len(ranked) > 1 else 0)
+
+        if top_score == 0:
+            return DEFAULT_ROUTE, 0.0
+
+        # Margin between the best and second-best category
+        confidence = (top_score - second_score) / top_score
+        if confidence > 0:
+            self.local_hits += 1
+        return top, confidence
+
+    def remember(self, text: str, route: str):
+        norm = self.normalize(text)
+        self._cache[norm] = route
+        self._cache.move_to_end(norm)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+# Global Instance
+local_router = LocalRouter()
@@ -0,0 +1,246 @@
+import os
+import json
+import threading
+import numpy as np
+from app.core.config import Config
+
+
+class MemoryVectorIndex:
+    """
+    🧭 IN-PROCESS VECTOR INDEX of core-memory embeddings
+    - Preallocated (capacity, dim) float32 buffer with unit rows -> cosine top-k is one mat-vec
+    - Loaded once from the store, then appended to on save_core_memory
+      (capacity doubles when full, so an add is amortized O(1), never a full copy)
+    - Optional on-disk copy (MEMORY_INDEX_PATH): the buffer is a file-backed memmap,
+      metadata an append-only .jsonl sidecar. On startup the copy is mapped back in and
+      only memories newer than its last id are fetched from the store.
+    """
+
+    INITIAL_CAPACITY = 256
+
+    def __init__(self, store, path: str = Config.MEMORY_INDEX_PATH):
+        self.store = store
+        self.path = path
+        self._buf = None      # (capacity, dim) float32; rows past _count are free
+        self._count = 0
+        self._matrix = None   # View of the filled rows (swapped in after each add, readers never lock)
+        self._meta = []       # [{"id", "category", "content"}], aligned with _matrix rows
+        self._contents = set()  # Indexed memory texts (memories saved without an embedding are not here)
+        self._meta_file = None
+        self._use_disk = True   # False after invalidate(): rebuild from the store
+        self._loaded = False
+        self._lock = threading.Lock()
+
+        # Stats
+        self.queries = 0
+        self.grows = 0
+        self.restored = 0     # Rows mapped back from disk on the last load
+        self.synced = 0       # Rows fetched from the store on the last load
+
+    @property
+    def ready(self):
+        return self._loaded
+
+    def __len__(self):
+        return len(self._meta)
+
+    def __contains__(self, content):
+        return content in self._contents
+
+    @property
+    def capacity(self):
+        return 0 if self._buf is None else self._buf.shape[0]
+
+    @staticmethod
+    def _unit_rows(matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix[None, :]
+        return matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-9)
+
+    # --- LOADING ---
+    def ensure_loaded(self):
+        if self._loaded:
+            return True
+        with self._lock:
+            if self._loaded:
+                return True
+            snapshot = self._load_disk() if self._use_disk else None
+            after_id = None
+            if snapshot is not None:
+                ids = [m["id"] for m in snapshot[1] if isinstance(m.get("id"), int)]
+                after_id = max(ids) if ids else None
+            try:
+                rows = self.store.fetch_memory_vectors(after_id)
+            except Exception as e:
+                print(f"[Vector Index] ⚠️ Load Failed: {e}")
+                if snapshot is None:
+                    return False
+                rows = []  # Store unreachable: the disk copy still answers
+
+            vectors, meta = self._parse(rows)
+            if snapshot is not None and (not vectors or len(vectors[0]) == snapshot[0].shape[1]):
+                self._adopt(*snapshot)
+                for row, entry in zip(self._unit_rows(vectors) if vectors else [], meta):
+                    if entry["content"] not in self._contents:
+                        self._append(row, entry)
+            else:
+                if snapshot is not None:
+                    # Embedding model changed since the disk copy -> full rebuild
+                    vectors, meta = self._parse(self.store.fetch_memory_vectors())
+                self._reset(self._unit_rows(vectors) if vectors else None, meta)
+            self.restored = 0 if snapshot is None else len(snapshot[1])
+            self.synced = len(meta)
+            self._use_disk = True
+            self._loaded = True
+            print(f"[Vector Index] ✅ {len(self._meta)} memories indexed "
+                  f"({self.restored} from disk, {self.synced} from store).")
+            return True
+
+    @staticmethod
+    def _parse(rows):
+        vectors, meta = [], []
+        for r in rows:
+            emb = r.get("embedding")
+            if isinstance(emb, str):
+                emb = json.loads(emb)  # pgvector / SQLite return text
+            if emb:
+                vectors.append(emb)
+                meta.append({"id": r.get("id"), "category": r.get("category"), "content": r.get("content")})
+        return vectors, meta
+
+    def _load_disk(self):
+        """MEMORY_INDEX_PATH copy -> (memmap, meta) or None (missing / unreadable)"""
+        if not self.path or not os.path.exists(self.path + ".npy") or not os.path.exists(self.path + ".jsonl"):
+            return None
+        try:
+            meta = []
+            with open(self.path + ".jsonl", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        meta.append(json.loads(line))
+                    except ValueError:
+                        break  # Torn last line (crash mid-write): that add never committed
+            buf = np.load(self.path + ".npy", mmap_mode="r+")
+            if buf.ndim != 2 or buf.dtype != np.float32 or len(meta) > buf.shape[0]:
+                return None
+            return buf, meta
+        except Exception as e:
+            print(f"[Vector Index] ⚠️ Disk Copy Unreadable: {e}")
+            return None
+
+    def _allocate(self, capacity, dim, rows=None):
+        if not self.path:
+            buf = np.zeros((capacity, dim), dtype=np.float32)
+            if rows is not None:
+                buf[:len(rows)] = rows
+            return buf
+        # Filled under a temp name and renamed: the old file stays valid until the new one is complete
+        tmp = self.path + ".npy.tmp"
+        buf = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if rows is not None:
+            buf[:len(rows)] = rows
+        buf.flush()
+        os.replace(tmp, self.path + ".npy")
+        return buf
+
+    def _open_meta(self, mode):
+        if self._meta_file:
+            self._meta_file.close()
+        self._meta_file = open(self.path + ".jsonl", mode, encoding="utf-8")
+
+    def _adopt(self, buf, meta):
+        """Disk copy mapped back in (initial load only)"""
+        self._buf, self._count = buf, len(meta)
+        self._matrix = self._buf[:self._count] if self._count else None
+        self._meta = list(meta)
+        self._contents = {m["content"] for m in self._meta}
+        # Rewritten without a possibly torn last line, then appended to
+        self._open_meta("w")
+        for m in self._meta:
+            self._meta_file.write(json.dumps(m, ensure_ascii=False) + "\n")
+        self._meta_file.flush()
+
+    def _reset(self, matrix, meta):
+        """Full rebuild from the store"""
+        self._buf, self._count, self._matrix = None, 0, None
+        if matrix is not None:
+            self._buf = self._allocate(max(self.INITIAL_CAPACITY, 2 * len(matrix)), matrix.shape[1], matrix)
+            self._count = len(matrix)
+            self._matrix = self._buf[:self._count]
+        self._meta = list(meta)
+        self._contents = {m["content"] for m in self._meta}
+        if self.path:
+            self._open_meta("w")
+            for m in self._meta:
+                self._meta_file.write(json.dumps(m, ensure_ascii=False) + "\n")
+            self._meta_file.flush()
+
+    def _grow(self, dim):
+        capacity = max(self.INITIAL_CAPACITY, 2 * self.capacity)
+        self._buf = self._allocate(capacity, dim, self._buf[:self._count] if self._count else None)
+        self.grows += 1
+
+    # --- UPDATES ---
+    def add(self, content, category, embedding, memory_id=None):
+        if not embedding or not self._loaded:
+            return
+        row = self._unit_rows(embedding)[0]
+        with self._lock:
+            if self._buf is not None and self._buf.shape[1] != row.shape[0]:
+                return  # Different embedding model; next reload fixes it
+            self._append(row, {"id": memory_id, "category": category, "content": content})
+
+    def _append(self, row, entry):
+        """Caller holds the lock"""
+        if self._count >= self.capacity:
+            self._grow(row.shape[0])
+        self._buf[self._count] = row
+        if isinstance(self._buf, np.memmap):
+            self._buf.flush()  # Row on disk before its .jsonl line (the line is the commit record)
+        self._meta.append(entry)
+        self._contents.add(entry["content"])
+        self._count += 1
+        self._matrix = self._buf[:self._count]
+
+        if self._meta_file:
+            self._meta_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._meta_file.flush()
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded = False
+            self._use_disk = False
+
+    # --- QUERIES ---
+    def search(self, embedding, k: int = 1, threshold: float = 0.0):
+        """Top-k memories by cosine similarity -> [{"id", "category", "content", "similarity"}]"""
+        matrix, meta = self._matrix, self._meta
+        if matrix is None or not len(matrix) or not embedding:
+            return []
+        self.queries += 1
+        query = self._unit_rows(embedding)[0]
+        if query.shape[0] != matrix.shape[1]:
+            return []
+
+        sims = matrix @ query
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top])]
+        return [dict(meta[i], similarity=float(sims[i])) for i in top if sims[i] >= threshold]
+
+    def stats(self):
+        return {"loaded": self._loaded, "size": len(self._meta), "capacity": self.capacity,
+                "grows": self.grows, "restored": self.restored, "synced": self.synced, "queries": self.queries}
+
+
+_indexes = {}
+_index_lock = threading.Lock()
+
+def get_memory_index(store) -> MemoryVectorIndex:
+    """One index per store instance (shared by every MemorySystem on that store)"""
+    with _index_lock:
+        index = _indexes.get(id(store))
+        if index is None:
+            index = _indexes[id(store)] = MemoryVectorIndex(store)
+        return index
@@ -20,11 +20,144 @@ class Config:
     WEBRTC_RATE = 48000
     MODEL_RATE = 16000
     CHANNELS = 1
-    chunk = 1280 # Processing Chunk Size
+    chunk = 1280 # Processing Chunk Size (80ms @16kHz) - openWakeWord frame size, keep at 1280
+    UPSTREAM_PACKET_MS = 80 # Upstream packet size sent to Gemini (60-200ms), independent of chunk
+    UPSTREAM_QUEUE_MAX = 25 # Max queued upstream packets (~2s @80ms) before dropping oldest
+    PLAYOUT_BUFFER_SECONDS = 5 # Reply audio preallocated per session (pool doubles for longer replies)
 
     # --- Feature Flags ---
     ENABLE_WAKEWORD = True
     ENABLE_SPEAKER_ID = True # အသံခွဲခြားစနစ်
+    ENABLE_VAD = True # Silence ကို Gemini ဆီ မပို့တော့ဘူး
+
+    # --- VAD (Voice Activity Gate) ---
+    VAD_AGGRESSIVENESS = 2   # 0 (lenient) - 3 (strict)
+    VAD_FRAME_MS = 20        # webrtcvad supports 10 / 20 / 30 ms
+    VAD_PREROLL_MS = 300     # Audio kept before speech trigger
+    VAD_HANGOVER_MS = 600    # Tail streamed after speech stops
+
+    # --- Speaker ID (Owner Verification) ---
+    SPEAKER_THRESHOLD = 0.75   # Cosine similarity vs. best enrolled style
+    SPEAKER_WINDOW_MS = 800    # Utterance window that is embedded & verified
+    SPEAKER_ID_ACTION = "drop" # "drop" = non-owner never reaches Gemini, "tag" = log only
+
+    # --- Wake Word ---
+    WAKEWORD_MODEL = "hey_jarvis"
+    WAKEWORD_THRESHOLD = 0.5
+    WAKEWORD_PREROLL_MS = 1200     # Audio released on detection (wake word + first words)
+    WAKEWORD_IDLE_TIMEOUT = 30     # Seconds without speech before going back to listening
+    WAKEWORD_LAZY_CONNECT = True   # Gemini socket only open while awake
+
+    # --- Gemini Live Connection Pool ---
+    PROMPT_VERSION = "v1"          # Bump when prompts/tools change -> pool drops old sockets
+    LIVE_POOL_SIZE = 2             # Pre-warmed (connected + setup done) sockets
+    LIVE_POOL_MAX_AGE = 480        # Seconds; recycle before Gemini's connection limit
+    LIVE_POOL_CHECK_INTERVAL = 15  # Seconds between health checks
+
+    # --- Key Scheduler (per key, rolling window) ---
+    KEY_WINDOW_SECONDS = 60
+    KEY_BUDGETS = {
+        "text":  {"rpm": 10, "tpm": 250000},
+        "embed": {"rpm": 100, "tpm": 30000},
+        "live":  {"rpm": 3},
+    }
+    KEY_COOLDOWN_BASE = 5          # First cooldown after a 429 (seconds), doubles per repeat
+    KEY_COOLDOWN_MAX = 300
+    KEY_MAX_RETRIES = 2            # Rate-limited calls retried on another key
+
+    # --- GenAI HTTP Pool ---
+    GENAI_MAX_CONNECTIONS = 20     # Per client (one client per API key)
+    GENAI_KEEPALIVE_EXPIRY = 60    # Seconds an idle connection stays open
+
+    # --- Semantic Response Cache ---
+    ENABLE_RESPONSE_CACHE = True
+    RESPONSE_CACHE_THRESHOLD = 0.95  # Cosine similarity for a hit
+    RESPONSE_CACHE_TTL = 3600        # Seconds a cached reply stays valid
+    RESPONSE_CACHE_MAX = 1000        # Entries kept (oldest dropped first)
+    RESPONSE_CACHE_MIN_CHARS = 12    # Shorter inputs are usually follow-ups -> not cached
+    RESPONSE_CACHE_CONTEXT_LINES = 2 # Previous chat lines a cached reply is scoped to
+
+    # --- Telegram ---
+    TELEGRAM_EDIT_INTERVAL = 1.0   # Seconds between progressive edits (Telegram flood limits)
+    TELEGRAM_MAX_CHARS = 4096      # Telegram message length limit
+
+    # --- Tools ---
+    TOOL_TIMEOUT = 15.0            # Default seconds per tool call (override with @mcp.tool(timeout=...))
+    TOOL_STREAM_RESULTS = True     # Send each toolResponse as soon as it is ready
+
+    # --- Tool HTTP Clients ---
+    HTTP_DEFAULT_CONCURRENCY = 8   # Parallel requests (and pooled connections) per host
+    HTTP_DEFAULT_TIMEOUT = 10.0    # Seconds
+    HTTP_KEEPALIVE_EXPIRY = 60.0   # Idle seconds before a pooled connection is closed
+    HTTP_HOSTS = {
+        "nominatim.openstreetmap.org": {"concurrency": 1, "timeout": 10.0, "min_interval": 1.0},  # Usage policy: 1 req/s
+        "router.project-osrm.org": {"concurrency": 2, "timeout": 10.0},
+        "api.telegram.org": {"concurrency": 4, "timeout": 10.0},
+        "api.tavily.com": {"concurrency": 4, "timeout": 15.0},
+        "google.serper.dev": {"concurrency": 4, "timeout": 10.0},
+        "api.search.brave.com": {"concurrency": 4, "timeout": 10.0},
+    }
+
+    # --- Geo Cache (location tools) ---
+    GEO_CACHE_PATH = os.getenv("GEO_CACHE_PATH")  # Optional JSON file so the cache survives restarts
+    GEO_CACHE_MAX = 2000           # Entries per namespace (LRU)
+    GEO_FORWARD_TTL = 30 * 86400   # Place names barely move
+    GEO_REVERSE_TTL = 7 * 86400
+    GEO_ROUTE_TTL = 3600           # Road conditions change
+    GEO_REVERSE_PRECISION = 7      # Geohash chars (~150 m cells)
+    GEO_ROUTE_PRECISION = 6        # Geohash chars (~1.2 km cells)
+
+    # --- Geo Backends (location tools) ---
+    GEO_BACKENDS = ["local", "remote"]  # Asked in order; remote = Nominatim + OSRM
+    GEO_GAZETTEER_PATH = os.getenv("GEO_GAZETTEER_PATH", "data/gazetteer.json")
+    GEO_LOCAL_RADIUS_M = 200        # Extent of a gazetteer place without its own radius_m (reverse lookups)
+    GEO_ROAD_FACTOR = 1.3           # Road distance / straight-line distance (estimate)
+    GEO_AVG_SPEED_KMH = 25          # City driving speed (estimate)
+
+    # --- Search Orchestrator (research tools) ---
+    SEARCH_HEDGE_DELAY = 0.8       # Seconds before the next provider is started (capped by the provider's p95)
+    SEARCH_DEFAULT_LATENCY_MS = 1500  # Assumed p50 / p95 of a provider without latency samples yet
+    SEARCH_QUALITY_MIN = 5         # Summed result quality (≈ sourced results) that ends the search early
+    SEARCH_TIMEOUT = 12.0          # Overall seconds per search
+
+    # --- Blocking Research Libraries (wikipedia / ddgs) ---
+    RESEARCH_IO_WORKERS = 4        # Thread pool for the sync client libraries (never the event loop)
+    RESEARCH_TIMEOUT = 8.0         # Seconds per Wikipedia / DuckDuckGo lookup
+    RESEARCH_CACHE_TTL = 6 * 3600  # Answers cached by normalized topic
+    RESEARCH_CACHE_MAX = 500
+
+    # --- Router ---
+    ROUTER_CONFIDENCE = 0.6        # Local classifier below this -> ask the LLM router
+    ROUTER_SPECULATE = True        # Start the likely agent's answer while the LLM router runs
+
+    # --- Memory ---
+    MEMORY_CACHE_TTL = 300         # Seconds profile/directives/core memories stay cached
+    MEMORY_BACKEND = os.getenv("MEMORY_BACKEND", "cloud")  # "cloud" (Upstash + Supabase) / "local" (SQLite)
+    MEMORY_SQLITE_PATH = os.getenv("MEMORY_SQLITE_PATH", ":memory:")
+    MEMORY_INDEX_PATH = os.getenv("MEMORY_INDEX_PATH")  # Optional on-disk (mmap) copy of the vector index
+    MEMORY_RELEVANT_K = 8          # Memories per prompt ranked by the query (0 = dump the whole core bank)
+    MEMORY_RELEVANT_MIN = 0.3      # Min cosine similarity for a ranked memory
+    MEMORY_EMBED_WAIT = 0.3        # Max seconds a reply waits for the query embedding (late -> core memory bank)
+    MEMORY_IO_WORKERS = 8          # Thread pool for blocking store calls
+    MEMORY_INGEST_QUEUE_MAX = 100  # Utterances waiting for extraction (oldest dropped)
+    MEMORY_INGEST_BATCH = 8        # Utterances per extraction call
+    MEMORY_INGEST_DEBOUNCE = 3.0   # Seconds to collect a batch after the first utterance
+    MEMORY_INGEST_CONCURRENCY = 1  # Batches in flight
+    MEMORY_INGEST_MAX_DEFER = 10.0 # Max seconds ingest waits for interactive turns
+    MEMORY_INGEST_DEDUP = 0.92     # Cosine above which facts in one batch are duplicates
+    SYSTEM_PROMPT_BUDGET = 6000    # Token budget for the system instruction
+    REALTIME_RESERVE = 80          # Tokens kept free for the per-call real-time block
+    HISTORY_TOKEN_BUDGET = 1500    # Token budget for chat history in each prompt
+    HISTORY_LINE_MAX_TOKENS = 300  # Longer history lines (long replies) are clipped
+    CONTEXT_LOG = True             # Log (JARVIS_CONTEXT, INFO) the prompt composition per call
+    HISTORY_MAX_LEN = 12           # Raw lines kept per conversation (older ones go into the summary)
+    HISTORY_TTL = 7 * 86400        # Seconds an idle per-session conversation lives in the store (default one never expires)
+    HISTORY_MAX_CONVERSATIONS = 64 # Conversations kept in process (least recently used idle ones are dropped)
+    SUMMARY_EVERY = 6              # Evicted lines collected before the summary is updated
+    SUMMARY_MAX_WORDS = 150        # Running summary length cap
+    SUMMARY_MODEL = "gemini-2.5-flash"
+    HISTORY_FLUSH_INTERVAL = 1.0   # Seconds between write-behind flushes to Redis
+    HISTORY_FLUSH_BATCH = 10       # Sync API flushes once this many lines are pending
     
     # --- Paths ---
     BASE_DIR = os.getcwd()
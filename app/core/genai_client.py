@@ -0,0 +1,156 @@
+import logging
+import threading
+import httpx
+from google import genai
+from google.genai import types
+from app.core.config import Config
+from app.core.key_manager import key_manager
+
+logger = logging.getLogger("JARVIS_GENAI")
+
+
+class GenAIClientManager:
+    """
+    🔌 SHARED GENAI CLIENTS
+    - One long-lived genai.Client per API key (no per-call TLS handshake)
+    - Each client gets our own pooled httpx clients (HTTP/2 when h2 is installed),
+      handed over through the SDK's httpx_client / httpx_async_client hooks, so the
+      pool settings never reach another transport (e.g. aiohttp)
+    - Use generate() / generate_stream() / embed() for native async calls (no asyncio.to_thread hop)
+      with key health reporting and retry-on-another-key for rate limits
+    """
+
+    def __init__(self):
+        self._clients = {}  # api_key -> genai.Client
+        self._transports = {}  # api_key -> (httpx.Client, httpx.AsyncClient), closed by us
+        self._lock = threading.Lock()
+
+        # Stats
+        self.created = 0
+        self.requests = {}  # api_key -> count
+
+    def _http_clients(self):
+        limits = httpx.Limits(
+            max_connections=Config.GENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.GENAI_MAX_CONNECTIONS,
+            keepalive_expiry=Config.GENAI_KEEPALIVE_EXPIRY,
+        )
+        try:
+            return httpx.Client(http2=True, limits=limits), httpx.AsyncClient(http2=True, limits=limits)
+        except ImportError:
+            # h2 not installed -> HTTP/1.1 keep-alive only
+            return httpx.Client(limits=limits), httpx.AsyncClient(limits=limits)
+
+    def _http_options(self, transports):
+        sync_client, async_client = transports
+        return types.HttpOptions(httpx_client=sync_client, httpx_async_client=async_client)
+
+    def _create(self, api_key: str):
+        transports = self._http_clients()
+        try:
+            client = genai.Client(api_key=api_key, http_options=self._http_options(transports))
+            self._transports[api_key] = transports
+        except Exception as e:
+            # Older SDKs without the httpx client hooks -> default transport, still reused
+            logger.warning(f"[GenAI] Pooled transport unavailable ({e}), using default client.")
+            transports[0].close()
+            client = genai.Client(api_key=api_key)
+        self.created += 1
+        return client
+
+    def get(self, api_key: str = None, kind: str = "text") -> genai.Client:
+        """Client for the given key (or the best key from KeyManager)"""
+        key = api_key or key_manager.get_next_key(kind)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = self._create(key)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        return client
+
+    async def _call(self, kind: str, method: str, **kwargs):
+        for attempt in range(Config.KEY_MAX_RETRIES + 1):
+            key = key_manager.get_next_key(kind)
+            client = self.get(key)
+            try:
+                result = await getattr(client.aio.models, method)(**kwargs)
+            except Exception as e:
+                # Rate limited -> key cools down, retry on the next best key
+                if key_manager.report_error(key, e) and attempt < Config.KEY_MAX_RETRIES:
+                    continue
+                raise
+            key_manager.report_success(key)
+            usage = getattr(result, "usage_metadata", None)
+            key_manager.record_tokens(key, kind, getattr(usage, "total_token_count", 0) or 0)
+            return result
+
+    async def generate_stream(self, **kwargs):
+        """
+        client.aio.models.generate_content_stream as an async generator of chunks.
+        Rate limits are retried on another key only before the first chunk arrives.
+        """
+        for attempt in range(Config.KEY_MAX_RETRIES + 1):
+            key = key_manager.get_next_key("text")
+            client = self.get(key)
+            try:
+                stream = await client.aio.models.generate_content_stream(**kwargs)
+                iterator = stream.__aiter__()
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                key_manager.report_success(key)
+                return
+            except Exception as e:
+                if key_manager.report_error(key, e) and attempt < Config.KEY_MAX_RETRIES:
+                    continue
+                raise
+            break
+
+        key_manager.report_success(key)
+        usage = None
+        chunk = first
+        while True:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                break
+        key_manager.record_tokens(key, "text", getattr(usage, "total_token_count", 0) or 0)
+
+    async def generate(self, **kwargs):
+        """client.aio.models.generate_content on the key with the most text headroom"""
+        return await self._call("text", "generate_content", **kwargs)
+
+    async def embed(self, **kwargs):
+        """client.aio.models.embed_content on the key with the most embedding headroom"""
+        return await self._call("embed", "embed_content", **kwargs)
+
+    def stats(self):
+        return {
+            "clients": len(self._clients),
+            "created": self.created,
+            "requests": {f"...{k[-4:]}": n for k, n in self.requests.items()},
+        }
+
+    async def aclose(self):
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+            transports, self._transports = list(self._transports.values()), {}
+        for client in clients:
+            try:
+                await client.aio.aclose()
+            except Exception:
+                pass
+        # The SDK leaves caller-provided httpx clients open
+        for sync_client, async_client in transports:
+            try:
+                sync_client.close()
+                await async_client.aclose()
+            except Exception:
+                pass
+
+
+# Global Instance
+client_manager = GenAIClientManager()
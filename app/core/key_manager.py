@@ -1,21 +1,122 @@
-import itertools
+import time
+import threading
+from collections import deque
 from app.core.config import Config
 
+
+class KeyState:
+    """Rolling usage + health of one API key"""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.usage = {kind: deque() for kind in Config.KEY_BUDGETS}  # kind -> deque[(ts, requests, tokens)]
+        self.cooldown_until = 0.0
+        self.backoff = 0.0
+        self.failures = 0
+        self.rate_limited = 0
+        self.last_used = 0.0
+
+    def _window(self, kind: str, now: float):
+        window = self.usage[kind]
+        while window and now - window[0][0] > Config.KEY_WINDOW_SECONDS:
+            window.popleft()
+        return window
+
+    def headroom(self, kind: str, now: float) -> float:
+        """0.0 (budget used up) .. 1.0 (idle) for the tighter of requests / tokens"""
+        budget = Config.KEY_BUDGETS[kind]
+        window = self._window(kind, now)
+        req_room = 1 - sum(r for _, r, _ in window) / budget["rpm"]
+        tok_room = 1 - sum(t for _, _, t in window) / budget["tpm"] if budget.get("tpm") else 1.0
+        return min(req_room, tok_room)
+
+    def in_cooldown(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+
 class KeyManager:
+    """
+    🔑 HEALTH-AWARE KEY SCHEDULER
+    - Tracks per-key request/token use over a rolling window, per usage kind
+      (live / text / embed each have their own budget)
+    - Rate-limited keys (429 / RESOURCE_EXHAUSTED) go into cooldown with exponential backoff
+    - get_next_key() picks the healthy key with the most headroom
+    """
+
+    RATE_LIMIT_MARKERS = ("429", "RESOURCE_EXHAUSTED", "quota", "rate limit")
+
     def __init__(self):
         # .env ထဲမှာ KEY တွေကို ကော်မာ (,) ခံပြီး ရေးထားရမယ်
         # ဥပမာ: GEMINI_KEYS="key1,key2,key3,..."
-        self.keys = Config.GEMINI_KEYS_LIST 
-        self.key_cycle = itertools.cycle(self.keys) # သံသရာလည်နေအောင် လုပ်တာ
+        self.keys = [k.strip() for k in Config.GEMINI_KEYS_LIST if k.strip()] or Config.GEMINI_KEYS_LIST
+        self._states = {k: KeyState(k) for k in self.keys}
+        self._lock = threading.Lock()
 
         # 🔥 ဒီစာကြောင်းလေး ထပ်ထည့်လိုက်ပါ (Debug လုပ်ဖို့)
         print(f"\n[SYSTEM] 🔑 Key Manager Loaded: {len(self.keys)} Keys ready to rotate.\n")
 
-    def get_next_key(self):
-        """နောက်ထပ် သုံးရမယ့် Key ကို ထုတ်ပေးမယ်"""
-        new_key = next(self.key_cycle)
-        # print(f"[System] 🔑 Switching to API Key: ...{new_key[-4:]}")
-        return new_key
+    def get_next_key(self, kind: str = "text"):
+        """နောက်ထပ် သုံးရမယ့် Key ကို ထုတ်ပေးမယ် (Headroom အများဆုံး Key)"""
+        now = time.monotonic()
+        with self._lock:
+            states = list(self._states.values())
+            healthy = [s for s in states if not s.in_cooldown(now)]
+
+            if healthy:
+                # Most headroom first; least recently used breaks ties (round-robin feel)
+                best = max(healthy, key=lambda s: (s.headroom(kind, now), -s.last_used))
+            else:
+                # Every key is cooling down: use the one that recovers first
+                best = min(states, key=lambda s: s.cooldown_until)
+
+            best.usage[kind].append((now, 1, 0))
+            best.last_used = now
+            return best.key
+
+    def record_tokens(self, key: str, kind: str, tokens: int):
+        """Token usage of a finished call (requests are counted at hand-out)"""
+        with self._lock:
+            state = self._states.get(key)
+            if state and tokens:
+                state.usage[kind].append((time.monotonic(), 0, tokens))
+
+    def report_success(self, key: str):
+        with self._lock:
+            state = self._states.get(key)
+            if state:
+                state.failures = 0
+                state.backoff = 0.0
+
+    def report_error(self, key: str, error) -> bool:
+        """Returns True if the error was a rate limit (key is now cooling down)"""
+        if not self.is_rate_limit(error):
+            return False
+        with self._lock:
+            state = self._states.get(key)
+            if state:
+                state.failures += 1
+                state.rate_limited += 1
+                state.backoff = min(Config.KEY_COOLDOWN_MAX,
+                                    (state.backoff * 2) if state.backoff else Config.KEY_COOLDOWN_BASE)
+                state.cooldown_until = time.monotonic() + state.backoff
+                print(f"[System] 🔑 Key ...{key[-4:]} rate limited, cooling down {state.backoff:.0f}s")
+        return True
+
+    def is_rate_limit(self, error) -> bool:
+        text = str(error)
+        return any(marker.lower() in text.lower() for marker in self.RATE_LIMIT_MARKERS)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                f"...{s.key[-4:]}": {
+                    "utilization": {kind: round(1 - s.headroom(kind, now), 2) for kind in Config.KEY_BUDGETS},
+                    "cooldown_s": round(max(0.0, s.cooldown_until - now), 1),
+                    "rate_limited": s.rate_limited,
+                }
+                for s in self._states.values()
+            }
 
 # Global Instance
-key_manager = KeyManager()
\ No newline at end of file
+key_manager = KeyManager()
@@ -0,0 +1,60 @@
+import time
+import threading
+from collections import OrderedDict
+
+
+def normalize_key(text: str) -> str:
+    """Case / comma / whitespace-insensitive cache key (place names, search topics)"""
+    return " ".join(str(text).lower().replace(",", " ").split())
+
+
+class TTLCache:
+    """LRU dict with per-entry expiry (wall clock, so it survives a save/load)"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[1] > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.time() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def dump(self):
+        now = time.time()
+        with self._lock:
+            return [[k, v, exp] for k, (v, exp) in self._data.items() if exp > now]
+
+    def load(self, rows):
+        now = time.time()
+        with self._lock:
+            for key, value, expires in rows:
+                if expires > now:
+                    self._data[key] = (value, expires)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses,
+                "hit_ratio": round(self.hits / total, 3) if total else 0.0}
@@ -0,0 +1,183 @@
+import os
+import csv
+import json
+import math
+import logging
+import numpy as np
+from app.core.config import Config
+from app.mcp.http_pool import http_pool
+from app.core.ttl_cache import normalize_key
+
+logger = logging.getLogger("MCP_GEO")
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org"
+OSRM_URL = "http://router.project-osrm.org"
+HEADERS = {"User-Agent": "Jarvis_M.K.1_Project"}
+EARTH_RADIUS_M = 6371000.0
+
+
+def haversine_m(lat, lng, d_lat, d_lng) -> float:
+    lat, lng, d_lat, d_lng = map(math.radians, map(float, (lat, lng, d_lat, d_lng)))
+    a = math.sin((d_lat - lat) / 2) ** 2 + math.cos(lat) * math.cos(d_lat) * math.sin((d_lng - lng) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def estimate_route(lat, lng, d_lat, d_lng):
+    """Straight line x road factor at an average city speed (no router needed)"""
+    distance = haversine_m(lat, lng, d_lat, d_lng) * Config.GEO_ROAD_FACTOR
+    return {"distance_m": distance, "duration_s": distance / (Config.GEO_AVG_SPEED_KMH / 3.6), "estimated": True}
+
+
+class GeoBackend:
+    """
+    🗺️ GEOCODER / ROUTER INTERFACE (used by the location tools)
+    - geocode(text) -> {"lat", "lng", "name"}
+    - reverse(lat, lng) -> address string
+    - route(lat, lng, d_lat, d_lng) -> {"distance_m", "duration_s"}
+    Every method returns None when this backend has no answer.
+    """
+    name = "base"
+
+    async def geocode(self, text: str): return None
+    async def reverse(self, lat, lng): return None
+    async def route(self, lat, lng, d_lat, d_lng): return None
+
+
+class RemoteGeoBackend(GeoBackend):
+    """Public Nominatim + OSRM (through the shared HTTP pool)"""
+    name = "remote"
+
+    async def geocode(self, text):
+        resp = await http_pool.get(f"{NOMINATIM_URL}/search", headers=HEADERS,
+                                   params={"q": text, "format": "json", "limit": 1})
+        data = resp.json()
+        if not data: return None
+        return {"lat": data[0]["lat"], "lng": data[0]["lon"], "name": data[0].get("display_name", text)}
+
+    async def reverse(self, lat, lng):
+        resp = await http_pool.get(f"{NOMINATIM_URL}/reverse", headers=HEADERS,
+                                   params={"format": "json", "lat": lat, "lon": lng})
+        return resp.json().get("display_name")
+
+    async def route(self, lat, lng, d_lat, d_lng):
+        r_resp = await http_pool.get(f"{OSRM_URL}/route/v1/driving/{lng},{lat};{d_lng},{d_lat}?overview=false")
+        r_data = r_resp.json()
+        if r_data["code"] != "Ok": return None
+        leg = r_data["routes"][0]["legs"][0]
+        return {"distance_m": leg["distance"], "duration_s": leg["duration"]}
+
+
+class LocalGeoBackend(GeoBackend):
+    """
+    💾 OFFLINE GAZETTEER (no network)
+    - Places from GEO_GAZETTEER_PATH (.json list or .csv with name, lat, lng[, area, radius_m, aliases])
+    - Forward: the whole query must be a known name / alias (anything else goes to the next backend)
+    - Reverse: nearest place on unit-sphere vectors (one mat-vec) whose own radius_m
+      (default GEO_LOCAL_RADIUS_M) contains the point
+    """
+    name = "local"
+
+    def __init__(self, places=None, path: str = Config.GEO_GAZETTEER_PATH):
+        if places is None:
+            places = self.load_places(path)
+        self.places = []
+        self._names = {}  # normalized name / alias -> place index
+        for place in places:
+            self._add(place)
+        coords = np.radians(np.array([[p["lat"], p["lng"]] for p in self.places], dtype=np.float64).reshape(-1, 2))
+        self._radius = np.array([p["radius_m"] for p in self.places], dtype=np.float64)
+        self._xyz = np.stack([np.cos(coords[:, 0]) * np.cos(coords[:, 1]),
+                              np.cos(coords[:, 0]) * np.sin(coords[:, 1]),
+                              np.sin(coords[:, 0])], axis=1)
+        if self.places:
+            logger.info(f"[Geo] 💾 Local gazetteer: {len(self.places)} places")
+
+    @staticmethod
+    def load_places(path):
+        if not path or not os.path.exists(path):
+            return []
+        try:
+            if path.endswith(".csv"):
+                with open(path, encoding="utf-8", newline="") as f:
+                    rows = list(csv.DictReader(f))
+                for r in rows:
+                    r["aliases"] = [a for a in (r.get("aliases") or "").split("|") if a]
+                return rows
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"[Geo] Gazetteer Load Failed: {e}")
+            return []
+
+    def _add(self, place):
+        idx = len(self.places)
+        name = place["name"]
+        area = place.get("area") or ""
+        full_name = f"{name}, {area}" if area else name
+        self.places.append({
+            "lat": float(place["lat"]),
+            "lng": float(place["lng"]),
+            "radius_m": float(place.get("radius_m") or Config.GEO_LOCAL_RADIUS_M),
+            "name": full_name,
+        })
+        for label in [name, full_name] + list(place.get("aliases") or []):
+            self._names.setdefault(normalize_key(label), idx)
+
+    async def geocode(self, text):
+        # No partial matches: "sule pagoda road" must not snap to Sule Pagoda
+        idx = self._names.get(normalize_key(text))
+        if idx is None: return None
+        place = self.places[idx]
+        return {"lat": place["lat"], "lng": place["lng"], "name": place["name"]}
+
+    async def reverse(self, lat, lng):
+        if not self.places: return None
+        lat_r, lng_r = math.radians(float(lat)), math.radians(float(lng))
+        point = np.array([math.cos(lat_r) * math.cos(lng_r), math.cos(lat_r) * math.sin(lng_r), math.sin(lat_r)])
+        distances = EARTH_RADIUS_M * np.arccos(np.clip(self._xyz @ point, -1.0, 1.0))
+        # Only places that contain the point (a lake's radius is not a pagoda's)
+        distances[distances > self._radius] = np.inf
+        idx = int(np.argmin(distances))
+        if not np.isfinite(distances[idx]): return None
+        return self.places[idx]["name"]
+
+
+class ChainedGeoBackend(GeoBackend):
+    """
+    Asks each backend in order (GEO_BACKENDS, local first by default);
+    a failing backend is skipped. Routes fall back to estimate_route().
+    """
+    name = "chain"
+
+    def __init__(self, backends):
+        self.backends = backends
+
+    async def _first(self, method, *args):
+        for backend in self.backends:
+            try:
+                result = await getattr(backend, method)(*args)
+            except Exception as e:
+                logger.warning(f"[Geo] {backend.name}.{method} failed: {e}")
+                continue
+            if result is not None:
+                return result
+        return None
+
+    async def geocode(self, text):
+        return await self._first("geocode", text)
+
+    async def reverse(self, lat, lng):
+        return await self._first("reverse", lat, lng)
+
+    async def route(self, lat, lng, d_lat, d_lng):
+        return await self._first("route", lat, lng, d_lat, d_lng) or estimate_route(lat, lng, d_lat, d_lng)
+
+
+BACKENDS = {"local": LocalGeoBackend, "remote": RemoteGeoBackend}
+
+def build_geo_backend(names=None) -> GeoBackend:
+    return ChainedGeoBackend([BACKENDS[n]() for n in (names or Config.GEO_BACKENDS)])
+
+
+# Global Instance
+geo_backend = build_geo_backend()
@@ -0,0 +1,99 @@
+import os
+import json
+import atexit
+import logging
+from app.core.config import Config
+from app.core.ttl_cache import TTLCache, normalize_key
+
+logger = logging.getLogger("MCP_GEO_CACHE")
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lng: float, precision: int) -> str:
+    """Standard geohash (precision 7 ≈ 150 m cell, 6 ≈ 1.2 km, 5 ≈ 5 km)"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+class GeoCache:
+    """
+    🗺️ GEOSPATIAL CACHE for the location tools
+    - forward: normalized destination text -> {"lat", "lng", "name"}
+    - reverse: geohash cell of the GPS fix (GEO_REVERSE_PRECISION) -> address
+    - route: snapped origin cell | destination cell (GEO_ROUTE_PRECISION) -> distance / duration
+    - TTL + LRU per namespace, optional JSON persistence (GEO_CACHE_PATH)
+    """
+
+    def __init__(self, path: str = Config.GEO_CACHE_PATH):
+        self.path = path
+        self.forward = TTLCache(Config.GEO_CACHE_MAX, Config.GEO_FORWARD_TTL)
+        self.reverse = TTLCache(Config.GEO_CACHE_MAX, Config.GEO_REVERSE_TTL)
+        self.route = TTLCache(Config.GEO_CACHE_MAX, Config.GEO_ROUTE_TTL)
+        self._load()
+        if self.path:
+            atexit.register(self.save)
+
+    # --- KEYS ---
+    @staticmethod
+    def forward_key(destination: str) -> str:
+        return normalize_key(destination)
+
+    @staticmethod
+    def reverse_key(lat, lng) -> str:
+        return geohash(float(lat), float(lng), Config.GEO_REVERSE_PRECISION)
+
+    @staticmethod
+    def route_key(lat, lng, d_lat, d_lng) -> str:
+        p = Config.GEO_ROUTE_PRECISION
+        return f"{geohash(float(lat), float(lng), p)}|{geohash(float(d_lat), float(d_lng), p)}"
+
+    # --- PERSISTENCE ---
+    def _namespaces(self):
+        return {"forward": self.forward, "reverse": self.reverse, "route": self.route}
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            for name, cache in self._namespaces().items():
+                cache.load(data.get(name, []))
+            logger.info(f"[GeoCache] Loaded {self.stats()}")
+        except Exception as e:
+            logger.warning(f"[GeoCache] Load Failed: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({name: cache.dump() for name, cache in self._namespaces().items()}, f,
+                          ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.warning(f"[GeoCache] Save Failed: {e}")
+
+    def stats(self):
+        return {name: cache.stats() for name, cache in self._namespaces().items()}
+
+
+# Global Instance
+geo_cache = GeoCache()
@@ -0,0 +1,141 @@
+import time
+import asyncio
+import bisect
+import logging
+from urllib.parse import urlsplit
+import httpx
+from app.core.config import Config
+
+logger = logging.getLogger("JARVIS_HTTP")
+
+# Latency histogram bucket upper bounds (ms); the last bucket is open-ended
+LATENCY_BUCKETS_MS = [25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class LatencyStats:
+    """Request count, errors and latency histogram (one host or provider)"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def record(self, ms: float, ok: bool):
+        self.requests += 1
+        if not ok:
+            self.errors += 1
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+
+    def percentile(self, q: float):
+        """Upper bound of the bucket holding the q-th request (None = slower than the last bound)"""
+        if not self.requests:
+            return 0
+        target, seen = q * self.requests, 0
+        for bound, count in zip(LATENCY_BUCKETS_MS + [None], self.buckets):
+            seen += count
+            if seen >= target:
+                return bound
+        return None
+
+    def snapshot(self):
+        labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "histogram": {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class HTTPClientPool:
+    """
+    🌐 SHARED HTTP CLIENTS FOR MCP TOOLS
+    - One keep-alive httpx.AsyncClient per host (HTTP/2 when h2 is installed)
+    - Per-host concurrency cap + default timeout (Config.HTTP_HOSTS, else HTTP_DEFAULT_*)
+      and optional min_interval between request starts
+    - Per-host latency histograms (stats())
+    - start() / aclose() follow the app lifecycle; clients are created lazily
+    """
+
+    def __init__(self):
+        self._clients = {}     # host -> httpx.AsyncClient
+        self._semaphores = {}  # host -> asyncio.Semaphore
+        self._stats = {}       # host -> LatencyStats
+        self._last_start = {}  # host -> monotonic time of the last request start
+
+    def _host_config(self, host: str):
+        conf = Config.HTTP_HOSTS.get(host, {})
+        return (conf.get("concurrency", Config.HTTP_DEFAULT_CONCURRENCY),
+                conf.get("timeout", Config.HTTP_DEFAULT_TIMEOUT))
+
+    async def _respect_interval(self, host: str):
+        # Hosts with a usage policy (Nominatim: 1 req/s) get spaced-out request starts
+        interval = Config.HTTP_HOSTS.get(host, {}).get("min_interval", 0)
+        if interval:
+            wait = self._last_start.get(host, 0) + interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+        self._last_start[host] = time.monotonic()
+
+    def _create(self, host: str):
+        concurrency, timeout = self._host_config(host)
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency,
+                              keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY)
+        try:
+            return httpx.AsyncClient(http2=True, limits=limits, timeout=timeout)
+        except ImportError:
+            # h2 not installed -> HTTP/1.1 keep-alive only
+            return httpx.AsyncClient(limits=limits, timeout=timeout)
+
+    def client(self, host: str) -> httpx.AsyncClient:
+        client = self._clients.get(host)
+        if client is None or client.is_closed:
+            client = self._clients[host] = self._create(host)
+            self._semaphores[host] = asyncio.Semaphore(self._host_config(host)[0])
+        return client
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        host = urlsplit(url).hostname or ""
+        client = self.client(host)
+        stats = self._stats.setdefault(host, LatencyStats())
+
+        async with self._semaphores[host]:
+            await self._respect_interval(host)
+            started = time.perf_counter()
+            ok = False
+            try:
+                resp = await client.request(method, url, **kwargs)
+                ok = resp.status_code < 500
+                return resp
+            finally:
+                stats.record((time.perf_counter() - started) * 1000, ok)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def stats(self):
+        return {host: s.snapshot() for host, s in self._stats.items()}
+
+    # --- LIFECYCLE ---
+    def start(self):
+        for host in Config.HTTP_HOSTS:
+            self.client(host)
+        logger.info(f"[HTTP] 🌐 Client pool ready ({len(self._clients)} hosts)")
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+        if self._stats:
+            logger.info(f"[HTTP] Latency per host: {self.stats()}")
+
+
+# Global Instance
+http_pool = HTTPClientPool()
@@ -2,20 +2,30 @@ import inspect
 import asyncio
 import logging
 import functools
-from typing import Callable, Any, Dict, List
+from typing import Callable, Any, Dict, List, Optional
+from app.core.config import Config
+from app.mcp.http_pool import http_pool
 
 # Logging setup
 logger = logging.getLogger("JARVIS_MCP")
 
+# Filled in by execute() from the caller's session, never exposed to Gemini
+CONTEXT_PARAMS = ("session_id",)
+
 class MCPRegistry:
     def __init__(self):
         self._tools: Dict[str, Callable] = {}
         self._schemas: List[Dict] = []
+        self._timeouts: Dict[str, float] = {}
+        self._context_params: Dict[str, List[str]] = {}
+        # Shared keep-alive HTTP clients for tools (mcp.http.get / mcp.http.post)
+        self.http = http_pool
 
-    def tool(self, category: str = "general"):
+    def tool(self, category: str = "general", timeout: Optional[float] = None):
         """
         Decorator: Function တွေကို MCP Tool အဖြစ် မှတ်ပုံတင်ရန် သုံးသည်။
         Usage: @mcp.tool(category="telegram")
+        timeout: seconds before execute() gives up (default Config.TOOL_TIMEOUT)
         """
         def decorator(func: Callable):
             # Function နာမည်ကို Category နဲ့တွဲပြီး Unique ဖြစ်အောင်လုပ်မည်
@@ -24,6 +34,9 @@ class MCPRegistry:
             
             # 1. Register Tool
             self._tools[tool_name] = func
+            if timeout is not None:
+                self._timeouts[tool_name] = timeout
+            self._context_params[tool_name] = [p for p in inspect.signature(func).parameters if p in CONTEXT_PARAMS]
             
             # 2. Auto-Generate Schema for Gemini
             schema = self._generate_gemini_schema(func, tool_name)
@@ -48,7 +61,7 @@ class MCPRegistry:
         required_params = []
 
         for param_name, param in sig.parameters.items():
-            if param_name == "self": continue 
+            if param_name == "self" or param_name in CONTEXT_PARAMS: continue 
             
             # Type Mapping (Python -> JSON)
             type_map = {
@@ -85,32 +98,43 @@ class MCPRegistry:
         """Gemini Setup Message မှာ ထည့်သုံးရမယ့် Tool List"""
         return [{"function_declarations": self._schemas}]
 
-    async def execute(self, name: str, args: Dict[str, Any]):
+    def timeout_for(self, name: str) -> float:
+        return self._timeouts.get(name, Config.TOOL_TIMEOUT)
+
+    async def execute(self, name: str, args: Dict[str, Any], session_id: Optional[str] = None):
         """
         Dispatcher: Tool Call လာရင် သက်ဆိုင်ရာ Function ကို ခေါ်ပေးခြင်း
         🔥 LATENCY OPTIMIZATION: 
         Blocking IO (Sync functions) တွေကို Thread ခွဲပြီး Parallel မောင်းပေးသည်။
+        session_id: passed to tools that declare a session_id parameter (per-session state)
         """
         if name not in self._tools:
             logger.warning(f"[MCP] ⚠️ Tool not found: {name}")
             return {"error": f"Tool '{name}' not found."}
         
         func = self._tools[name]
+        args = {k: v for k, v in args.items() if k not in CONTEXT_PARAMS}
+        if "session_id" in self._context_params[name]:
+            args["session_id"] = session_id
         
         try:
             logger.info(f"[MCP] 🚀 Executing: {name} | Args: {args}")
             
             # Check if function is native async (coroutine)
             if inspect.iscoroutinefunction(func):
-                result = await func(**args)
+                call = func(**args)
             else:
                 # 🔥 Critical for Latency: 
                 # ရိုးရိုး Python function (Sync) ဆိုရင် Main Loop မပိတ်အောင်
                 # သီးသန့် Thread တစ်ခုမှာ Run ပေးသည်။ (Parallel Execution)
-                result = await asyncio.to_thread(func, **args)
+                call = asyncio.to_thread(func, **args)
+            result = await asyncio.wait_for(call, timeout=self.timeout_for(name))
             
             return {"status": "success", "result": result}
 
+        except asyncio.TimeoutError:
+            logger.error(f"[MCP Timeout] {name} after {self.timeout_for(name)}s")
+            return {"status": "error", "message": f"Tool '{name}' timed out."}
         except Exception as e:
             logger.error(f"[MCP Execution Error] {name}: {e}")
             return {"status": "error", "message": str(e)}
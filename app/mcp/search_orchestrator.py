@@ -0,0 +1,156 @@
+import time
+import asyncio
+import logging
+from app.core.config import Config
+from app.mcp.http_pool import LatencyStats
+
+logger = logging.getLogger("JARVIS_SEARCH")
+
+
+class ProviderUnavailable(Exception):
+    """Provider can't be used right now (e.g. API key missing) -> skipped without counting an error"""
+
+
+class SearchProvider:
+    """
+    One research backend.
+    - fetch: async (query) -> formatted text; raises on failure
+    - quality: (text) -> score; results are summed until the orchestrator's threshold
+    - available: () -> bool (e.g. API key present)
+    """
+
+    def __init__(self, name, fetch, quality=None, available=None):
+        self.name = name
+        self.fetch = fetch
+        self.quality = quality or (lambda text: text.count("[Source:"))
+        self.available = available or (lambda: True)
+        self.latency = LatencyStats()
+
+        # Stats
+        self.cancelled = 0
+        self.skipped = 0
+
+
+class SearchOrchestrator:
+    """
+    🏁 HEDGED SEARCH FAN-OUT
+    - Providers start fastest-first (by observed p50); the next one is launched
+      when the current ones are slower than the hedge delay, or immediately when one fails
+    - Returns as soon as the summed quality reaches the threshold; stragglers are cancelled
+    - Missing keys / errors fall through to the next provider automatically
+    """
+
+    def __init__(self):
+        self.providers = {}
+
+    def register(self, provider: SearchProvider):
+        self.providers[provider.name] = provider
+        return provider
+
+    def _ranked(self, names):
+        providers = []
+        for name in names:
+            provider = self.providers.get(name)
+            if provider is None:
+                continue
+            if not provider.available():
+                provider.skipped += 1
+                continue
+            providers.append(provider)
+        # Stable sort: providers with equal (e.g. unmeasured) latency keep the caller's order
+        return sorted(providers, key=lambda p: self._latency_ms(p, 0.5))
+
+    @staticmethod
+    def _latency_ms(provider, q):
+        """Observed percentile; SEARCH_DEFAULT_LATENCY_MS until the provider has samples"""
+        if not provider.latency.requests:
+            return Config.SEARCH_DEFAULT_LATENCY_MS
+        ms = provider.latency.percentile(q)
+        return float("inf") if ms is None else ms
+
+    def _hedge_delay(self, provider):
+        return min(Config.SEARCH_HEDGE_DELAY, self._latency_ms(provider, 0.95) / 1000)
+
+    async def _call(self, provider, query):
+        # Cancelled stragglers and skipped providers are counted separately, not as latency samples
+        started = time.perf_counter()
+        try:
+            text = await provider.fetch(query)
+        except ProviderUnavailable:
+            raise
+        except Exception:
+            provider.latency.record((time.perf_counter() - started) * 1000, False)
+            raise
+        provider.latency.record((time.perf_counter() - started) * 1000, True)
+        return text
+
+    async def search(self, query, names, min_quality=None, timeout=None):
+        """-> [(provider name, text)] in completion order (empty if every provider failed)"""
+        min_quality = Config.SEARCH_QUALITY_MIN if min_quality is None else min_quality
+        timeout = Config.SEARCH_TIMEOUT if timeout is None else timeout
+        queue = self._ranked(names)
+        if not queue:
+            return []
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        running = {}  # task -> provider
+        results, quality = [], 0
+        last = None
+
+        def launch():
+            nonlocal last
+            last = queue.pop(0)
+            running[asyncio.create_task(self._call(last, query))] = last
+
+        launch()
+        try:
+            while running or queue:
+                if not running:
+                    launch()
+                left = deadline - loop.time()
+                if left <= 0:
+                    logger.warning(f"[Search] ⏱️ Timeout for '{query}' ({len(results)} results)")
+                    break
+                wait = min(self._hedge_delay(last), left) if queue else left
+                done, _ = await asyncio.wait(running, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if queue:
+                        launch()  # Hedge: current providers are slow
+                    continue
+
+                failed = False
+                for task in done:
+                    provider = running.pop(task)
+                    try:
+                        text = task.result()
+                    except ProviderUnavailable:
+                        provider.skipped += 1
+                        failed = True
+                        continue
+                    except Exception as e:
+                        logger.warning(f"[Search] {provider.name} failed: {str(e)[:100]}")
+                        failed = True
+                        continue
+                    results.append((provider.name, text))
+                    quality += provider.quality(text)
+
+                if quality >= min_quality:
+                    break
+                if failed and queue:
+                    launch()  # Fall back right away
+        finally:
+            for task, provider in running.items():
+                task.cancel()
+                provider.cancelled += 1
+        return results
+
+    def stats(self):
+        return {
+            name: dict(p.latency.snapshot(), cancelled=p.cancelled, skipped=p.skipped)
+            for name, p in self.providers.items()
+        }
+
+
+# Global Instance
+search_orchestrator = SearchOrchestrator()
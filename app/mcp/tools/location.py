@@ -1,9 +1,10 @@
-import httpx
 import os
 import time
 import logging
 from app.mcp.registry import mcp
 from app.core.shared_state import state
+from app.mcp.geo_cache import geo_cache
+from app.mcp.geo_backends import geo_backend
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -61,18 +62,48 @@ async def push_to_telegram(text):
         "disable_web_page_preview": True 
     }
     
-    async with httpx.AsyncClient() as client:
-        try:
-            resp = await client.post(url, json=payload, timeout=10.0)
-            if resp.status_code == 200:
-                print("✅ SUCCESS: Message Delivered.")
-                return "SUCCESS"
-            else:
-                print(f"❌ TELEGRAM ERROR: {resp.text}")
-                return f"Telegram Error: {resp.text}"
-        except Exception as e:
-            print(f"❌ NETWORK ERROR: {e}")
-            return f"Network Error: {e}"
+    try:
+        resp = await mcp.http.post(url, json=payload, timeout=10.0)
+        if resp.status_code == 200:
+            print("✅ SUCCESS: Message Delivered.")
+            return "SUCCESS"
+        else:
+            print(f"❌ TELEGRAM ERROR: {resp.text}")
+            return f"Telegram Error: {resp.text}"
+    except Exception as e:
+        print(f"❌ NETWORK ERROR: {e}")
+        return f"Network Error: {e}"
+
+# --- HELPERS: CACHED GEOCODING / ROUTING (local gazetteer first, remote fallback) ---
+async def geocode(destination):
+    """Destination text -> {"lat", "lng", "name"} (None if not found)"""
+    key = geo_cache.forward_key(destination)
+    place = geo_cache.forward.get(key)
+    if place is None:
+        place = await geo_backend.geocode(destination)
+        if not place: return None
+        geo_cache.forward.set(key, place)
+    return place
+
+async def reverse_geocode(lat, lng):
+    """GPS fix -> address; fixes inside the same geohash cell share one lookup"""
+    key = geo_cache.reverse_key(lat, lng)
+    address = geo_cache.reverse.get(key)
+    if address is None:
+        address = await geo_backend.reverse(lat, lng)
+        if not address: return "Unknown Area"  # Not cached: the next fix retries
+        geo_cache.reverse.set(key, address)
+    return address
+
+async def route_info(lat, lng, d_lat, d_lng):
+    """Driving {"distance_m", "duration_s"[, "estimated"]} between snapped cells"""
+    key = geo_cache.route_key(lat, lng, d_lat, d_lng)
+    leg = geo_cache.route.get(key)
+    if leg is None:
+        leg = await geo_backend.route(lat, lng, d_lat, d_lng)
+        if not leg.get("estimated"):
+            geo_cache.route.set(key, leg)
+    return leg
 
 # ==========================================
 # TOOLS
@@ -84,15 +115,10 @@ async def get_current_address():
     if not valid: return lat
 
     try:
-        url = f"https://nominatim.openstreetmap.org/reverse?format=json&lat={lat}&lon={lng}"
-        headers = {"User-Agent": "Jarvis_M.K.1_Project"}
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, headers=headers)
-            data = resp.json()
-            address = data.get("display_name", "Unknown Area")
-            parts = address.split(",")
-            short = f"{parts[0]}, {parts[1] if len(parts)>1 else ''}"
-            return f"Current Location: {short}."
+        address = await reverse_geocode(lat, lng)
+        parts = address.split(",")
+        short = f"{parts[0]}, {parts[1] if len(parts)>1 else ''}"
+        return f"Current Location: {short}."
     except Exception as e:
         return f"Address Error: {e}"
 
@@ -102,28 +128,19 @@ async def calculate_route_info(destination: str):
     if not valid: return lat
 
     try:
-        headers = {"User-Agent": "Jarvis_M.K.1_Project"}
-        async with httpx.AsyncClient() as client:
-            # Search
-            s_url = f"https://nominatim.openstreetmap.org/search?q={destination}&format=json&limit=1"
-            s_resp = await client.get(s_url, headers=headers)
-            s_data = s_resp.json()
-            
-            if not s_data: return f"Could not find '{destination}'."
-            d_lat, d_lng = s_data[0]["lat"], s_data[0]["lon"]
-
-            # Route info only (No link sent here)
-            r_url = f"http://router.project-osrm.org/route/v1/driving/{lng},{lat};{d_lng},{d_lat}?overview=false"
-            r_resp = await client.get(r_url)
-            r_data = r_resp.json()
-
-            if r_data["code"] != "Ok": return "Route calculation failed."
-
-            leg = r_data["routes"][0]["legs"][0]
-            dist_km = leg["distance"] / 1000
-            dur_min = leg["duration"] / 60
-            
-            return f"Distance: {dist_km:.1f} km, Time: ~{int(dur_min)} mins."
+        # Search
+        place = await geocode(destination)
+        if not place: return f"Could not find '{destination}'."
+        d_lat, d_lng = place["lat"], place["lng"]
+
+        # Route info only (No link sent here)
+        leg = await route_info(lat, lng, d_lat, d_lng)
+
+        dist_km = leg["distance_m"] / 1000
+        dur_min = leg["duration_s"] / 60
+        note = " (estimate, router unavailable)" if leg.get("estimated") else ""
+        
+        return f"Distance: {dist_km:.1f} km, Time: ~{int(dur_min)} mins{note}."
 
     except Exception as e:
         return f"Error: {e}"
@@ -146,20 +163,17 @@ async def send_navigation_link(destination: str):
     if not valid: return lat
 
     try:
-        headers = {"User-Agent": "Jarvis_M.K.1_Project"}
-        async with httpx.AsyncClient() as client:
-            s_resp = await client.get(f"https://nominatim.openstreetmap.org/search?q={destination}&format=json&limit=1", headers=headers)
-            s_data = s_resp.json()
-            if not s_data: return "Destination not found."
-            
-            d_lat, d_lng = s_data[0]["lat"], s_data[0]["lon"]
-            
-            # This link contains '&' which causes the crash!
-            # But push_to_telegram will now replace it with '&amp;'
-            nav_link = f"https://www.google.com/maps/dir/?api=1&origin={lat},{lng}&destination={d_lat},{d_lng}&travelmode=driving"
-            
-            res = await push_to_telegram(f"🚗 <b>Navigate to {destination}</b>\n\n<a href='{nav_link}'>Start Driving</a>")
-            return "Link sent." if res == "SUCCESS" else f"Failed: {res}"
-            
+        place = await geocode(destination)
+        if not place: return "Destination not found."
+        
+        d_lat, d_lng = place["lat"], place["lng"]
+        
+        # This link contains '&' which causes the crash!
+        # But push_to_telegram will now replace it with '&amp;'
+        nav_link = f"https://www.google.com/maps/dir/?api=1&origin={lat},{lng}&destination={d_lat},{d_lng}&travelmode=driving"
+        
+        res = await push_to_telegram(f"🚗 <b>Navigate to {destination}</b>\n\n<a href='{nav_link}'>Start Driving</a>")
+        return "Link sent." if res == "SUCCESS" else f"Failed: {res}"
+        
     except Exception as e:
         return f"Error: {e}"
\ No newline at end of file
@@ -2,8 +2,8 @@ from app.mcp.registry import mcp
 # agent.py ထဲက Deep Brain logic ကို လှမ်းခေါ်မယ်
 from app.brain.agent import ask_jarvis 
 
-@mcp.tool(category="reasoning")
-async def consult_deep_brain(query: str):
+@mcp.tool(category="reasoning", timeout=45)
+async def consult_deep_brain(query: str, session_id: str = None):
     """
     Uses the advanced Gemini 2.5 Flash model for complex reasoning, 
     coding, factual queries, or detailed explanations.
@@ -15,7 +15,9 @@ async def consult_deep_brain(query: str):
     try:
         print(f"[Fast Brain] 🔄 Handoff to Deep Brain: {query}")
         # ask_jarvis က Gemini 2.5 Flash ကို သုံးထားပြီးသားပါ
-        response = await ask_jarvis(query)
+        # One history per Live session (no cross-talk between concurrent callers)
+        conversation_id = f"live:{session_id}" if session_id else "deep_brain"
+        response = await ask_jarvis(query, conversation_id=conversation_id)
         return response
     except Exception as e:
         return f"Cognitive Error: {e}"
\ No newline at end of file
@@ -1,14 +1,33 @@
 import os
-import httpx
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import wikipedia
 from ddgs import DDGS
+from app.core.config import Config
 from app.mcp.registry import mcp
+from app.core.ttl_cache import TTLCache, normalize_key
+from app.mcp.search_orchestrator import search_orchestrator, SearchProvider, ProviderUnavailable
 
 # --- CONFIGURATION ---
-TAVILY_URL = "https://api.tavily.com/search"
-SERPER_URL = "https://google.serper.dev/search"
-BRAVE_URL = "https://api.search.brave.com/res/v1/web/search"
+# Overridable so the providers can be pointed at local stand-in servers
+TAVILY_URL = os.getenv("TAVILY_URL", "https://api.tavily.com/search")
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+BRAVE_URL = os.getenv("BRAVE_URL", "https://api.search.brave.com/res/v1/web/search")
+
+# wikipedia / ddgs are blocking libraries -> bounded pool, never the event loop pacing WebRTC audio
+_research_executor = ThreadPoolExecutor(max_workers=Config.RESEARCH_IO_WORKERS, thread_name_prefix="research-io")
+_wiki_cache = TTLCache(Config.RESEARCH_CACHE_MAX, Config.RESEARCH_CACHE_TTL)
+_ddg_cache = TTLCache(Config.RESEARCH_CACHE_MAX, Config.RESEARCH_CACHE_TTL)
+
+async def _run_blocking(func, *args, **kwargs):
+    """
+    Runs a sync library call on the research pool with Config.RESEARCH_TIMEOUT.
+    On timeout the worker thread finishes in the background (the pool size caps how many can pile up).
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_research_executor, functools.partial(func, *args, **kwargs))
+    return await asyncio.wait_for(future, timeout=Config.RESEARCH_TIMEOUT)
 
 # ==========================================
 # ✂️ SMART TRUNCATION HELPER
@@ -33,9 +52,10 @@ async def _fetch_tavily(query: str):
     Fetches Market/News data.
     - PRIORITIZES: The 'Answer' (AI Summary).
     - LIMITS: Top 5 Results, 500 chars each.
+    - RAISES: on a missing key / HTTP error (the orchestrator falls back)
     """
     api_key = os.getenv("TAVILY_API_KEY")
-    if not api_key: return "Tavily API Key missing."
+    if not api_key: raise ProviderUnavailable("Tavily API Key missing.")
     
     payload = {
         "api_key": api_key, 
@@ -44,26 +64,22 @@ async def _fetch_tavily(query: str):
         "max_results": 5,           # <--- 🔥 LIMIT SET TO 5
         "include_answer": True      # <--- Important!
     }
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(TAVILY_URL, json=payload, timeout=15.0)
-            data = resp.json()
-            
-            # 1. AI Summary (Keep up to 3000 chars as requested)
-            summary = smart_truncate(data.get("answer", "No summary available."), 3000)
-            
-            # 2. Sources (Now includes URL)
-            results = data.get("results", [])
-            sources = "\n".join([
-                # 🔥 ADDED: [Source: URL] so Brain can make hyperlinks
-                f"- {r['title']}: {smart_truncate(r['content'], 500)} [Source: {r.get('url', '#')}]" 
-                for r in results[:5] 
-            ])
-            
-            return f"🤖 [TAVILY INTELLIGENCE]:\nSummary: {summary}\n\nTop Sources:\n{sources}"
-            
-    except Exception as e:
-        return f"Tavily Error: {str(e)[:100]}"
+    resp = await mcp.http.post(TAVILY_URL, json=payload, timeout=15.0)
+    resp.raise_for_status()
+    data = resp.json()
+
+    # 1. AI Summary (Keep up to 3000 chars as requested)
+    summary = smart_truncate(data.get("answer") or "No summary available.", 3000)
+
+    # 2. Sources (Now includes URL)
+    results = data.get("results", [])
+    sources = "\n".join([
+        # 🔥 ADDED: [Source: URL] so Brain can make hyperlinks
+        f"- {r['title']}: {smart_truncate(r['content'], 500)} [Source: {r.get('url', '#')}]" 
+        for r in results[:5] 
+    ])
+
+    return f"🤖 [TAVILY INTELLIGENCE]:\nSummary: {summary}\n\nTop Sources:\n{sources}"
 
 async def _fetch_serper(query: str):
     """
@@ -71,7 +87,7 @@ async def _fetch_serper(query: str):
     - LIMITS: Top 5 Results, 300 chars snippet each.
     """
     api_key = os.getenv("SERPER_API_KEY")
-    if not api_key: return "Serper API Key missing."
+    if not api_key: raise ProviderUnavailable("Serper API Key missing.")
 
     headers = {"X-API-KEY": api_key, "Content-Type": "application/json"}
     payload = {
@@ -79,22 +95,18 @@ async def _fetch_serper(query: str):
         "num": 5  # <--- 🔥 LIMIT SET TO 5
     } 
     
-    try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(SERPER_URL, headers=headers, json=payload, timeout=10.0)
-            data = resp.json()
-            organic = data.get("organic", [])
-            
-            # Extract Snippets + Links
-            snippets = "\n".join([
-                # 🔥 ADDED: [Source: URL]
-                f"- {r['title']} ({r.get('date', '')}): {smart_truncate(r.get('snippet', ''), 300)} [Source: {r.get('link', '#')}]" 
-                for r in organic
-            ])
-            return f"🔍 [GOOGLE/SERPER DATA]:\n{snippets}"
-            
-    except Exception as e:
-        return f"Serper Error: {str(e)[:100]}"
+    resp = await mcp.http.post(SERPER_URL, headers=headers, json=payload, timeout=10.0)
+    resp.raise_for_status()
+    data = resp.json()
+    organic = data.get("organic", [])
+
+    # Extract Snippets + Links
+    snippets = "\n".join([
+        # 🔥 ADDED: [Source: URL]
+        f"- {r['title']} ({r.get('date', '')}): {smart_truncate(r.get('snippet', ''), 300)} [Source: {r.get('link', '#')}]" 
+        for r in organic
+    ])
+    return f"🔍 [GOOGLE/SERPER DATA]:\n{snippets}"
 
 async def _fetch_brave(query: str):
     """
@@ -102,28 +114,63 @@ async def _fetch_brave(query: str):
     - LIMITS: Top 5 Results.
     """
     api_key = os.getenv("BRAVE_API_KEY")
-    if not api_key: return "Brave API Key missing."
+    if not api_key: raise ProviderUnavailable("Brave API Key missing.")
 
     headers = {"X-Subscription-Token": api_key, "Accept": "application/json"}
-    
-    try:
-        async with httpx.AsyncClient() as client:
-            # freshness=pd (Past Day) ensures latest news
-            resp = await client.get(f"{BRAVE_URL}?q={query}&freshness=pd&count=5", headers=headers, timeout=10.0)
-            data = resp.json()
-            
-            web_results = data.get("web", {}).get("results", [])
-            
-            # Breaking news + URL
-            news_items = "\n".join([
-                # 🔥 ADDED: [Source: URL]
-                f"- {r['title']} ({r.get('age', 'Just now')}): {smart_truncate(r.get('description', ''), 300)} [Source: {r.get('url', '#')}]" 
-                for r in web_results
-            ])
-            return f"⚡ [BRAVE BREAKING NEWS]:\n{news_items}"
-            
-    except Exception as e:
-        return f"Brave Error: {str(e)[:100]}"
+
+    # freshness=pd (Past Day) ensures latest news
+    resp = await mcp.http.get(BRAVE_URL, params={"q": query, "freshness": "pd", "count": 5},
+                              headers=headers, timeout=10.0)
+    resp.raise_for_status()
+    data = resp.json()
+
+    web_results = data.get("web", {}).get("results", [])
+
+    # Breaking news + URL
+    news_items = "\n".join([
+        # 🔥 ADDED: [Source: URL]
+        f"- {r['title']} ({r.get('age', 'Just now')}): {smart_truncate(r.get('description', ''), 300)} [Source: {r.get('url', '#')}]" 
+        for r in web_results
+    ])
+    return f"⚡ [BRAVE BREAKING NEWS]:\n{news_items}"
+
+def _ddg_text(query: str, max_results: int):
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+async def _fetch_ddg(query: str):
+    """
+    Fetches DuckDuckGo results (no key needed, last resort).
+    - LIMITS: Top 3 Results, 200 chars each.
+    """
+    key = normalize_key(query)
+    cached = _ddg_cache.get(key)
+    if cached is not None:
+        return cached
+    results = await _run_blocking(_ddg_text, query, 3)
+    # 🔥 ADDED: [Source: URL]
+    formatted = "\n".join([f"- {r['title']}: {smart_truncate(r['body'], 200)} [Source: {r.get('href', '#')}]" for r in results])
+    text = f"🦆 [FALLBACK SEARCH]:\n{formatted}"
+    if results:
+        _ddg_cache.set(key, text)
+    return text
+
+# ==========================================
+# 🏁 SEARCH PROVIDERS (HEDGED FAN-OUT)
+# ==========================================
+
+def _tavily_quality(text: str):
+    # The AI summary is worth a couple of plain results
+    bonus = 0 if "Summary: No summary available." in text else 2
+    return text.count("[Source:") + bonus
+
+search_orchestrator.register(SearchProvider("tavily", _fetch_tavily, quality=_tavily_quality,
+                                            available=lambda: bool(os.getenv("TAVILY_API_KEY"))))
+search_orchestrator.register(SearchProvider("serper", _fetch_serper,
+                                            available=lambda: bool(os.getenv("SERPER_API_KEY"))))
+search_orchestrator.register(SearchProvider("brave", _fetch_brave,
+                                            available=lambda: bool(os.getenv("BRAVE_API_KEY"))))
+search_orchestrator.register(SearchProvider("ddg", _fetch_ddg))
 
 # ==========================================
 # 🛠️ AGENT TOOLS (EXPOSED TO JARVIS)
@@ -135,44 +182,51 @@ async def consult_knowledge_agent(topic: str):
     AGENT 1: WIKIPEDIA
     Use for: Biographies, History, Static Facts.
     """
+    key = normalize_key(topic)
+    cached = _wiki_cache.get(key)
+    if cached is not None:
+        return cached
     try:
-        summary = wikipedia.summary(topic, sentences=4)
+        summary = await _run_blocking(wikipedia.summary, topic, sentences=4)
         # Wikipedia page URL is auto-generated usually, but summary is enough here.
         # If needed: page = wikipedia.page(topic); page.url
-        return f"📚 [KNOWLEDGE BASE (WIKI)]:\n{summary}"
+        text = f"📚 [KNOWLEDGE BASE (WIKI)]:\n{summary}"
+        _wiki_cache.set(key, text)
+        return text
+    except asyncio.TimeoutError:
+        return f"Wiki Error: No answer within {Config.RESEARCH_TIMEOUT:.0f}s."
     except Exception as e:
         return f"Wiki Error: {str(e)[:100]}"
 
 @mcp.tool(category="research")
 async def consult_breaking_news(query: str):
     """
-    AGENT 2: BRAVE SEARCH
+    AGENT 2: BRAVE SEARCH (Serper as fallback)
     Use for: Real-time events, Breaking news (last 24h).
     """
-    return await _fetch_brave(query)
+    results = await search_orchestrator.search(query, ["brave", "serper"], min_quality=1)
+    if not results:
+        return "Breaking News Error: No search provider available."
+    return results[0][1]
 
-@mcp.tool(category="research")
+@mcp.tool(category="research", timeout=30)
 async def perform_deep_market_research(topic: str):
     """
-    AGENT 3: FUSION AGENT (TAVILY + SERPER)
+    AGENT 3: FUSION AGENT (TAVILY + SERPER, DDG as fallback)
     Use for: Market analysis, Product research, Trends.
-    Executes in PARALLEL.
+    Hedged: returns once enough good results are in, slow providers are cancelled.
     """
-    print(f"🚀 DEBUG: Launching Parallel Agents for '{topic}'...")
-    
-    # Run both simultaneously
-    tavily_task = _fetch_tavily(topic)
-    serper_task = _fetch_serper(topic)
-    
-    results = await asyncio.gather(tavily_task, serper_task)
-    tavily_data, serper_data = results
-    
+    print(f"🚀 DEBUG: Launching Hedged Agents for '{topic}'...")
+
+    results = await search_orchestrator.search(topic, ["tavily", "serper", "ddg"])
+    if not results:
+        return f"Research Error: No search provider answered for '{topic}'."
+
+    sections = "\n\n".join(text for _, text in results)
     return f"""
 🌟 FUSION REPORT FOR: '{topic}'
 =================================================
-{tavily_data}
-
-{serper_data}
+{sections}
 =================================================
 """
 
@@ -182,10 +236,8 @@ async def consult_fallback_search(query: str):
     AGENT 4: FALLBACK (DuckDuckGo)
     """
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=3))
-            # 🔥 ADDED: [Source: URL]
-            formatted = "\n".join([f"- {r['title']}: {smart_truncate(r['body'], 200)} [Source: {r.get('href', '#')}]" for r in results])
-            return f"🦆 [FALLBACK SEARCH]:\n{formatted}"
+        return await _fetch_ddg(query)
+    except asyncio.TimeoutError:
+        return f"DDG Error: No answer within {Config.RESEARCH_TIMEOUT:.0f}s."
     except Exception as e:
         return f"DDG Error: {str(e)[:100]}"
\ No newline at end of file
@@ -1,5 +1,4 @@
 import os
-import httpx
 import logging
 from app.mcp.registry import mcp
 from app.core.shared_state import state
@@ -32,22 +31,21 @@ async def send_text(message: str):
     if not chat_id: 
         return "Error: I don't know your Telegram Chat ID yet. Please text me on Telegram first."
 
-    async with httpx.AsyncClient() as client:
-        try:
-            url = f"{BASE_URL}/sendMessage"
-            
-            # 🔥 UPDATE: Added parse_mode for Hyperlinks
-            payload = {
-                "chat_id": chat_id, 
-                "text": message,
-                "parse_mode": "HTML",             # <--- UI Link Masking (Link ဖုံးဖို့ ဒါလိုပါတယ်)
-                "disable_web_page_preview": True  # <--- Link Preview ပိတ်ထားမယ် (စာသားသန့်သန့်လေးဖြစ်အောင်)
-            }
-            
-            await client.post(url, json=payload)
-            return "Message sent successfully."
-        except Exception as e:
-            return f"Failed to send: {e}"
+    try:
+        url = f"{BASE_URL}/sendMessage"
+        
+        # 🔥 UPDATE: Added parse_mode for Hyperlinks
+        payload = {
+            "chat_id": chat_id, 
+            "text": message,
+            "parse_mode": "HTML",             # <--- UI Link Masking (Link ဖုံးဖို့ ဒါလိုပါတယ်)
+            "disable_web_page_preview": True  # <--- Link Preview ပိတ်ထားမယ် (စာသားသန့်သန့်လေးဖြစ်အောင်)
+        }
+        
+        await mcp.http.post(url, json=payload)
+        return "Message sent successfully."
+    except Exception as e:
+        return f"Failed to send: {e}"
 
 @mcp.tool(category="telegram")
 async def send_location(lat: float = None, lng: float = None):
@@ -66,11 +64,10 @@ async def send_location(lat: float = None, lng: float = None):
         else:
             return "Error: No GPS location available."
 
-    async with httpx.AsyncClient() as client:
-        try:
-            url = f"{BASE_URL}/sendLocation"
-            payload = {"chat_id": chat_id, "latitude": lat, "longitude": lng}
-            await client.post(url, json=payload)
-            return f"Location map sent."
-        except Exception as e:
-            return f"Failed to send location: {e}"
\ No newline at end of file
+    try:
+        url = f"{BASE_URL}/sendLocation"
+        payload = {"chat_id": chat_id, "latitude": lat, "longitude": lng}
+        await mcp.http.post(url, json=payload)
+        return f"Location map sent."
+    except Exception as e:
+        return f"Failed to send location: {e}"
\ No newline at end of file
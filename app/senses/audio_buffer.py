@@ -0,0 +1,244 @@
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+
+class PCMRingBuffer:
+    """
+    🔁 ZERO-COPY PCM RING BUFFER
+    - Preallocated int16 storage (no bytearray re-slicing per frame)
+    - Frame-aligned reads: every frame is a NumPy view over the buffer
+    - Grows only if a single burst is larger than the free space
+    """
+
+    def __init__(self, frame_samples: int, capacity_frames: int = 50):
+        self.frame_samples = frame_samples
+        self._buf = np.zeros(frame_samples * capacity_frames, dtype=np.int16)
+
+        # Absolute cursors (sample counts). Position in buffer = cursor % capacity
+        self._read = 0
+        self._write = 0
+
+    def __len__(self):
+        return self._write - self._read
+
+    @property
+    def capacity(self):
+        return len(self._buf)
+
+    def write(self, samples: np.ndarray):
+        """Copies int16 samples into the ring (wraps around the end if needed)"""
+        n = len(samples)
+        if n == 0:
+            return
+        if len(self) + n > self.capacity:
+            self._grow(len(self) + n)
+
+        cap = self.capacity
+        start = self._write % cap
+        first = min(n, cap - start)
+        self._buf[start:start + first] = samples[:first]
+        if first < n:
+            self._buf[:n - first] = samples[first:]
+        self._write += n
+
+    def read_frame(self):
+        """
+        Returns the next full frame as a view, or None if not enough audio yet.
+        The view is only valid until the next write(); copy it out before that.
+        """
+        if len(self) < self.frame_samples:
+            return None
+
+        # Capacity is a multiple of frame_samples and reads always advance by
+        # one frame, so a frame never straddles the wrap point.
+        start = self._read % self.capacity
+        view = self._buf[start:start + self.frame_samples]
+        self._read += self.frame_samples
+        return view
+
+    def clear(self):
+        self._read = self._write = 0
+
+    def _grow(self, needed: int):
+        frames = -(-needed // self.frame_samples)  # ceil
+        new_buf = np.zeros(max(frames, 2 * (self.capacity // self.frame_samples)) * self.frame_samples,
+                           dtype=np.int16)
+
+        # Unroll pending samples to the start of the new buffer
+        count = len(self)
+        cap = self.capacity
+        start = self._read % cap
+        first = min(count, cap - start)
+        new_buf[:first] = self._buf[start:start + first]
+        if first < count:
+            new_buf[first:count] = self._buf[:count - first]
+
+        self._buf = new_buf
+        self._read = 0
+        self._write = count
+
+
+class AdaptiveJitterBuffer:
+    """
+    📶 ADAPTIVE JITTER BUFFER (Playout side)
+    - Target depth follows the measured lateness variance of incoming chunks
+    - Never blocks: pop() returns a frame, a concealment frame, or None (silence)
+    - Underrun / overrun / concealment counters for monitoring
+
+    Gemini streams replies faster than real time, so a whole reply may be queued;
+    only the *start threshold* (target_frames) adapts.
+    Frames live in one preallocated pool (capacity_frames x frame_samples):
+    push() copies into the next slot, pop() returns a view of it. A full pool
+    doubles (queued reply audio is never dropped).
+    """
+
+    IDLE_RESET_S = 1.5     # Gap after expected playout end that starts a new talk spurt
+    EWMA_ALPHA = 1 / 16    # Same smoothing constant as RFC 3550 jitter
+    PLC_FRAMES = 3         # Max frames of faded repetition before pure silence
+
+    def __init__(self, frame_seconds: float, frame_samples: int, min_frames: int = 2, max_frames: int = 25,
+                 initial_frames: int = 4, capacity_frames: int = 250):
+        self.frame_seconds = frame_seconds
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.capacity_frames = capacity_frames
+        self.target_frames = initial_frames
+
+        # Preallocated frame pool: queued frames occupy consecutive slots (mod capacity)
+        self._pool = np.zeros((capacity_frames, frame_samples), dtype=np.int16)
+        self._next_slot = 0
+        self.frames = deque()  # (pool slot, arrival time)
+        self.playing = False
+        self.ended = False     # Upstream finished the turn; draining is not an underrun
+
+        # Lateness statistics (seconds)
+        self._late_mean = 0.0
+        self._late_var = 0.0
+        self._spurt_start = None
+        self._spurt_media = 0.0
+
+        # Concealment state
+        self._last_pcm = None
+        self._conceal_left = 0
+
+        # Counters
+        self.underruns = 0
+        self.grows = 0
+        self.concealed = 0
+
+    def __len__(self):
+        return len(self.frames)
+
+    def record_arrival(self, media_seconds: float, now: float = None):
+        """Call once per upstream chunk with its duration to update the target depth"""
+        now = time.monotonic() if now is None else now
+
+        expected = None if self._spurt_start is None else self._spurt_start + self._spurt_media
+        if expected is None or now - expected > self.IDLE_RESET_S:
+            # New talk spurt: playout clock starts from this chunk
+            self._spurt_start = now
+            self._spurt_media = 0.0
+            lateness = 0.0
+        else:
+            # How late this chunk is vs. real-time playout started at spurt begin
+            lateness = max(0.0, now - expected)
+
+        self._spurt_media += media_seconds
+
+        delta = lateness - self._late_mean
+        self._late_mean += self.EWMA_ALPHA * delta
+        self._late_var = (1 - self.EWMA_ALPHA) * (self._late_var + self.EWMA_ALPHA * delta * delta)
+
+        margin = self._late_mean + 2 * math.sqrt(self._late_var)
+        target = self.min_frames + math.ceil(margin / self.frame_seconds)
+        self.target_frames = min(self.max_frames, max(self.min_frames, target))
+
+    def push(self, pcm: np.ndarray, now: float = None):
+        """Copies one frame into the pool (pcm may be a ring-buffer view)"""
+        if len(self.frames) >= self.capacity_frames:
+            self._grow()
+
+        slot = self._next_slot
+        self._pool[slot] = pcm
+        self._next_slot = (slot + 1) % self.capacity_frames
+        self.frames.append((slot, time.monotonic() if now is None else now))
+        self.ended = False
+
+    def pop(self, now: float = None):
+        """
+        Returns the next PCM frame to play, or None for plain silence.
+        A returned frame is a pool view; use it before the next push().
+        """
+        now = time.monotonic() if now is None else now
+
+        if not self.playing:
+            if not self.frames:
+                return self._conceal()
+            # (Re)buffering: start once target depth is reached, or once the
+            # oldest frame has waited that long (short utterances still play)
+            waited = now - self.frames[0][1]
+            if len(self.frames) < self.target_frames and waited < self.target_frames * self.frame_seconds:
+                return None
+            self.playing = True
+
+        if self.frames:
+            slot, _ = self.frames.popleft()
+            pcm = self._pool[slot]
+            # Concealment only runs while the queue is empty, i.e. before this
+            # slot can come round again, so keeping the view is safe
+            self._last_pcm = pcm
+            self._conceal_left = self.PLC_FRAMES
+            return pcm
+
+        self.playing = False
+        if self.ended:
+            self._conceal_left = 0
+            return None
+
+        # Underrun mid-turn: conceal with faded repetition, then rebuffer
+        self.underruns += 1
+        return self._conceal()
+
+    def _grow(self):
+        """Doubles the pool; queued frames are unrolled to slots 0..n-1"""
+        queued = [slot for slot, _ in self.frames]
+        pool = np.zeros((2 * self.capacity_frames, self._pool.shape[1]), dtype=np.int16)
+        pool[:len(queued)] = self._pool[queued]
+        # _last_pcm may still view the old pool; it stays alive until replaced
+        self.frames = deque((i, arrival) for i, (_, arrival) in enumerate(self.frames))
+        self._pool = pool
+        self._next_slot = len(queued)
+        self.capacity_frames = len(pool)
+        self.grows += 1
+
+    def mark_end(self):
+        """Upstream turn complete: the next empty pop() is end-of-speech, not loss"""
+        self.ended = True
+
+    def _conceal(self):
+        if self._last_pcm is None or self._conceal_left <= 0:
+            return None
+        gain = self._conceal_left / (self.PLC_FRAMES + 1)
+        self._conceal_left -= 1
+        self.concealed += 1
+        return (self._last_pcm * gain).astype(np.int16)
+
+    def clear(self):
+        self.frames.clear()
+        self.playing = False
+        self._last_pcm = None
+
+    def stats(self):
+        return {
+            "depth": len(self.frames),
+            "target": self.target_frames,
+            "lateness_ms": round(self._late_mean * 1000, 1),
+            "jitter_ms": round(math.sqrt(self._late_var) * 1000, 1),
+            "underruns": self.underruns,
+            "capacity": self.capacity_frames,
+            "grows": self.grows,
+            "concealed": self.concealed,
+        }
@@ -0,0 +1,239 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+import websockets
+from websockets.protocol import State
+from app.core.config import Config
+from app.core.key_manager import key_manager
+from app.brain.memory import AsyncMemorySystem
+from app.mcp.registry import mcp
+
+logger = logging.getLogger("JARVIS_LIVE_POOL")
+
+LIVE_URL = "wss://generativelanguage.googleapis.com/ws/google.ai.generativelanguage.v1beta.GenerativeService.BidiGenerateContent?key={key}"
+
+
+def build_setup_msg(sys_instruction: str) -> dict:
+    """Gemini Live setup message (system instruction + tool schemas)"""
+    msg = {
+        "setup": {
+            "model": Config.LIVE_MODEL,
+            "tools": mcp.get_gemini_tools(),
+            "generation_config": {
+                "response_modalities": ["AUDIO"],
+                "speech_config": {
+                    "voice_config": {
+                        "prebuilt_voice_config": {
+                            "voice_name": Config.TTS_VOICE
+                        }
+                    }
+                }
+            },
+            "system_instruction": {
+                "parts": [{"text": sys_instruction}]
+            }
+        }
+    }
+    if Config.ENABLE_VAD:
+        # Local VAD decides turn boundaries -> send explicit activity signals
+        msg["setup"]["realtime_input_config"] = {
+            "automatic_activity_detection": {"disabled": True}
+        }
+    return msg
+
+
+def build_clock_msg(realtime_block: str) -> dict:
+    """First client turn on a freshly attached socket: current date/time, no reply expected"""
+    return {
+        "client_content": {
+            "turns": [{"role": "user", "parts": [{"text": realtime_block}]}],
+            "turn_complete": False
+        }
+    }
+
+
+class LiveConnection:
+    """A Gemini Live websocket that already finished its setup handshake"""
+
+    def __init__(self, ws, api_key: str, version: str):
+        self.ws = ws
+        self.api_key = api_key
+        self.version = version
+        self.created = time.monotonic()
+
+    @property
+    def age(self):
+        return time.monotonic() - self.created
+
+    @property
+    def is_open(self):
+        return self.ws.state is State.OPEN
+
+
+class LiveConnectionPool:
+    """
+    🔥 PRE-WARMED GEMINI LIVE POOL
+    - Keeps LIVE_POOL_SIZE connections open, set up and waiting (TLS + setup done)
+    - Keyed by (API key, prompt version): a version bump or a memory change
+      (context hash from MemorySystem) never hands out a stale prompt
+    - Health checks (ping) + recycling before Gemini's connection lifetime runs out
+    - acquire() never fails for lack of a warm socket: it falls back to a cold connect
+    - The setup prompt has no clock in it; acquire() sends the real-time block as the
+      first turn, so a socket warmed minutes ago still starts with the current time
+    - Live key budget is only charged when a socket is opened, never on hand-out
+    """
+
+    def __init__(self, size: int = Config.LIVE_POOL_SIZE, max_age: float = Config.LIVE_POOL_MAX_AGE):
+        self.size = size
+        self.max_age = max_age
+        self._idle = {}  # (api_key, version) -> deque[LiveConnection]
+        self._memory = None
+        self._refill = asyncio.Event()
+        self._task = None
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.failures = 0
+
+    # --- LIFECYCLE ---
+    def start(self):
+        if self.size > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._maintainer())
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for bucket in self._idle.values():
+            while bucket:
+                await self._discard(bucket.popleft())
+
+    # --- PUBLIC API ---
+    def current_version(self):
+        context = self._memory.context_version() if self._memory else None
+        return f"{Config.PROMPT_VERSION}:{context}"
+
+    async def acquire(self) -> LiveConnection:
+        conn = self._take_any(self.current_version())
+        if conn:
+            self.hits += 1
+        else:
+            self.misses += 1
+            conn = await self._open(key_manager.get_next_key("live"))
+
+        # Only wake the maintainer if a warm socket is actually missing
+        if self._idle_count() < self.size:
+            self._refill.set()
+
+        await conn.ws.send(json.dumps(build_clock_msg(self._memory.realtime_block())))
+        return conn
+
+    def stats(self):
+        return {
+            "idle": self._idle_count(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recycled": self.recycled,
+            "failures": self.failures,
+        }
+
+    # --- INTERNALS ---
+    def _idle_count(self):
+        return sum(len(b) for b in self._idle.values())
+
+    async def _open(self, api_key: str) -> LiveConnection:
+        if self._memory is None:
+            self._memory = await asyncio.to_thread(AsyncMemorySystem)
+        sys_instruction = await self._memory.build_system_instruction(include_realtime=False)
+
+        try:
+            ws = await websockets.connect(LIVE_URL.format(key=api_key), ping_interval=20, ping_timeout=10)
+        except Exception as e:
+            key_manager.report_error(api_key, e)
+            raise
+        try:
+            await ws.send(json.dumps(build_setup_msg(sys_instruction)))
+            reply = json.loads(await asyncio.wait_for(ws.recv(), timeout=10))
+            if "setupComplete" not in reply:
+                raise RuntimeError(f"Unexpected setup reply: {str(reply)[:100]}")
+        except Exception as e:
+            # Quota errors arrive as a close frame (e.g. 1011 RESOURCE_EXHAUSTED)
+            key_manager.report_error(api_key, e)
+            await ws.close()
+            raise
+        key_manager.report_success(api_key)
+        return LiveConnection(ws, api_key, self.current_version())
+
+    def _usable(self, conn: LiveConnection) -> bool:
+        return conn.is_open and conn.age < self.max_age and conn.version == self.current_version()
+
+    def _take(self, bucket_key):
+        bucket = self._idle.get(bucket_key)
+        while bucket:
+            conn = bucket.popleft()
+            if self._usable(conn):
+                return conn
+            asyncio.create_task(self._discard(conn))
+        return None
+
+    def _take_any(self, version: str):
+        for bucket_key in list(self._idle):
+            if bucket_key[1] == version and (conn := self._take(bucket_key)):
+                return conn
+        return None
+
+    async def _discard(self, conn: LiveConnection):
+        self.recycled += 1
+        try:
+            await conn.ws.close()
+        except Exception:
+            pass
+
+    async def _health_check(self):
+        for bucket in list(self._idle.values()):
+            for conn in list(bucket):
+                healthy = self._usable(conn)
+                if healthy:
+                    try:
+                        pong = await conn.ws.ping()
+                        await asyncio.wait_for(pong, timeout=5)
+                    except Exception:
+                        healthy = False
+                if not healthy and conn in bucket:
+                    bucket.remove(conn)
+                    await self._discard(conn)
+
+    async def _maintainer(self):
+        while True:
+            try:
+                self._refill.clear()
+                await self._health_check()
+
+                while self._idle_count() < self.size:
+                    key = key_manager.get_next_key("live")
+                    try:
+                        conn = await self._open(key)
+                    except Exception as e:
+                        self.failures += 1
+                        logger.error(f"[LivePool] Warm-up Failed: {e}")
+                        break
+                    self._idle.setdefault((key, conn.version), deque()).append(conn)
+                    logger.info(f"[LivePool] 🔥 Warm connection ready ({self.stats()['idle']}/{self.size})")
+
+                try:
+                    await asyncio.wait_for(self._refill.wait(), timeout=Config.LIVE_POOL_CHECK_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[LivePool] Maintainer Error: {e}")
+                await asyncio.sleep(Config.LIVE_POOL_CHECK_INTERVAL)
+
+
+# Global Instance
+live_pool = LiveConnectionPool()
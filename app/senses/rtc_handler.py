@@ -4,60 +4,61 @@ import logging
 import av
 import base64
 import time
-import websockets
+import uuid
 import numpy as np
 from fractions import Fraction
 from aiortc import MediaStreamTrack, RTCPeerConnection, RTCSessionDescription
 from app.core.config import Config
-from app.core.key_manager import key_manager
-from app.brain.memory import MemorySystem
 from app.mcp.registry import mcp
+from app.senses.audio_buffer import PCMRingBuffer, AdaptiveJitterBuffer
+from app.senses.vad import SpeechGate
+from app.senses.uplink import AudioUplink
+from app.senses.speaker_id import SpeakerGate, get_verifier
+from app.senses.wakeword import WakeWordGate, load_wakeword_model
+from app.senses.live_pool import live_pool
 
 logger = logging.getLogger("JARVIS_RTC")
 
 class GeminiAudioTrack(MediaStreamTrack):
     """
     🔥 VIBER-STYLE ADAPTIVE STREAM TRACK
-    - Instant Start with "Priming" (Silence Runway)
-    - Long Soft-Wait (0.75s) to prevent cut-offs on bad networks
-    - Continuous PTS Timing
+    - Instant Start (silence until the jitter buffer reaches its target depth)
+    - Adaptive Jitter Buffer instead of a fixed soft-wait
+    - Wall-clock paced PTS Timing (never blocks longer than one frame)
     """
     kind = "audio"
 
     def __init__(self):
         super().__init__()
         self.raw_queue = asyncio.Queue()
-        self.frame_queue = asyncio.Queue()
         
         self.out_sample_rate = 48000
         self.AUDIO_PTIME = 0.020  # 20ms
         self.SAMPLES_PER_FRAME = int(self.out_sample_rate * self.AUDIO_PTIME) # 960 samples
         
         self.pts = 0
+        self._clock_start = None
+        self.MAX_CLOCK_LAG = 0.2  # Behind wall clock by more than this -> jump PTS forward
         
         # --- 🚀 ADAPTIVE SETTINGS ---
-        self.is_priming = True         # အစပိုင်း Silence ခင်းမယ့် Mode
-        self.priming_frames_left = 3   # ရှေ့ဆုံးကနေ Silence 5 Frames (100ms) အရင်လွှတ်မယ်
+        self.jitter = AdaptiveJitterBuffer(self.AUDIO_PTIME, self.SAMPLES_PER_FRAME,
+                                           capacity_frames=int(Config.PLAYOUT_BUFFER_SECONDS / self.AUDIO_PTIME))
         
         self.resampler = av.AudioResampler(format='s16', layout='mono', rate=self.out_sample_rate)
-        self.silence_frame = self._create_silence_frame()
+        self.ring = PCMRingBuffer(self.SAMPLES_PER_FRAME)
+        self._silence_pcm = np.zeros(self.SAMPLES_PER_FRAME, dtype=np.int16)
         
         # Start Background Worker
         asyncio.create_task(self._audio_transformer())
 
-    def _create_silence_frame(self):
-        frame = av.AudioFrame(format='s16', layout='mono', samples=self.SAMPLES_PER_FRAME)
-        data = np.zeros(self.SAMPLES_PER_FRAME, dtype=np.int16)
-        frame.planes[0].update(data.tobytes())
-        frame.sample_rate = self.out_sample_rate
-        frame.time_base = Fraction(1, self.out_sample_rate)
-        return frame
-
     def _get_silence_frame(self):
         """Returns a copy of the silence frame with correct timestamp"""
+        return self._make_frame(self._silence_pcm)
+
+    def _make_frame(self, pcm):
+        """Wraps one frame of int16 PCM (ndarray view or bytes) into an AudioFrame"""
         f = av.AudioFrame(format='s16', layout='mono', samples=self.SAMPLES_PER_FRAME)
-        # Use to_ndarray().tobytes() to avoid AttributeError
-        f.planes[0].update(self.silence_frame.to_ndarray().tobytes())
+        f.planes[0].update(pcm)
         f.sample_rate = self.out_sample_rate
         f.time_base = Fraction(1, self.out_sample_rate)
         return f
@@ -66,17 +67,27 @@ class GeminiAudioTrack(MediaStreamTrack):
         if b64_data:
             try:
                 pcm_bytes = base64.b64decode(b64_data)
+                self.jitter.record_arrival(len(pcm_bytes) / 2 / 24000)
                 self.raw_queue.put_nowait(pcm_bytes)
             except Exception as e:
                 logger.error(f"Decode Error: {e}")
 
+    def end_of_turn(self):
+        """Gemini finished speaking (queued behind pending audio to keep ordering)"""
+        self.raw_queue.put_nowait(None)
+
+    @property
+    def jitter_stats(self):
+        return self.jitter.stats()
+
     async def _audio_transformer(self):
-        """Worker: Raw -> Resample -> Slice -> Queue"""
-        buffer = bytearray()
-        
+        """Worker: Raw -> Resample -> Ring Buffer -> Frame Views -> Queue"""
         while True:
             try:
                 pcm_data = await self.raw_queue.get()
+                if pcm_data is None:
+                    self.jitter.mark_end()
+                    continue
                 
                 if len(pcm_data) % 2 != 0: continue
 
@@ -87,57 +98,37 @@ class GeminiAudioTrack(MediaStreamTrack):
 
                 output_frames = self.resampler.resample(input_frame)
                 
+                # 🔥 No tobytes()/bytearray re-slicing: ndarray goes straight into the ring
                 for f in output_frames:
-                    buffer.extend(f.to_ndarray().tobytes())
+                    self.ring.write(f.to_ndarray().reshape(-1))
 
-                FRAME_SIZE_BYTES = self.SAMPLES_PER_FRAME * 2
-                
-                while len(buffer) >= FRAME_SIZE_BYTES:
-                    chunk = buffer[:FRAME_SIZE_BYTES]
-                    buffer = buffer[FRAME_SIZE_BYTES:]
-                    
-                    frame = av.AudioFrame(format='s16', layout='mono', samples=self.SAMPLES_PER_FRAME)
-                    frame.planes[0].update(chunk)
-                    frame.sample_rate = self.out_sample_rate
-                    frame.time_base = Fraction(1, self.out_sample_rate)
-                    
-                    await self.frame_queue.put(frame)
+                # Each view is copied once into the jitter buffer's frame pool before the next write
+                while (chunk := self.ring.read_frame()) is not None:
+                    self.jitter.push(chunk)
                     
             except Exception as e:
                 logger.error(f"Transformer Error: {e}")
 
     async def recv(self):
         """
-        WebRTC Consumer with Viber-like Adaptive Logic
+        WebRTC Consumer: paced to wall clock, fed by the adaptive jitter buffer
         """
-        frame = None
-        
-        # 1. 🛫 Priming Phase (The Runway)
-        # အစမှာ Real Audio မစောင့်ဘဲ Silence အရင်လွှတ်ပြီး လမ်းခင်းပေးလိုက်တယ် (Instant Start)
-        if self.is_priming:
-            if self.priming_frames_left > 0:
-                self.priming_frames_left -= 1
-                frame = self._get_silence_frame()
-                # Update PTS and return immediately
-                frame.pts = self.pts
-                frame.time_base = Fraction(1, self.out_sample_rate)
-                self.pts += self.SAMPLES_PER_FRAME
-                return frame
-            else:
-                self.is_priming = False
-                # Priming ပြီးတာနဲ့ အောက်က Real Logic ကို ဆက်သွားမယ်
-
-        # 2. 📡 Real Audio Phase (with Long Soft-Wait)
-        try:
-            # ဆရာ့ request အတိုင်း 0.75s (750ms) စောင့်ပေးမယ်
-            # Data မလာရင်တောင် ချက်ချင်းမဖြတ်ဘူး၊ လာမလားဆိုပြီး သည်းခံစောင့်မယ်
-            frame = await asyncio.wait_for(self.frame_queue.get(), timeout=0.80)
-            
-        except (asyncio.TimeoutError, asyncio.QueueEmpty):
-            # 3. 🛡️ Adaptive Silence (Network Drop)
-            # 0.75s စောင့်လို့မှ မလာရင်တော့ Silence ထည့်မယ်
-            # Priming ကို Reset မလုပ်ဘူး (Continuous Conversation မို့လို့)
-            frame = self._get_silence_frame()
+        # 1. ⏱️ Pacing: wait for this frame's slot (at most one frame period)
+        now = time.time()
+        if self._clock_start is None:
+            self._clock_start = now
+
+        wait = self._clock_start + self.pts / self.out_sample_rate - now
+        if wait > 0:
+            await asyncio.sleep(min(wait, self.AUDIO_PTIME))
+        elif wait < -self.MAX_CLOCK_LAG:
+            # Event loop stalled: realign PTS with wall clock instead of drifting
+            behind = int(-wait * self.out_sample_rate) // self.SAMPLES_PER_FRAME
+            self.pts += behind * self.SAMPLES_PER_FRAME
+
+        # 2. 📡 Real audio, concealment, or silence (never blocks)
+        pcm = self.jitter.pop()
+        frame = self._make_frame(pcm) if pcm is not None else self._get_silence_frame()
 
         # Apply Timestamp
         frame.pts = self.pts
@@ -148,46 +139,46 @@ class GeminiAudioTrack(MediaStreamTrack):
 
 class JarvisSession:
     def __init__(self):
-        self.api_key = key_manager.get_next_key()
-        self.url = f"wss://generativelanguage.googleapis.com/ws/google.ai.generativelanguage.v1beta.GenerativeService.BidiGenerateContent?key={self.api_key}"
-        self.memory = MemorySystem()
+        self.id = uuid.uuid4().hex  # Per-session tool state (e.g. deep-brain chat history)
+        self.api_key = None
         self.gemini_ws = None
         self.audio_out_track = GeminiAudioTrack()
+        self.uplink = AudioUplink()
+        self._connect_task = None
+        self._tool_tasks = {}  # call id -> in-flight tool task
+
+    def ensure_connected(self):
+        """Opens the Gemini socket in the background if it is not open yet"""
+        if self.gemini_ws is None and (self._connect_task is None or self._connect_task.done()):
+            self._connect_task = asyncio.create_task(self.connect_gemini())
+
+    def disconnect_gemini(self):
+        """Detaches the socket immediately (a quick re-wake reconnects cleanly)"""
+        self.uplink.stop()
+        self.cancel_tool_calls()
+        ws, self.gemini_ws = self.gemini_ws, None
+        if ws:
+            asyncio.create_task(self._close_ws(ws))
+
+    async def _close_ws(self, ws):
+        try:
+            await ws.close()
+            logger.info("💤 Gemini Disconnected (idle)")
+        except Exception as e:
+            logger.error(f"Gemini Close Error: {e}")
 
     async def connect_gemini(self):
         try:
-            self.gemini_ws = await websockets.connect(self.url, ping_interval=20, ping_timeout=10)
-            logger.info(f"✅ Gemini Connected")
-            await self.send_setup_msg()
+            # 🔥 Warm socket from the pool (TLS + setup already done) or a cold connect
+            conn = await live_pool.acquire()
+            self.api_key = conn.api_key
+            self.gemini_ws = conn.ws
+            logger.info(f"✅ Gemini Connected (pool: {live_pool.stats()})")
+            self.uplink.start(self.gemini_ws)
             asyncio.create_task(self.gemini_listener())
         except Exception as e:
             logger.error(f"Gemini Connection Failed: {e}")
 
-    async def send_setup_msg(self):
-        sys_instruction = self.memory.build_system_instruction()
-        tools = mcp.get_gemini_tools()
-
-        msg = {
-            "setup": {
-                "model": Config.LIVE_MODEL,
-                "tools": tools,
-                "generation_config": {
-                    "response_modalities": ["AUDIO"],
-                    "speech_config": {
-                        "voice_config": {
-                            "prebuilt_voice_config": {
-                                "voice_name": Config.TTS_VOICE 
-                            }
-                        }
-                    }
-                },
-                "system_instruction": {
-                    "parts": [{"text": sys_instruction}]
-                }
-            }
-        }
-        await self.gemini_ws.send(json.dumps(msg))
-
     async def gemini_listener(self):
         try:
             async for raw_msg in self.gemini_ws:
@@ -197,47 +188,81 @@ class JarvisSession:
                     for part in parts:
                         if "inlineData" in part:
                             self.audio_out_track.add_audio_chunk(part["inlineData"]["data"])
+                    if response["serverContent"].get("turnComplete"):
+                        self.audio_out_track.end_of_turn()
                             
                 if "toolCall" in response:
                     asyncio.create_task(self.handle_tool_call(response["toolCall"]))
+                if "toolCallCancellation" in response:
+                    self.cancel_tool_calls(response["toolCallCancellation"].get("ids", []))
         except Exception as e:
             logger.error(f"Gemini Listener Error: {e}")
 
     async def handle_tool_call(self, tool_call_data):
+        """
+        Runs every call of the batch concurrently (per-tool timeouts live in mcp.execute).
+        TOOL_STREAM_RESULTS: each response is sent as soon as it is ready,
+        otherwise one toolResponse in the original call order.
+        """
+        ws = self.gemini_ws
         function_calls = tool_call_data.get("functionCalls", [])
-        function_responses = []
+        tasks = []
         for call in function_calls:
-            name = call["name"]
-            args = call["args"]
-            call_id = call["id"]
-            logger.info(f"[Tool] 🛠️ Executing: {name}")
-            result = await mcp.execute(name, args)
-            function_responses.append({
-                "name": name, "response": {"result": result}, "id": call_id
-            })
-
-        if function_responses:
-            await self.gemini_ws.send(json.dumps({
-                "toolResponse": {"functionResponses": function_responses}
-            }))
+            logger.info(f"[Tool] 🛠️ Executing: {call['name']}")
+            task = asyncio.create_task(self._run_tool(ws, call))
+            self._tool_tasks[call["id"]] = task
+            tasks.append(task)
+
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        function_responses = [r for r in results if isinstance(r, dict)]
+
+        if function_responses and not Config.TOOL_STREAM_RESULTS:
+            await self._send_tool_responses(ws, function_responses)
+
+    async def _run_tool(self, ws, call):
+        try:
+            result = await mcp.execute(call["name"], call.get("args") or {}, session_id=self.id)
+            response = {"name": call["name"], "response": {"result": result}, "id": call["id"]}
+            if Config.TOOL_STREAM_RESULTS:
+                await self._send_tool_responses(ws, [response])
+            return response
+        except asyncio.CancelledError:
+            logger.info(f"[Tool] ✋ Cancelled: {call['name']}")
+            raise
+        finally:
+            self._tool_tasks.pop(call["id"], None)
+
+    async def _send_tool_responses(self, ws, function_responses):
+        # Socket replaced / closed meanwhile -> nobody is waiting for these answers
+        if ws is None or ws is not self.gemini_ws:
+            return
+        try:
+            await ws.send(json.dumps({"toolResponse": {"functionResponses": function_responses}}))
+        except Exception as e:
+            logger.error(f"[Tool] Response Send Error: {e}")
+
+    def cancel_tool_calls(self, ids=None):
+        """Aborts in-flight tool calls (all of them when ids is None)"""
+        for call_id in list(self._tool_tasks if ids is None else ids):
+            task = self._tool_tasks.pop(call_id, None)
+            if task and not task.done():
+                task.cancel()
 
     async def send_audio_to_gemini(self, pcm_bytes):
-        if self.gemini_ws:
-            try:
-                msg = {
-                    "realtime_input": {
-                        "media_chunks": [{
-                            "data": base64.b64encode(pcm_bytes).decode('utf-8'),
-                            "mime_type": "audio/pcm"
-                        }]
-                    }
-                }
-                await self.gemini_ws.send(json.dumps(msg))
-            except: pass
+        # Non-blocking: coalesced into packets and sent by the uplink task
+        self.uplink.push_audio(pcm_bytes)
+
+    async def send_activity_start(self):
+        self.uplink.push_control({"realtime_input": {"activity_start": {}}})
+
+    async def send_activity_end(self):
+        self.uplink.push_control({"realtime_input": {"activity_end": {}}})
 
 async def create_webrtc_session(pc: RTCPeerConnection, offer: RTCSessionDescription):
     session = JarvisSession()
-    await session.connect_gemini()
+    if not (Config.ENABLE_WAKEWORD and Config.WAKEWORD_LAZY_CONNECT):
+        # Don't hold the SDP answer: upstream audio queues in the uplink until attached
+        session.ensure_connected()
     pc.addTrack(session.audio_out_track)
 
     @pc.on("track")
@@ -247,18 +272,89 @@ async def create_webrtc_session(pc: RTCPeerConnection, offer: RTCSessionDescript
             # 🔥 INPUT ENABLED
             asyncio.create_task(process_input_stream(track, session))
 
+async def _forward_events(session, events):
+    """Sends gated (VAD / speaker) events upstream"""
+    for event, payload in events:
+        if event == "start":
+            await session.send_activity_start()
+        elif event == "audio":
+            await session.send_audio_to_gemini(payload)
+        elif event == "end":
+            await session.send_activity_end()
+
+async def _close_segment(session, gate, speaker_gate):
+    """Closes an open VAD segment through the speaker gate (never an unmatched activity_end)"""
+    tail = gate.flush()
+    if speaker_gate is not None:
+        tail = await speaker_gate.filter(tail)
+    await _forward_events(session, tail)
+
 async def process_input_stream(track, session):
     """
-    Reads WebRTC input (Opus/48k) -> Resamples to 16k -> Sends to Gemini
+    Reads WebRTC input (Opus/48k) -> Resamples to 16k -> Wake Word -> VAD Gate -> Speaker Gate -> Sends to Gemini
     """
     resampler = av.AudioResampler(format='s16', layout='mono', rate=16000)
+    gate = SpeechGate() if Config.ENABLE_VAD else None
+
+    # 👂 Wake word: session stays in cheap "listening" state until detection
+    wake = None
+    if Config.ENABLE_WAKEWORD:
+        model = await asyncio.to_thread(load_wakeword_model)
+        if model:
+            wake = WakeWordGate(model)
+    if wake is None:
+        session.ensure_connected()  # No wake word -> always streaming
+
+    # 🔐 Speaker verification works on VAD segments (loaded once, off the event loop)
+    speaker_gate = None
+    if Config.ENABLE_SPEAKER_ID and gate is not None:
+        verifier = await asyncio.to_thread(get_verifier)
+        if verifier:
+            speaker_gate = SpeakerGate(verifier)
     
     while True:
         try:
             frame = await track.recv()
             resampled_frames = resampler.resample(frame)
             pcm_bytes = b"".join([f.to_ndarray().tobytes() for f in resampled_frames])
-            await session.send_audio_to_gemini(pcm_bytes)
+
+            if wake is not None:
+                was_awake = wake.awake
+                pcm_bytes = await wake.process(pcm_bytes)
+
+                if wake.awake and not was_awake:
+                    session.ensure_connected()
+                elif was_awake and not wake.awake:
+                    if gate is not None:
+                        await _close_segment(session, gate, speaker_gate)
+                    if Config.WAKEWORD_LAZY_CONNECT:
+                        session.disconnect_gemini()
+
+                if not pcm_bytes:
+                    continue
+                # Jarvis still talking counts as activity too
+                if len(session.audio_out_track.jitter):
+                    wake.touch()
+
+            if gate is None:
+                await session.send_audio_to_gemini(pcm_bytes)
+                continue
+
+            # 🔇 Only speech segments (+ pre-roll / hangover) go upstream
+            events = gate.process(pcm_bytes)
+            if speaker_gate is not None:
+                events = await speaker_gate.filter(events)
+
+            if wake is not None and events:
+                wake.touch()
+
+            await _forward_events(session, events)
         except Exception as e:
             # logger.error(f"Input Error: {e}")
-            break
\ No newline at end of file
+            break
+
+    if gate is not None:
+        await _close_segment(session, gate, speaker_gate)
+        logger.info(f"🎙️ VAD forwarded {gate.forward_ratio:.0%} of input frames.")
+    session.uplink.flush()
+    logger.info(f"📤 Uplink stats: {session.uplink.stats()}")
\ No newline at end of file
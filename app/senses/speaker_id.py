@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import numpy as np
+from app.core.config import Config
+
+logger = logging.getLogger("JARVIS_SPEAKER_ID")
+
+
+class SpeakerVerifier:
+    """
+    🔐 OWNER VOICE VERIFIER
+    - owner_voice.npy (N x 256, from enrollment.py) is memory-mapped once
+    - Encoder is loaded once and warmed up with a dummy utterance
+    - One matmul scores an utterance against ALL enrolled styles
+    - Live audio gets the same preprocess_wav() as enrollment (volume
+      normalization + silence trimming), so both sides share one distribution
+    """
+
+    MIN_TRIMMED_S = 0.3  # Shorter after silence trimming -> score the volume-normalized window instead
+
+    def __init__(self, path: str = Config.OWNER_VOICE_PATH, threshold: float = Config.SPEAKER_THRESHOLD):
+        from resemblyzer import VoiceEncoder, preprocess_wav
+        from resemblyzer.audio import normalize_volume, audio_norm_target_dBFS
+        self._preprocess = preprocess_wav
+        self._normalize = lambda wav: normalize_volume(wav, audio_norm_target_dBFS, increase_only=True)
+
+        owner = np.load(path, mmap_mode='r')
+        if owner.ndim == 1:
+            owner = owner[None, :]
+
+        # Resemblyzer embeddings are already L2-normalized; only copy if they are not
+        norms = np.linalg.norm(owner, axis=1)
+        if not np.allclose(norms, 1.0, atol=1e-3):
+            owner = owner / norms[:, None]
+        self.owner = owner
+        self.threshold = threshold
+
+        self.encoder = VoiceEncoder(device="cpu", verbose=False)
+        self.encoder.embed_utterance(np.zeros(Config.MODEL_RATE, dtype=np.float32))  # Warm-up
+        logger.info(f"[SpeakerID] ✅ Loaded {self.owner.shape[0]} enrolled voice styles.")
+
+    def score(self, pcm_bytes: bytes) -> float:
+        """Best cosine similarity of a 16kHz PCM16 utterance vs. the enrolled owner"""
+        wav = np.frombuffer(pcm_bytes, dtype=np.int16).astype(np.float32) / 32768.0
+        processed = self._preprocess(wav, source_sr=Config.MODEL_RATE)
+        if len(processed) < self.MIN_TRIMMED_S * Config.MODEL_RATE:
+            processed = self._normalize(wav)
+        embed = self.encoder.embed_utterance(processed)
+        return float(np.max(self.owner @ embed))
+
+
+_verifier = None
+_verifier_lock = threading.Lock()
+
+def get_verifier():
+    """Lazy singleton: the encoder is shared by every session (None if unavailable)"""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is None:
+            if not os.path.exists(Config.OWNER_VOICE_PATH):
+                logger.warning("[SpeakerID] ⚠️ owner_voice.npy not found. Run enrollment.py first.")
+                return None
+            try:
+                _verifier = SpeakerVerifier()
+            except Exception as e:
+                logger.error(f"[SpeakerID] Encoder Load Failed: {e}")
+                return None
+        return _verifier
+
+
+class SpeakerGate:
+    """
+    🗣️ STREAMING SPEAKER GATE (runs on SpeechGate events)
+    - Holds the first window of each utterance until it is verified
+    - Re-verifies every following window (someone else may take over)
+    - action "drop": non-owner speech never reaches Gemini
+      action "tag":  everything is forwarded, verdicts are only logged
+    """
+
+    LATENCY_BUDGET_MS = 30
+    MIN_VERIFY_MS = 300  # Shorter utterances are too noisy to score -> rejected
+
+    def __init__(self, verifier: SpeakerVerifier,
+                 window_ms: int = Config.SPEAKER_WINDOW_MS,
+                 action: str = Config.SPEAKER_ID_ACTION):
+        self.verifier = verifier
+        self.action = action
+        self.window_bytes = int(Config.MODEL_RATE * window_ms / 1000) * 2
+        self.min_bytes = int(Config.MODEL_RATE * self.MIN_VERIFY_MS / 1000) * 2
+
+        self.state = "idle"  # idle / pending / owner / rejected
+        self._buffer = bytearray()
+
+        # Stats
+        self.accepted = 0
+        self.rejected = 0
+        self.last_score = None
+        self.last_latency_ms = None
+
+    async def _is_owner(self, pcm: bytes) -> bool:
+        started = time.perf_counter()
+        score = await asyncio.to_thread(self.verifier.score, pcm)
+        self.last_latency_ms = (time.perf_counter() - started) * 1000
+        self.last_score = score
+
+        if self.last_latency_ms > self.LATENCY_BUDGET_MS:
+            logger.warning(f"[SpeakerID] ⏱️ Verification took {self.last_latency_ms:.1f} ms")
+
+        ok = score >= self.verifier.threshold
+        if ok:
+            self.accepted += 1
+        else:
+            self.rejected += 1
+            logger.info(f"[SpeakerID] 🚫 Non-owner speech (score {score:.2f})")
+        return ok or self.action == "tag"
+
+    async def filter(self, events):
+        out = []
+        for event, payload in events:
+            if event == "start":
+                self.state = "pending"
+                self._buffer.clear()
+
+            elif event == "audio":
+                if self.state == "rejected":
+                    continue
+                self._buffer.extend(payload)
+
+                if self.state == "owner":
+                    out.append(("audio", payload))
+                if len(self._buffer) < self.window_bytes:
+                    continue
+
+                window = bytes(self._buffer)
+                self._buffer.clear()
+                ok = await self._is_owner(window)
+
+                if self.state == "pending":
+                    if ok:
+                        self.state = "owner"
+                        out.extend([("start", None), ("audio", window)])
+                    else:
+                        self.state = "rejected"
+                elif not ok:
+                    # Speaker changed mid-utterance: close the segment here
+                    self.state = "rejected"
+                    out.append(("end", None))
+
+            elif event == "end":
+                if self.state == "pending" and len(self._buffer) >= self.min_bytes:
+                    window = bytes(self._buffer)
+                    if await self._is_owner(window):
+                        out.extend([("start", None), ("audio", window), ("end", None)])
+                elif self.state == "owner":
+                    out.append(("end", None))
+                self.state = "idle"
+                self._buffer.clear()
+
+        return out
@@ -0,0 +1,125 @@
+import asyncio
+import base64
+import json
+import logging
+from collections import deque
+import websockets
+from app.core.config import Config
+
+logger = logging.getLogger("JARVIS_UPLINK")
+
+
+class AudioUplink:
+    """
+    📤 BATCHED UPSTREAM AUDIO PIPELINE
+    - Coalesces 20ms input frames into Config.UPSTREAM_PACKET_MS packets (clamped to 60-200ms)
+    - Bounded queue between the input stream and the websocket
+    - Backpressure: drops the OLDEST audio packet, never control messages
+    - Pre-built JSON template (no dict rebuild + json.dumps per packet)
+    """
+
+    # Same wire format as the old per-frame dict, spliced as a string
+    _AUDIO_PREFIX = '{"realtime_input": {"media_chunks": [{"data": "'
+    _AUDIO_SUFFIX = '", "mime_type": "audio/pcm"}]}}'
+
+    MIN_PACKET_MS = 60
+    MAX_PACKET_MS = 200
+
+    def __init__(self, packet_ms: int = Config.UPSTREAM_PACKET_MS, max_packets: int = Config.UPSTREAM_QUEUE_MAX):
+        packet_ms = min(self.MAX_PACKET_MS, max(self.MIN_PACKET_MS, packet_ms))
+        # 16-bit mono @ MODEL_RATE
+        self.packet_bytes = Config.MODEL_RATE * packet_ms // 1000 * 2
+        self.max_packets = max_packets
+
+        self._pending = bytearray()
+        self._queue = deque()  # (is_audio, message)
+        self._audio_count = 0
+        self._ready = asyncio.Event()
+        self._ws = None
+        self._task = None
+
+        # Stats
+        self.sent = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def start(self, ws):
+        self._ws = ws
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._sender())
+
+    def stop(self):
+        """Stops the sender and discards anything still queued"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        self._queue.clear()
+        self._pending.clear()
+        self._audio_count = 0
+
+    # --- PRODUCER SIDE (called from process_input_stream) ---
+    def push_audio(self, pcm_bytes: bytes):
+        self._pending.extend(pcm_bytes)
+        while len(self._pending) >= self.packet_bytes:
+            self._enqueue(True, self._encode(self._pending[:self.packet_bytes]))
+            del self._pending[:self.packet_bytes]
+
+    def flush(self):
+        """Sends any partial packet (e.g. at the end of a speech segment)"""
+        if self._pending:
+            self._enqueue(True, self._encode(self._pending))
+            self._pending.clear()
+
+    def push_control(self, msg: dict):
+        """Control messages keep their order relative to the audio before them"""
+        self.flush()
+        self._enqueue(False, json.dumps(msg))
+
+    def _encode(self, pcm) -> str:
+        return self._AUDIO_PREFIX + base64.b64encode(pcm).decode('ascii') + self._AUDIO_SUFFIX
+
+    def _enqueue(self, is_audio: bool, msg: str):
+        if is_audio:
+            if self._audio_count >= self.max_packets:
+                self._drop_oldest_audio()
+            self._audio_count += 1
+        self._queue.append((is_audio, msg))
+        self._ready.set()
+
+    def _drop_oldest_audio(self):
+        for i, (is_audio, _) in enumerate(self._queue):
+            if is_audio:
+                del self._queue[i]
+                self._audio_count -= 1
+                self.dropped += 1
+                return
+
+    # --- CONSUMER SIDE (single sender task per session) ---
+    async def _sender(self):
+        while True:
+            if not self._queue:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            is_audio, msg = self._queue.popleft()
+            if is_audio:
+                self._audio_count -= 1
+
+            try:
+                await self._ws.send(msg)
+                self.sent += 1
+            except websockets.exceptions.ConnectionClosed as e:
+                logger.warning(f"[Uplink] 🔌 Gemini socket closed, stopping sender: {e}")
+                return
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"[Uplink] Send Error ({self.errors}): {e}")
+
+    def stats(self):
+        return {
+            "queued": len(self._queue),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
@@ -0,0 +1,90 @@
+from collections import deque
+import webrtcvad
+from app.core.config import Config
+
+
+class SpeechGate:
+    """
+    🎙️ VOICE ACTIVITY GATE (16kHz upstream)
+    - WebRTC VAD on fixed 20ms frames
+    - Pre-roll: the last few hundred ms before speech are sent on trigger
+    - Hangover: keeps streaming a short tail after speech stops
+    - Emits events: ("start", None) / ("audio", pcm_bytes) / ("end", None)
+    """
+
+    def __init__(self,
+                 sample_rate: int = Config.MODEL_RATE,
+                 frame_ms: int = Config.VAD_FRAME_MS,
+                 aggressiveness: int = Config.VAD_AGGRESSIVENESS,
+                 preroll_ms: int = Config.VAD_PREROLL_MS,
+                 hangover_ms: int = Config.VAD_HANGOVER_MS,
+                 trigger_frames: int = 3,
+                 trigger_window: int = 5):
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * 2
+
+        self.trigger_frames = trigger_frames
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+
+        self._pending = bytearray()
+        self._preroll = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self._window = deque(maxlen=trigger_window)
+
+        self.active = False
+        self._silent_run = 0
+
+        # Stats
+        self.frames_in = 0
+        self.frames_forwarded = 0
+
+    def process(self, pcm_bytes: bytes):
+        """Feeds PCM16 mono audio, returns the list of gate events it produced"""
+        events = []
+        self._pending.extend(pcm_bytes)
+
+        while len(self._pending) >= self.frame_bytes:
+            frame = bytes(self._pending[:self.frame_bytes])
+            del self._pending[:self.frame_bytes]
+            self.frames_in += 1
+
+            try:
+                is_speech = self.vad.is_speech(frame, self.sample_rate)
+            except Exception:
+                is_speech = False
+
+            if not self.active:
+                self._preroll.append(frame)
+                self._window.append(is_speech)
+
+                # Trigger: enough voiced frames in the recent window
+                if sum(self._window) >= self.trigger_frames:
+                    self.active = True
+                    self._silent_run = 0
+                    events.append(("start", None))
+                    events.append(("audio", b"".join(self._preroll)))
+                    self.frames_forwarded += len(self._preroll)
+                    self._preroll.clear()
+            else:
+                events.append(("audio", frame))
+                self.frames_forwarded += 1
+
+                # Hangover: close only after a sustained run of silence
+                self._silent_run = 0 if is_speech else self._silent_run + 1
+                if self._silent_run >= self.hangover_frames:
+                    self.active = False
+                    self._window.clear()
+                    events.append(("end", None))
+
+        return events
+
+    def flush(self):
+        """Closes an open segment (e.g. when the input track ends)"""
+        if self.active:
+            self.active = False
+            return [("end", None)]
+        return []
+
+    @property
+    def forward_ratio(self):
+        return self.frames_forwarded / self.frames_in if self.frames_in else 0.0
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from collections import deque
+import numpy as np
+from app.core.config import Config
+
+logger = logging.getLogger("JARVIS_WAKEWORD")
+
+
+def load_wakeword_model():
+    """One model per session (openWakeWord keeps streaming state inside the model)"""
+    try:
+        from openwakeword.model import Model
+        return Model(wakeword_models=[Config.WAKEWORD_MODEL], inference_framework="onnx")
+    except Exception as e:
+        logger.error(f"[WakeWord] Model Load Failed: {e}")
+        return None
+
+
+class WakeWordGate:
+    """
+    👂 WAKE-WORD PRE-FILTER (16kHz, runs before VAD)
+    - "Listening" state: nothing goes upstream, only 80ms chunks are scored locally
+    - On detection: switches to "awake" and releases the pre-roll buffer
+      (so the first words after the wake word are not lost)
+    - Falls back to listening after WAKEWORD_IDLE_TIMEOUT without activity
+    """
+
+    def __init__(self, model,
+                 threshold: float = Config.WAKEWORD_THRESHOLD,
+                 preroll_ms: int = Config.WAKEWORD_PREROLL_MS,
+                 idle_timeout: float = Config.WAKEWORD_IDLE_TIMEOUT):
+        self.model = model
+        self.threshold = threshold
+        self.idle_timeout = idle_timeout
+        self.chunk_bytes = Config.chunk * 2  # openWakeWord expects 1280-sample frames
+
+        chunk_ms = Config.chunk * 1000 // Config.MODEL_RATE
+        self._preroll = deque(maxlen=max(1, preroll_ms // chunk_ms))
+        self._pending = bytearray()
+
+        self.awake = False
+        self.last_activity = 0.0
+        self.detections = 0
+
+    async def process(self, pcm_bytes: bytes) -> bytes:
+        """Returns the audio that should continue downstream (b"" while listening)"""
+        if self.awake:
+            if time.monotonic() - self.last_activity <= self.idle_timeout:
+                return pcm_bytes
+            self.sleep()
+
+        self._pending.extend(pcm_bytes)
+        while len(self._pending) >= self.chunk_bytes:
+            chunk = bytes(self._pending[:self.chunk_bytes])
+            del self._pending[:self.chunk_bytes]
+            self._preroll.append(chunk)
+
+            scores = await asyncio.to_thread(self.model.predict, np.frombuffer(chunk, dtype=np.int16))
+            if max(scores.values(), default=0.0) >= self.threshold:
+                self.awake = True
+                self.detections += 1
+                self.touch()
+                logger.info(f"[WakeWord] 🟢 Wake word detected ({self.detections}).")
+
+                released = b"".join(self._preroll) + bytes(self._pending)
+                self._preroll.clear()
+                self._pending.clear()
+                return released
+
+        return b""
+
+    def touch(self):
+        """Marks conversation activity (keeps the gate awake)"""
+        self.last_activity = time.monotonic()
+
+    def sleep(self):
+        logger.info("[WakeWord] 💤 Idle timeout, back to listening.")
+        self.awake = False
+        self._pending.clear()
+        self._preroll.clear()
+        try:
+            self.model.reset()
+        except Exception:
+            pass
@@ -12,6 +12,10 @@ from aiortc import RTCPeerConnection, RTCSessionDescription, RTCConfiguration, R
 from app.core.config import Config
 from app.core.shared_state import state
 from app.senses.rtc_handler import create_webrtc_session
+from app.senses.live_pool import live_pool
+from app.core.genai_client import client_manager
+from app.mcp.registry import mcp
+from app.mcp.geo_cache import geo_cache
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
@@ -22,6 +26,20 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 pcs = set()
 
+@app.on_event("startup")
+async def on_startup():
+    # 🔥 Pre-warm Gemini Live sockets so /offer never waits for TLS + setup
+    live_pool.start()
+    # Keep-alive HTTP clients for tools (Nominatim, OSRM, Telegram, search APIs)
+    mcp.http.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await live_pool.close()
+    await mcp.http.aclose()
+    geo_cache.save()
+    await client_manager.aclose()
+
 @app.get("/", response_class=HTMLResponse)
 async def get_home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
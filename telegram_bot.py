@@ -1,10 +1,13 @@
 import os
+import time
 import logging
 import asyncio
 from dotenv import load_dotenv
 from telegram import Update
 from telegram.ext import ApplicationBuilder, ContextTypes, CommandHandler, MessageHandler, filters
-from app.brain.agent import ask_jarvis 
+from telegram.error import BadRequest, RetryAfter
+from app.brain.agent import ask_jarvis_stream
+from app.core.config import Config
 # 🔥 Global State ကို Import လုပ်မယ် (GPS Update ဖို့)
 from app.core.shared_state import state
 
@@ -44,6 +47,65 @@ async def handle_location(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await update.message.reply_text("✅ GPS Updated! You can now ask for routes/directions.")
 
+async def _edit(message, text, wait=False):
+    """
+    True once Telegram shows `text`. Flood control (RetryAfter) -> False,
+    unless wait=True (final edits): then sit it out and try again.
+    """
+    for _ in range(3):
+        try:
+            await message.edit_text(text)
+            return True
+        except RetryAfter as e:
+            delay = e.retry_after.total_seconds() if hasattr(e.retry_after, "total_seconds") else e.retry_after
+            print(f"[Telegram] ⏳ Edit throttled ({delay}s)")
+            if not wait:
+                return False
+            await asyncio.sleep(delay)
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                return True
+            raise
+    return False
+
+async def stream_reply(update: Update, chunks):
+    """
+    🌊 PROGRESSIVE REPLY
+    - First chunk is sent as soon as it arrives
+    - Later chunks edit the same message at most once per TELEGRAM_EDIT_INTERVAL
+    - Overflowing TELEGRAM_MAX_CHARS continues in a new message
+    - Whatever a throttled edit missed is sent by the final edit
+    """
+    limit = Config.TELEGRAM_MAX_CHARS
+    message = None        # Message currently being filled
+    body, shown = "", ""  # Its full text so far / the text Telegram confirmed
+    sent, last_edit = False, 0.0
+
+    async for chunk in chunks:
+        body += chunk
+        while len(body) > limit:
+            # Current message is full -> finish it, continue in a new one
+            head, body = body[:limit], body[limit:]
+            if message is None:
+                await update.message.reply_text(head)
+            elif head != shown:
+                await _edit(message, head, wait=True)
+            message, shown, sent = None, "", True
+
+        if message is None:
+            if body.strip():
+                message = await update.message.reply_text(body)
+                shown, sent, last_edit = body, True, time.monotonic()
+        elif body != shown and time.monotonic() - last_edit >= Config.TELEGRAM_EDIT_INTERVAL:
+            if await _edit(message, body):
+                shown = body
+            last_edit = time.monotonic()
+
+    if message is not None and body != shown:
+        await _edit(message, body, wait=True)
+    elif not sent:
+        await update.message.reply_text(body if body.strip() else "...")
+
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     user_text = update.message.text
     
@@ -55,8 +117,8 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     try:
         # Brain ကို လှမ်းမေးမယ်
-        response = await ask_jarvis(user_text)
-        await update.message.reply_text(response)
+        # Chat တစ်ခုချင်းစီ သီးသန့် History
+        await stream_reply(update, ask_jarvis_stream(user_text, conversation_id=f"telegram:{update.effective_chat.id}"))
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -0,0 +1,5 @@
+import os
+
+# Offline by default: SQLite memory backend, no Supabase / Upstash needed
+os.environ.setdefault("MEMORY_BACKEND", "local")
+os.environ.setdefault("MEMORY_SQLITE_PATH", ":memory:")
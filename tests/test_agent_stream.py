@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from app.brain import agent
+
+
+@pytest.fixture
+def offline_agent(monkeypatch):
+    """No model calls: fixed embeddings, no memory extraction, scripted router"""
+    async def no_embedding(text):
+        return None
+
+    monkeypatch.setattr(agent, "get_embedding", no_embedding)
+    monkeypatch.setattr(agent, "extract_and_save_memory", lambda text: None)
+    return monkeypatch
+
+
+def _fake_streams(started):
+    async def fake_stream(selected_prompt, contents_list, embed_task=None):
+        started.append(selected_prompt)
+        await asyncio.sleep(0.05)  # Still waiting for its first chunk when the router answers
+        for word in (f"{selected_prompt.__name__} ", "reply"):
+            yield word
+    return fake_stream
+
+
+def test_stream_speculation_miss_answers_with_routed_agent(offline_agent):
+    async def router(text):
+        await asyncio.sleep(0.01)
+        return "NEWS_AGENT"
+
+    started = []
+    offline_agent.setattr(agent.local_router, "classify", lambda text: ("CHAT_AGENT", 0.1))
+    offline_agent.setattr(agent, "route_request", router)
+    offline_agent.setattr(agent, "_stream_reply", _fake_streams(started))
+
+    async def run():
+        return [c async for c in agent.ask_jarvis_stream("any news about the market today?",
+                                                          conversation_id="test:miss")]
+
+    chunks = asyncio.run(run())
+
+    assert started == [agent.get_chat_agent_prompt, agent.get_news_agent_prompt]
+    assert "".join(chunks) == "get_news_agent_prompt reply"
+
+
+def test_stream_speculation_hit_keeps_first_chunk(offline_agent):
+    async def router(text):
+        await asyncio.sleep(0.01)
+        return "CHAT_AGENT"
+
+    started = []
+    offline_agent.setattr(agent.local_router, "classify", lambda text: ("CHAT_AGENT", 0.1))
+    offline_agent.setattr(agent, "route_request", router)
+    offline_agent.setattr(agent, "_stream_reply", _fake_streams(started))
+
+    async def run():
+        return [c async for c in agent.ask_jarvis_stream("tell me something nice please",
+                                                          conversation_id="test:hit")]
+
+    chunks = asyncio.run(run())
+
+    assert started == [agent.get_chat_agent_prompt]
+    assert "".join(chunks) == "get_chat_agent_prompt reply"
+
+
+def test_hung_query_embedding_falls_back_to_core_bank(monkeypatch):
+    seen = []
+
+    async def build(selected_prompt, query_embedding=None):
+        seen.append(query_embedding)
+        return "system"
+
+    monkeypatch.setattr(agent.Config, "MEMORY_EMBED_WAIT", 0.01)
+    monkeypatch.setattr(agent.memory, "build_system_instruction", build)
+
+    async def run():
+        hung = asyncio.create_task(asyncio.sleep(10, result=[1.0, 0.0]))
+        fast = asyncio.create_task(asyncio.sleep(0, result=[1.0, 0.0]))
+        try:
+            await asyncio.wait_for(agent._system_instruction(agent.get_chat_agent_prompt, hung), 1)
+            await agent._system_instruction(agent.get_chat_agent_prompt, fast)
+            assert not hung.cancelled()  # Still available to the response cache
+        finally:
+            hung.cancel()
+
+    asyncio.run(run())
+    assert seen == [None, [1.0, 0.0]]
+
+
+@pytest.fixture
+def cached_turn(monkeypatch):
+    """Embedding slower than nothing but faster than generation, with a matching cache entry"""
+    from app.brain.response_cache import SemanticResponseCache
+
+    async def slow_embedding(text):
+        await asyncio.sleep(0.1)
+        return [1.0, 0.0, 0.0]
+
+    cache = SemanticResponseCache(threshold=0.95, ttl=60, max_entries=10)
+    monkeypatch.setattr(agent, "response_cache", cache)
+    monkeypatch.setattr(agent, "get_embedding", slow_embedding)
+    monkeypatch.setattr(agent, "extract_and_save_memory", lambda text: None)
+    monkeypatch.setattr(agent.local_router, "classify", lambda text: ("CHAT_AGENT", 0.9))
+    cache.store([1.0, 0.0, 0.0], agent._cache_version("CHAT_AGENT"), "CHAT_AGENT", "cached reply", "")
+    return monkeypatch
+
+
+def test_cache_hit_after_slow_embedding_cancels_generation(cached_turn):
+    cancelled = []
+
+    async def slow_reply(selected_prompt, contents_list, embed_task=None):
+        try:
+            await asyncio.sleep(2)
+            return "generated"
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    cached_turn.setattr(agent, "_generate_reply", slow_reply)
+    reply = asyncio.run(agent.ask_jarvis("what is the capital of france?", conversation_id="test:cache1"))
+
+    assert reply == "cached reply"
+    assert cancelled == [True]
+
+
+def test_stream_cache_hit_before_first_chunk(cached_turn):
+    async def slow_stream(selected_prompt, contents_list, embed_task=None):
+        await asyncio.sleep(2)
+        yield "generated"
+
+    cached_turn.setattr(agent, "_stream_reply", slow_stream)
+
+    async def run():
+        return [c async for c in agent.ask_jarvis_stream("what is the capital of france?",
+                                                          conversation_id="test:cache2")]
+
+    assert asyncio.run(run()) == ["cached reply"]
@@ -0,0 +1,16 @@
+import numpy as np
+
+from app.senses.audio_buffer import AdaptiveJitterBuffer
+
+
+def test_long_reply_grows_pool_without_dropping_audio():
+    jitter = AdaptiveJitterBuffer(0.02, 4, initial_frames=1, capacity_frames=4)
+    for i in range(3):
+        jitter.push(np.full(4, i, dtype=np.int16), now=0.0)
+    assert jitter.pop(now=0.0)[0] == 0  # Queue now wraps around the pool end
+
+    for i in range(3, 9):
+        jitter.push(np.full(4, i, dtype=np.int16), now=0.0)
+
+    assert jitter.grows == 1 and jitter.capacity_frames == 8
+    assert [int(jitter.pop(now=0.0)[0]) for _ in range(8)] == list(range(1, 9))
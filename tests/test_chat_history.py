@@ -0,0 +1,78 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.brain import history_summarizer
+from app.brain.history_summarizer import HistorySummarizer
+from app.brain.memory import ChatHistoryBuffer, CHAT_BUFFER_KEY
+from app.brain.memory_store import LocalStore
+
+
+def test_idle_conversations_are_lru_evicted_and_rehydrated():
+    store = LocalStore(":memory:")
+    history = ChatHistoryBuffer(store, max_len=4, max_conversations=3)
+    for cid in ("default", "live:a", "live:b"):
+        history.hydrate(cid)
+        history.append(cid, f"user: hi from {cid}")
+    history.flush()
+
+    history.hydrate("live:c")
+    loaded = [key for key in (CHAT_BUFFER_KEY, f"{CHAT_BUFFER_KEY}:live:a", f"{CHAT_BUFFER_KEY}:live:b")
+              if key in history._convs]
+    # Default buffer is pinned, the least recently used session went first
+    assert loaded == [CHAT_BUFFER_KEY, f"{CHAT_BUFFER_KEY}:live:b"]
+
+    history.hydrate("live:a")
+    assert history.get("live:a") == ["user: hi from live:a"]
+
+
+def test_summarizer_forgets_finished_tasks(monkeypatch):
+    store = LocalStore(":memory:")
+    history = ChatHistoryBuffer(store, max_len=2)
+
+    async def generate(**kwargs):
+        return SimpleNamespace(text="short summary")
+
+    async def get_chat_summary(cid):
+        return history.get_summary(cid)
+
+    async def set_chat_summary(cid, summary):
+        history.set_summary(cid, summary)
+
+    monkeypatch.setattr(history_summarizer.client_manager, "generate", generate)
+    monkeypatch.setattr(history_summarizer.Config, "SUMMARY_EVERY", 2)
+    memory = SimpleNamespace(sync=SimpleNamespace(history=history), get_chat_summary=get_chat_summary,
+                             set_chat_summary=set_chat_summary)
+    summarizer = HistorySummarizer(memory)
+
+    async def run():
+        for i in range(4):
+            history.append("live:a", f"user: {i}")
+        summarizer.maybe_schedule("live:a")
+        await asyncio.gather(*summarizer._tasks.values())
+
+    asyncio.run(run())
+    assert summarizer._tasks == {} and summarizer.runs == 1
+    assert history.get_summary("live:a") == "short summary"
+
+
+def test_unsummarized_evictions_survive_a_restart():
+    store = LocalStore(":memory:")
+    history = ChatHistoryBuffer(store, max_len=2)
+    for i in range(5):
+        history.append("live:a", f"user: {i}")
+    history.flush()
+
+    # Restart: a fresh buffer on the same store still has the lines awaiting the summary
+    restarted = ChatHistoryBuffer(store, max_len=2)
+    restarted.hydrate("live:a")
+    assert restarted.get("live:a") == ["user: 3", "user: 4"]
+    lines = restarted.take_evicted("live:a")
+    assert lines == ["user: 0", "user: 1", "user: 2"]
+
+    # A successful fold drops exactly the folded lines from the store
+    restarted.append("live:a", "user: 5")
+    restarted.set_summary("live:a", "counted to two")
+    again = ChatHistoryBuffer(store, max_len=2)
+    again.hydrate("live:a")
+    assert again.take_evicted("live:a") == ["user: 3"]
+    assert again.get_summary("live:a") == "counted to two"
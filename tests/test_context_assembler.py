@@ -0,0 +1,17 @@
+from app.brain.context_assembler import ContextAssembler, clip_tokens, count_tokens
+
+
+def test_long_burmese_line_is_clipped_to_the_token_cap():
+    burmese = "မင်္ဂလာပါ " * 200
+    lines, used = ContextAssembler.fit_lines(["user: hi", f"model: {burmese}"], 1500, keep="tail",
+                                              max_line_tokens=300)
+
+    assert len(lines) == 2 and lines[1].endswith(" …")
+    assert count_tokens(lines[1]) <= 300 and used <= 300 + count_tokens("user: hi")
+
+
+def test_clip_keeps_the_longest_fitting_prefix():
+    text = "word " * 400
+    clipped = clip_tokens(text, 50)
+    assert count_tokens(clipped) <= 50
+    assert count_tokens(text[:len(clipped) - 1] + " …") > 50  # One more char would not fit
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from app.mcp.geo_backends import LocalGeoBackend, GeoBackend
+from app.mcp.geo_cache import GeoCache
+from app.mcp.tools import location
+
+PLACES = [
+    {"name": "Sule Pagoda", "area": "Yangon", "lat": 16.7745, "lng": 96.1588, "radius_m": 100, "aliases": ["Sule"]},
+    {"name": "Inya Lake", "area": "Yangon", "lat": 16.8333, "lng": 96.1500, "radius_m": 1200, "aliases": []},
+]
+
+
+@pytest.fixture
+def local():
+    return LocalGeoBackend(places=PLACES, path=None)
+
+
+def test_forward_needs_whole_query_match(local):
+    sule = asyncio.run(local.geocode("  SULE "))
+    assert sule["name"] == "Sule Pagoda, Yangon"
+    assert asyncio.run(local.geocode("Sule Pagoda, Yangon")) == sule
+    assert asyncio.run(local.geocode("sule pagoda road")) is None
+    assert asyncio.run(local.geocode("how far to inya lake")) is None
+
+
+def test_reverse_only_inside_the_place_radius(local):
+    # ~500 m from Sule (radius 100) -> not Sule; ~800 m from Inya (radius 1200) -> Inya
+    assert asyncio.run(local.reverse(16.7790, 96.1588)) is None
+    assert asyncio.run(local.reverse(16.7746, 96.1589)) == "Sule Pagoda, Yangon"
+    assert asyncio.run(local.reverse(16.8405, 96.1500)) == "Inya Lake, Yangon"
+
+
+def test_failed_reverse_is_not_cached(monkeypatch):
+    class Flaky(GeoBackend):
+        answers = [None, "Pansodan St, Yangon"]
+
+        async def reverse(self, lat, lng):
+            return self.answers.pop(0)
+
+    monkeypatch.setattr(location, "geo_cache", GeoCache(path=None))
+    monkeypatch.setattr(location, "geo_backend", Flaky())
+
+    assert asyncio.run(location.reverse_geocode(16.77, 96.16)) == "Unknown Area"
+    assert asyncio.run(location.reverse_geocode(16.77, 96.16)) == "Pansodan St, Yangon"
+    assert asyncio.run(location.reverse_geocode(16.77, 96.16)) == "Pansodan St, Yangon"  # Cached now
@@ -0,0 +1,87 @@
+import logging
+
+import pytest
+
+from app.brain.memory import MemorySystem, context_cache
+from app.brain.memory_store import LocalStore
+from app.brain.vector_index import MemoryVectorIndex
+
+
+@pytest.fixture
+def memory():
+    store = LocalStore(":memory:")
+    system = MemorySystem(store)
+    system.index = MemoryVectorIndex(store, path=None)
+    context_cache.invalidate()
+    yield system
+    context_cache.invalidate()
+
+
+def test_index_grows_and_ranks(monkeypatch):
+    monkeypatch.setattr(MemoryVectorIndex, "INITIAL_CAPACITY", 2)
+    store = LocalStore(":memory:")
+    store.insert_memory({"category": "fact", "content": "likes tea", "embedding": [1.0, 0.0]})
+    index = MemoryVectorIndex(store, path=None)
+    assert index.ensure_loaded()
+
+    index.add("lives in Yangon", "fact", [0.0, 1.0])
+    index.add("drinks green tea", "fact", [0.8, 0.2])
+    assert len(index) == 3 and index.capacity == 4 and index.grows == 1
+    assert "drinks green tea" in index and "minor" not in index
+
+    hits = index.search([1.0, 0.0], k=2, threshold=0.5)
+    assert [h["content"] for h in hits] == ["likes tea", "drinks green tea"]
+
+
+def test_disk_index_reloads_and_syncs_only_new_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(MemoryVectorIndex, "INITIAL_CAPACITY", 2)
+    path = str(tmp_path / "index")
+    store = LocalStore(":memory:")
+    store.insert_memory({"category": "fact", "content": "likes tea", "embedding": [1.0, 0.0]})
+    index = MemoryVectorIndex(store, path=path)
+    assert index.ensure_loaded()
+    for content, emb in [("lives in Yangon", [0.0, 1.0]), ("drinks green tea", [0.8, 0.2])]:
+        index.add(content, "fact", emb, store.insert_memory({"category": "fact", "content": content, "embedding": emb}))
+    store.insert_memory({"category": "fact", "content": "saved while offline", "embedding": [0.0, -1.0]})
+
+    fetched = []
+    fetch = store.fetch_memory_vectors
+    monkeypatch.setattr(store, "fetch_memory_vectors", lambda after_id=None: fetched.append(after_id) or fetch(after_id))
+    reloaded = MemoryVectorIndex(store, path=path)
+    assert reloaded.ensure_loaded()
+    assert fetched == [3] and reloaded.restored == 3 and reloaded.synced == 1
+    assert len(reloaded) == 4 and "saved while offline" in reloaded
+    assert reloaded.search([0.0, -1.0])[0]["content"] == "saved while offline"
+    assert reloaded.search([1.0, 0.0], k=2)[1]["content"] == "drinks green tea"
+
+
+def test_unembedded_core_memories_stay_in_ranked_prompt(memory):
+    memory.store.insert_memory({"category": "fact", "content": "likes tea", "embedding": [1.0, 0.0]})
+    memory.store.insert_memory({"category": "fact", "content": "lives in Yangon", "embedding": [0.0, 1.0]})
+    memory.store.insert_memory({"category": "rule", "content": "never call before 9am"})
+
+    prompt = memory.build_system_instruction(query_embedding=[1.0, 0.0], include_realtime=False)
+    assert "[RELEVANT MEMORIES]" in prompt
+    assert "likes tea" in prompt and "never call before 9am" in prompt
+    assert "lives in Yangon" not in prompt
+
+
+def test_no_relevant_match_falls_back_to_core_bank(memory):
+    memory.store.insert_memory({"category": "fact", "content": "likes tea", "embedding": [1.0, 0.0]})
+    memory.store.insert_memory({"category": "fact", "content": "low priority", "importance_level": 3})
+
+    prompt = memory.build_system_instruction(query_embedding=[-1.0, 0.0], include_realtime=False)
+    assert "[CORE MEMORY BANK]" in prompt and "likes tea" in prompt
+    assert "low priority" not in prompt
+
+
+def test_composition_logged_on_every_call(memory, caplog):
+    memory.store.insert_memory({"category": "fact", "content": "likes tea", "embedding": [1.0, 0.0]})
+
+    with caplog.at_level(logging.INFO, logger="JARVIS_CONTEXT"):
+        memory.build_system_instruction(query_embedding=[1.0, 0.0])
+        memory.build_system_instruction(query_embedding=[1.0, 0.0])  # Static part cached
+
+    reports = [r.getMessage() for r in caplog.records if r.name == "JARVIS_CONTEXT"]
+    assert len(reports) == 2
+    assert all("memories=" in r and "realtime=" in r for r in reports)
@@ -0,0 +1,66 @@
+import pytest
+
+from app.brain.memory_store import MemoryStore, LocalStore
+
+
+@pytest.fixture
+def store():
+    return LocalStore(":memory:")
+
+
+def test_incomplete_store_fails_at_construction():
+    class HistoryOnly(MemoryStore):
+        def history_push_batch(self, batch, max_len): pass
+        def history_range(self, key): return []
+
+    with pytest.raises(TypeError):
+        HistoryOnly()
+
+
+def test_history_is_trimmed_per_key(store):
+    store.history_push_batch({"a": ["1", "2", "3"], "b": ["x"]}, max_len=2)
+    store.history_push_batch({"a": ["4"]}, max_len=2)
+
+    assert store.history_range("a") == ["3", "4"]
+    assert store.history_range("b") == ["x"]
+    assert store.history_range("missing") == []
+
+
+def test_summary_roundtrip(store):
+    assert store.summary_get("chat") == ""
+    store.summary_set("chat", "first")
+    store.summary_set("chat", "second")
+    assert store.summary_get("chat") == "second"
+
+
+def test_memories_by_importance_and_vector(store):
+    near = store.insert_memory({"category": "fact", "content": "likes tea", "embedding": [1.0, 0.0]})
+    store.insert_memory({"category": "fact", "content": "lives in Yangon", "embedding": [0.0, 1.0]})
+    store.insert_memory({"category": "note", "content": "minor", "importance_level": 3})
+
+    core = {m["content"] for m in store.fetch_core_memories(7)}
+    assert core == {"likes tea", "lives in Yangon"}
+
+    matches = store.match_memories([0.9, 0.1], threshold=0.5, count=5)
+    assert [m["id"] for m in matches] == [near]
+    assert matches[0]["similarity"] > 0.9
+
+    assert len(store.fetch_memory_vectors()) == 2
+
+
+def test_history_ttl_expires_buffer_and_summary(store, monkeypatch):
+    import app.brain.memory_store as memory_store
+    now = [1000.0]
+    monkeypatch.setattr(memory_store.time, "time", lambda: now[0])
+
+    store.history_push_batch({"live:a": ["1"], "chat": ["x"]}, max_len=5, ttl={"live:a": 60, "chat": None})
+    store.summary_set("live:a", "earlier", ttl=60)
+    now[0] += 30
+    store.history_push_batch({"live:a": ["2"]}, max_len=5, ttl={"live:a": 60})  # Refreshes the expiry
+    now[0] += 45
+    assert store.history_range("live:a") == ["1", "2"]
+
+    now[0] += 60
+    assert store.history_range("live:a") == []
+    assert store.summary_get("live:a") == ""
+    assert store.history_range("chat") == ["x"]
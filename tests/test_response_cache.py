@@ -0,0 +1,30 @@
+from app.brain.response_cache import SemanticResponseCache
+
+QUESTION = [1.0, 0.0, 0.0]
+SAME_QUESTION = [0.99, 0.01, 0.0]
+
+
+def _cache():
+    return SemanticResponseCache(threshold=0.95, ttl=60, max_entries=10)
+
+
+def test_hit_needs_same_route_and_context():
+    cache = _cache()
+    context = cache.context_key(["user: tell me about tea", "model: Tea is ..."])
+    cache.store(QUESTION, "v1", "CHAT_AGENT", "More on tea ...", context)
+
+    assert cache.lookup(SAME_QUESTION, "v1", "CHAT_AGENT", context) == "More on tea ..."
+    # Same words after a different exchange / in a fresh conversation
+    other = cache.context_key(["user: tell me about coffee", "model: Coffee is ..."])
+    assert cache.lookup(SAME_QUESTION, "v1", "CHAT_AGENT", other) is None
+    assert cache.lookup(SAME_QUESTION, "v1", "CHAT_AGENT", "") is None
+    # Other route / prompt version
+    assert cache.lookup(SAME_QUESTION, "v1", "NEWS_AGENT", context) is None
+    assert cache.lookup(SAME_QUESTION, "v2", "CHAT_AGENT", context) is None
+
+
+def test_context_key_uses_only_recent_lines():
+    cache = _cache()
+    assert cache.context_key([]) == ""
+    assert cache.context_key(["a", "b", "c"], n=2) == cache.context_key(["x", "b", "c"], n=2)
+    assert cache.context_key(["a", "b", "c"], n=2) != cache.context_key(["a", "b", "d"], n=2)
@@ -0,0 +1,39 @@
+import asyncio
+
+from app.senses.rtc_handler import _close_segment
+from app.senses.speaker_id import SpeakerGate
+from app.senses.vad import SpeechGate
+
+
+class FakeVerifier:
+    threshold = 0.75
+
+    def score(self, pcm):
+        return 0.0
+
+
+class FakeSession:
+    def __init__(self):
+        self.sent = []
+
+    async def send_activity_start(self): self.sent.append("start")
+    async def send_audio_to_gemini(self, pcm): self.sent.append("audio")
+    async def send_activity_end(self): self.sent.append("end")
+
+
+def _close(speaker_state):
+    gate = SpeechGate()
+    gate.active = True  # Segment still open when the wake word times out
+    speaker_gate = SpeakerGate(FakeVerifier(), action="drop")
+    speaker_gate.state = speaker_state
+    session = FakeSession()
+    asyncio.run(_close_segment(session, gate, speaker_gate))
+    return session.sent
+
+
+def test_rejected_segment_closes_without_activity_end():
+    assert _close("rejected") == []
+
+
+def test_owner_segment_closes_with_activity_end():
+    assert _close("owner") == ["end"]
@@ -0,0 +1,37 @@
+import time
+import asyncio
+
+from app.core.config import Config
+from app.mcp.search_orchestrator import SearchOrchestrator, SearchProvider
+
+
+def _provider(name, delay, sources):
+    async def fetch(query):
+        await asyncio.sleep(delay)
+        return "\n".join(f"- {name} {i} [Source: https://{name}.test/{i}]" for i in range(sources))
+    return SearchProvider(name, fetch)
+
+
+def test_unmeasured_provider_gets_default_latency():
+    orchestrator = SearchOrchestrator()
+    fresh = orchestrator.register(_provider("fresh", 0, 1))
+    fast = orchestrator.register(_provider("fast", 0, 1))
+    fast.latency.record(40, True)
+
+    assert orchestrator._latency_ms(fresh, 0.5) == Config.SEARCH_DEFAULT_LATENCY_MS
+    assert orchestrator._hedge_delay(fresh) == Config.SEARCH_HEDGE_DELAY
+    assert [p.name for p in orchestrator._ranked(["fresh", "fast"])] == ["fast", "fresh"]
+
+
+def test_slow_provider_is_hedged_and_cancelled(monkeypatch):
+    monkeypatch.setattr(Config, "SEARCH_HEDGE_DELAY", 0.05)
+    orchestrator = SearchOrchestrator()
+    slow = orchestrator.register(_provider("slow", 2.0, 5))
+    orchestrator.register(_provider("fast", 0.01, 5))
+
+    started = time.perf_counter()
+    results = asyncio.run(orchestrator.search("q", ["slow", "fast"], timeout=5))
+
+    assert [name for name, _ in results] == ["fast"]
+    assert time.perf_counter() - started < 1.0
+    assert slow.cancelled == 1 and slow.latency.requests == 0
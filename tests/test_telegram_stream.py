@@ -0,0 +1,58 @@
+import asyncio
+
+from telegram.error import RetryAfter
+
+import telegram_bot
+from app.core.config import Config
+
+
+class FakeMessage:
+    def __init__(self, text, throttled=0):
+        self.text = text
+        self.throttled = throttled  # Edits rejected with RetryAfter before they go through
+
+    async def edit_text(self, text):
+        if self.throttled:
+            self.throttled -= 1
+            raise RetryAfter(0)
+        self.text = text
+
+
+class FakeUpdate:
+    def __init__(self, throttled=0):
+        self.sent = []
+        self.throttled = throttled
+        self.message = self
+
+    async def reply_text(self, text):
+        assert text, "empty Telegram message"
+        msg = FakeMessage(text, self.throttled)
+        self.sent.append(msg)
+        return msg
+
+
+async def _chunks(*parts):
+    for part in parts:
+        yield part
+
+
+def _run(update, *parts):
+    asyncio.run(telegram_bot.stream_reply(update, _chunks(*parts)))
+    return [m.text for m in update.sent]
+
+
+def test_throttled_edits_still_show_the_whole_reply(monkeypatch):
+    monkeypatch.setattr(Config, "TELEGRAM_EDIT_INTERVAL", 0)
+    update = FakeUpdate(throttled=2)
+    assert _run(update, "Hello", " there", " sir.") == ["Hello there sir."]
+
+
+def test_overflow_splits_without_empty_messages(monkeypatch):
+    monkeypatch.setattr(Config, "TELEGRAM_EDIT_INTERVAL", 0)
+    monkeypatch.setattr(Config, "TELEGRAM_MAX_CHARS", 5)
+    update = FakeUpdate()
+    assert _run(update, "abc", "defgh", "ij", "k") == ["abcde", "fghij", "k"]
+
+
+def test_empty_stream_sends_placeholder():
+    assert _run(FakeUpdate(), "") == ["..."]